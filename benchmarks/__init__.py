@@ -0,0 +1,5 @@
+"""
+WeatherNFT.live - Prediction benchmark suite
+Run with: python sd-pytorch-integration.py --benchmark [options]
+     or: python sd-pytorch-integration.py --precision-report [options]
+"""
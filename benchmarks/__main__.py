@@ -0,0 +1,19 @@
+"""Run the benchmark suite: python -m benchmarks [options]"""
+
+import sys
+import importlib.util
+from pathlib import Path
+
+from benchmarks.prediction_bench import run_cli
+
+def load_integration():
+    """Load sd-pytorch-integration.py (not importable by name because of the dashes)"""
+    path = Path(__file__).resolve().parent.parent / "sd-pytorch-integration.py"
+    spec = importlib.util.spec_from_file_location("sd_pytorch_integration", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+if __name__ == "__main__":
+    run_cli(load_integration(), sys.argv[1:])
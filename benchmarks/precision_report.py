@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+WeatherNFT.live - Reduced-precision accuracy drift report
+Scores a fixed evaluation set with the batched engine at each precision and
+compares confidences, winning algorithms, event types and rarities against
+float32, alongside latency, weight bytes and the resident memory of a fresh
+service process at that precision (as ratios to float32: on CPU int8 trades
+latency for smaller weights).
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List
+
+from benchmarks.prediction_bench import (current_rss_mb, git_commit, peak_rss_mb, percentile,
+                                         sample_observations, time_calls)
+
+def score_in_batches(engine, rows: List[List[float]], batch_size: int) -> List[List[float]]:
+    """Score rows in fixed-size chunks, as the service would"""
+    scored = []
+    for start in range(0, len(rows), batch_size):
+        scored.extend(engine.predict(rows[start:start + batch_size]))
+    return scored
+
+def compare(ai, reference: List[List[float]], candidate: List[List[float]]) -> Dict:
+    """Drift of `candidate` confidences (and what they classify to) against `reference`"""
+    algorithms = tuple(ai.algorithms)
+    ref_events, ref_rarities = ai.classification.classify(algorithms, reference)
+    cand_events, cand_rarities = ai.classification.classify(algorithms, candidate)
+    rows = len(reference)
+
+    per_algorithm = {}
+    for index, algorithm in enumerate(algorithms):
+        errors = sorted(abs(c[index] - r[index]) for r, c in zip(reference, candidate))
+        per_algorithm[algorithm] = {
+            "max_abs_error": errors[-1] if errors else 0.0,
+            "mean_abs_error": sum(errors) / rows if rows else 0.0,
+            "p99_abs_error": percentile(errors, 0.99),
+            "event_type_agreement": sum(r[index] == c[index] for r, c in zip(ref_events, cand_events)) / rows,
+            "rarity_agreement": sum(r[index] == c[index] for r, c in zip(ref_rarities, cand_rarities)) / rows
+        }
+
+    ref_winners = [max(range(len(algorithms)), key=row.__getitem__) for row in reference]
+    cand_winners = [max(range(len(algorithms)), key=row.__getitem__) for row in candidate]
+    return {
+        "max_abs_error": max(stats["max_abs_error"] for stats in per_algorithm.values()),
+        "winner_agreement": sum(r == c for r, c in zip(ref_winners, cand_winners)) / rows,
+        "winner_event_type_agreement": sum(
+            ref_events[i][r] == cand_events[i][c] for i, (r, c) in enumerate(zip(ref_winners, cand_winners))
+        ) / rows,
+        "winner_rarity_agreement": sum(
+            ref_rarities[i][r] == cand_rarities[i][c] for i, (r, c) in enumerate(zip(ref_winners, cand_winners))
+        ) / rows,
+        "per_algorithm": per_algorithm
+    }
+
+def serving_memory(module_path: str, env: Dict[str, str], samples: int, seed: int, batch_size: int) -> Dict:
+    """In a fresh process: start the service with `env`, score the evaluation set and report its RSS
+
+    `model_rss_mb` excludes the interpreter and the torch import, which
+    every precision pays alike.
+    """
+    import torch  # noqa: F401 - counted in the baseline
+
+    os.environ.update(env)
+    spec = importlib.util.spec_from_file_location("sd_pytorch_integration", module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    gc.collect()
+    baseline = current_rss_mb()
+
+    ai = module.WeatherAIIntegration()
+    rows = [ai.extract_features(observation) for observation in sample_observations(samples, seed=seed)]
+    score_in_batches(ai.get_batched_engine(), rows, batch_size)
+    del rows
+    gc.collect()
+    rss = current_rss_mb()
+    return {
+        "rss_mb": rss,
+        "model_rss_mb": None if rss is None else rss - baseline,
+        "peak_rss_mb": peak_rss_mb(),
+        "float_modules_resident": len(ai.pytorch_models)
+    }
+
+def measure_serving_memory(module: ModuleType, ai, precisions: List[str], samples: int, seed: int,
+                           batch_size: int) -> Dict[str, Dict]:
+    """Resident memory of a service process per precision, all loading the same saved artifact"""
+    with tempfile.TemporaryDirectory(prefix="precision-report-") as root:
+        models = {algorithm: ai.get_pytorch_model(algorithm) for algorithm in ai.algorithms}
+        version = module.ModelArtifactStore(root).save(models, algorithms=ai.algorithms,
+                                                       normalization=ai.models.normalization)
+        env = {
+            "MODEL_ARTIFACT_DIR": root,
+            "MODEL_ARTIFACT_VERSION": version,
+            "MODEL_INIT_MODE": "eager",
+            "INFERENCE_WORKERS": "0",
+            "PREDICTION_CACHE_SIZE": "0"
+        }
+
+        memory = {}
+        context = multiprocessing.get_context("spawn")
+        for precision in precisions:
+            # One process per precision so earlier engines do not inflate later readings
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                memory[precision] = pool.submit(serving_memory, module.__file__, dict(env, MODEL_PRECISION=precision),
+                                                samples, seed, batch_size).result()
+        return memory
+
+def run_precision_report(module: ModuleType, precisions: List[str], samples: int, seed: int,
+                         batch_size: int, repeats: int) -> Dict:
+    """Compare each precision against float32 on a fixed evaluation set"""
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "config": {"precisions": precisions, "samples": samples, "seed": seed, "batch_size": batch_size}
+    }
+
+    ai = module.WeatherAIIntegration()
+    if not ai.pytorch_available:
+        report["error"] = "PyTorch not available - precision modes only apply to the batched LSTM engine"
+        return report
+
+    models = {algorithm: ai.get_pytorch_model(algorithm) for algorithm in ai.algorithms}
+    rows = [ai.extract_features(observation) for observation in sample_observations(samples, seed=seed)]
+    timing_batch = rows[:batch_size]
+
+    precisions = ["float32"] + [p for p in precisions if p != "float32"]
+    print("   📏 Measuring service memory per precision...", file=sys.stderr)
+    memory = measure_serving_memory(module, ai, precisions, samples, seed, batch_size)
+
+    reference = None
+    report["precisions"] = {}
+    for precision in precisions:
+        print(f"   🎚️ {precision}", file=sys.stderr)
+        started = time.perf_counter()
+        engine = module.BatchedLSTMEngine(models, precision=precision, normalization=ai.models.normalization)
+        build_seconds = time.perf_counter() - started
+
+        scored = score_in_batches(engine, rows, batch_size)
+        latencies = sorted(time_calls(lambda: engine.predict(timing_batch), repeats))
+        entry = {
+            "build_ms": build_seconds * 1000,
+            "weight_bytes": engine.weight_bytes(),
+            "batch_p50_ms": percentile(latencies, 0.50) * 1000,
+            "batch_p95_ms": percentile(latencies, 0.95) * 1000,
+            **memory[precision]
+        }
+        if reference is None:
+            reference = scored
+        else:
+            baseline = report["precisions"]["float32"]
+            entry["batch_p50_vs_float32"] = entry["batch_p50_ms"] / baseline["batch_p50_ms"]
+            entry["weight_bytes_vs_float32"] = entry["weight_bytes"] / baseline["weight_bytes"]
+            if entry["model_rss_mb"] is not None and baseline["model_rss_mb"]:
+                entry["model_rss_vs_float32"] = entry["model_rss_mb"] / baseline["model_rss_mb"]
+            entry["drift"] = compare(ai, reference, scored)
+        report["precisions"][precision] = entry
+
+    notes = []
+    slower = [p for p, entry in report["precisions"].items() if entry.get("batch_p50_vs_float32", 0) > 1]
+    if slower:
+        notes.append(f"{', '.join(slower)} slower than float32 at batch size {batch_size}")
+    heavier = [p for p, entry in report["precisions"].items() if entry.get("model_rss_vs_float32", 0) >= 1]
+    if heavier:
+        notes.append(f"{', '.join(heavier)} not smaller than float32 in process memory "
+                     "(weight savings are below the service's other resident memory)")
+    if notes:
+        report["note"] = "; ".join(notes)
+    return report
+
+def run_cli(module: ModuleType, args: List[str]):
+    """Handle `--precision-report [--precisions ...] [--samples N] [--output PATH]`"""
+    parser = argparse.ArgumentParser(prog="sd-pytorch-integration.py --precision-report")
+    parser.add_argument("--precisions", default=",".join(module.MODEL_PRECISIONS),
+                        help="Comma-separated precisions to compare against float32")
+    parser.add_argument("--samples", type=int, default=5000, help="Evaluation set size")
+    parser.add_argument("--seed", type=int, default=2024, help="Evaluation set seed")
+    parser.add_argument("--batch-size", type=int, default=64, help="Rows per engine call")
+    parser.add_argument("--repeats", type=int, default=50, help="Timed calls per precision")
+    parser.add_argument("--output", default="-", help="JSON report path ('-' for stdout)")
+    options = parser.parse_args(args)
+
+    precisions = [p for p in options.precisions.split(",") if p]
+    unknown = [p for p in precisions if p not in module.MODEL_PRECISIONS]
+    if unknown:
+        parser.error(f"unknown precision(s): {', '.join(unknown)}")
+
+    print("🧪 Precision drift report...", file=sys.stderr)
+    report = run_precision_report(module, precisions, options.samples, options.seed,
+                                  options.batch_size, options.repeats)
+
+    payload = json.dumps(report, indent=2)
+    if options.output == "-":
+        print(payload)
+    else:
+        Path(options.output).write_text(payload)
+        print(f"✅ Precision report written to {options.output}", file=sys.stderr)
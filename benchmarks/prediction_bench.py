@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+WeatherNFT.live - Prediction latency and throughput benchmarks
+Measures each stage of the prediction path at increasing batch sizes and
+load-tests the FastAPI app in-process, reporting JSON for commit-to-commit
+comparison.
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import platform
+import resource
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process (Linux only, else None)"""
+    try:
+        resident_pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * resource.getpagesize() / (1024 * 1024)
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+def summarize(latencies: List[float], rows_per_call: int) -> Dict:
+    """Latency percentiles (ms) and row throughput for a list of call timings"""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "mean_ms": total / len(ordered) * 1000 if ordered else 0.0,
+        "rows_per_second": rows_per_call * len(ordered) / total if total > 0 else 0.0
+    }
+
+def time_calls(func: Callable[[], object], repeats: int, warmup: int = 2) -> List[float]:
+    """Time repeated calls to func"""
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def sample_observations(count: int, seed: int = 42) -> List[Dict]:
+    """Deterministic synthetic weather observations"""
+    rng = random.Random(seed)
+    return [
+        {
+            "temperature": rng.uniform(-30, 45),
+            "humidity": rng.uniform(0, 100),
+            "pressure": rng.uniform(950, 1050),
+            "wind_speed": rng.uniform(0, 120),
+            "visibility": rng.uniform(0, 20),
+            "cloud_cover": rng.uniform(0, 100),
+            "uv_index": rng.uniform(0, 11),
+            "precipitation": rng.uniform(0, 50)
+        }
+        for _ in range(count)
+    ]
+
+def repeats_for(batch_size: int, budget_rows: int, minimum: int = 5, maximum: int = 200) -> int:
+    """Fewer repeats for larger batches so each stage costs roughly the same"""
+    return max(minimum, min(maximum, budget_rows // batch_size))
+
+def bench_stages(ai, module: ModuleType, batch_sizes: List[int], budget_rows: int) -> Dict:
+    """Per-stage latency at each batch size"""
+    observations = sample_observations(max(batch_sizes))
+    features = [ai.extract_features(observation) for observation in observations]
+    algorithms = list(ai.algorithms)
+
+    # Fallback models exist only in fallback mode; build them so both paths are measured
+    if not ai.fallback_models:
+        ai.initialize_fallback_models()
+
+    # Measure real work, not cache hits
+    ai.prediction_cache = module.PredictionCache(max_size=0)
+
+    stages: Dict[str, Dict] = {}
+
+    def record(stage: str, batch_size: int, func: Callable[[], object]):
+        latencies = time_calls(func, repeats_for(batch_size, budget_rows))
+        stages.setdefault(stage, {})[str(batch_size)] = summarize(latencies, batch_size)
+
+    for batch_size in batch_sizes:
+        batch = observations[:batch_size]
+        rows = features[:batch_size]
+        print(f"   ⏱️ batch size {batch_size}", file=sys.stderr)
+
+        record("extract_features", batch_size, lambda: [ai.extract_features(o) for o in batch])
+        record("fallback_predict", batch_size, lambda: [[ai.fallback_predict(a, r) for a in algorithms] for r in rows])
+        if ai.fallback_engine is not None:
+            record("fallback_engine", batch_size, lambda: ai.fallback_engine.predict(rows))
+        if ai.pytorch_available:
+            record("pytorch_predict", batch_size, lambda: [[ai.pytorch_predict(a, r) for a in algorithms] for r in rows])
+            record("batched_engine", batch_size, lambda: ai.get_batched_engine().predict(rows))
+        if batch_size == 1:
+            record("predict_weather_event", batch_size, lambda: ai.predict_weather_event(batch[0]))
+        record("predict_batch", batch_size, lambda: ai.predict_batch(batch))
+
+    return stages
+
+async def load_test(app, ai, module: ModuleType, concurrency: int, total_requests: int) -> Dict:
+    """Drive /predict through an in-process ASGI client at fixed concurrency"""
+    import httpx
+
+    ai.wait_until_ready()
+    ai.prediction_cache = module.PredictionCache(max_size=0)
+    observations = sample_observations(total_requests, seed=7)
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        async def user():
+            nonlocal next_index, errors
+            while next_index < total_requests:
+                observation = observations[next_index]
+                next_index += 1
+                started = time.perf_counter()
+                response = await client.post("/predict", json=observation)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    summary = summarize(latencies, 1)
+    summary.update({
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": total_requests / elapsed if elapsed > 0 else 0.0
+    })
+    return summary
+
+def git_commit() -> Optional[str]:
+    """Commit being benchmarked, if this is a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def run_benchmarks(module: ModuleType, batch_sizes: List[int], concurrency: List[int],
+                   requests: int, budget_rows: int, skip_load: bool = False) -> Dict:
+    """Run the stage benchmarks and (optionally) the ASGI load test"""
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "batch_sizes": batch_sizes,
+            "concurrency": concurrency,
+            "requests": requests,
+            "budget_rows": budget_rows
+        }
+    }
+
+    print("🧪 Stage benchmarks...", file=sys.stderr)
+    ai = module.WeatherAIIntegration()
+    report["model_type"] = "pytorch" if ai.pytorch_available else "fallback"
+    report["stages"] = bench_stages(ai, module, batch_sizes, budget_rows)
+    report["peak_rss_mb_after_stages"] = peak_rss_mb()
+
+    if not skip_load:
+        try:
+            app, server_ai = module.create_api_server()
+        except Exception as e:
+            app, server_ai = None, None
+            print(f"⚠️ Load test skipped: {e}", file=sys.stderr)
+
+        if app is None:
+            report["load"] = None
+        else:
+            report["load"] = {}
+            for level in concurrency:
+                print(f"🚦 Load test at concurrency {level}...", file=sys.stderr)
+                try:
+                    report["load"][str(level)] = asyncio.run(load_test(app, server_ai, module, level, requests))
+                except ImportError as e:
+                    print(f"⚠️ Load test skipped (httpx required): {e}", file=sys.stderr)
+                    report["load"] = None
+                    break
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+def run_cli(module: ModuleType, args: List[str]):
+    """Handle `--benchmark [--batch-sizes ...] [--concurrency ...] [--output PATH]`"""
+    parser = argparse.ArgumentParser(prog="sd-pytorch-integration.py --benchmark")
+    parser.add_argument("--batch-sizes", default=",".join(str(size) for size in DEFAULT_BATCH_SIZES),
+                        help="Comma-separated batch sizes")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated load-test concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per load-test level")
+    parser.add_argument("--budget-rows", type=int, default=2048, help="Rows scored per stage per batch size")
+    parser.add_argument("--skip-load", action="store_true", help="Only run the stage benchmarks")
+    parser.add_argument("--output", default="-", help="JSON report path ('-' for stdout)")
+    options = parser.parse_args(args)
+
+    report = run_benchmarks(
+        module,
+        batch_sizes=[int(size) for size in options.batch_sizes.split(",") if size],
+        concurrency=[int(level) for level in options.concurrency.split(",") if level],
+        requests=options.requests,
+        budget_rows=options.budget_rows,
+        skip_load=options.skip_load
+    )
+
+    payload = json.dumps(report, indent=2)
+    if options.output == "-":
+        print(payload)
+    else:
+        Path(options.output).write_text(payload)
+        print(f"✅ Benchmark report written to {options.output}", file=sys.stderr)
@@ -6,27 +6,1648 @@ Designed to work with Stable Diffusion environment
 
 import sys
 import os
+import atexit
+import csv
 import json
+import math
+import numbers
+import time
+import asyncio
 import logging
+import functools
+import threading
+import itertools
+import multiprocessing
+import queue
+import bisect
+import hashlib
+import hmac
+import heapq
+import random
+import sqlite3
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import subprocess
 from pathlib import Path
+from array import array
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Optional fast JSON encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_dumps(payload) -> bytes:
+    """Serialize to compact JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class SplicedPayload:
+    """JSON object whose static fields are serialized once and spliced with dynamic ones"""
+    
+    def __init__(self):
+        self.key = None
+        self.prefix = b"{"
+    
+    def render(self, key, static_fields: Callable[[], Dict], dynamic_fields: Dict) -> bytes:
+        """Re-serialize the static part only when `key` changes"""
+        if key != self.key:
+            static = json_dumps(static_fields())
+            self.prefix = static[:-1] if static != b"{}" else b"{"
+            self.key = key
+        
+        dynamic = json_dumps(dynamic_fields)
+        if dynamic == b"{}":
+            return self.prefix + b"}"
+        if self.prefix == b"{":
+            return dynamic
+        return self.prefix + b"," + dynamic[1:]
+
+# Quantization step per feature (same order as extract_features) used to
+# key the prediction cache; near-identical observations share an entry
+FEATURE_QUANTIZATION = {
+    "temperature": 0.5,
+    "humidity": 1.0,
+    "pressure": 1.0,
+    "wind_speed": 0.5,
+    "visibility": 0.5,
+    "cloud_cover": 1.0,
+    "uv_index": 0.5,
+    "precipitation": 0.1
+}
+
+# Observation schema (same order as extract_features): the default imputed for
+# missing fields and the plausible range values are clamped to
+FEATURE_SCHEMA = {
+    "temperature": {"default": 20.0, "min": -90.0, "max": 60.0},
+    "humidity": {"default": 50.0, "min": 0.0, "max": 100.0},
+    "pressure": {"default": 1013.0, "min": 850.0, "max": 1090.0},
+    "wind_speed": {"default": 10.0, "min": 0.0, "max": 500.0},
+    "visibility": {"default": 10.0, "min": 0.0, "max": 100.0},
+    "cloud_cover": {"default": 0.0, "min": 0.0, "max": 100.0},
+    "uv_index": {"default": 5.0, "min": 0.0, "max": 20.0},
+    "precipitation": {"default": 0.0, "min": 0.0, "max": 500.0}
+}
+
+# Per-feature (mean, scale) fed to freshly built PyTorch models; saved
+# artifacts carry the statistics they were built with in manifest.json
+DEFAULT_FEATURE_NORMALIZATION = {
+    "mean": [15.0, 60.0, 1013.0, 15.0, 10.0, 50.0, 5.0, 2.0],
+    "scale": [12.0, 25.0, 10.0, 15.0, 5.0, 35.0, 3.0, 6.0]
+}
+
+# Latency buckets (seconds) shared by every histogram
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class StageTimer:
+    """Context manager observing elapsed time into a histogram"""
+    
+    __slots__ = ("registry", "name", "labels", "started")
+    
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: tuple):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.registry.observe_key(self.name, self.labels, time.perf_counter() - self.started)
+        return False
+
+class MetricsRegistry:
+    """Minimal in-process counters and histograms rendered in Prometheus text format"""
+    
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.descriptions: Dict[str, tuple] = {}  # name -> (type, help)
+        self.histogram_buckets: Dict[str, tuple] = {}
+        self.counters: Dict[str, Dict[tuple, float]] = {}
+        self.histograms: Dict[str, Dict[tuple, list]] = {}  # labels -> [bucket counts..., sum, count]
+        self.collectors: List = []
+    
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: Optional[tuple] = None):
+        """Register help text (and optionally non-latency buckets) for a metric"""
+        self.descriptions[name] = (metric_type, help_text)
+        if buckets is not None:
+            self.histogram_buckets[name] = buckets
+    
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """Add to a counter"""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+    
+    def observe(self, name: str, value: float, **labels):
+        """Record one histogram observation"""
+        self.observe_key(name, tuple(sorted(labels.items())), value)
+    
+    def observe_key(self, name: str, key: tuple, value: float):
+        buckets = self.histogram_buckets.get(name, self.buckets)
+        index = bisect.bisect_left(buckets, value)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+    
+    def time(self, name: str, **labels) -> StageTimer:
+        """Time a block into the named histogram"""
+        return StageTimer(self, name, tuple(sorted(labels.items())))
+    
+    def add_collector(self, collector):
+        """Register a callable returning [(name, type, help, {labels_tuple: value})] at scrape time"""
+        self.collectors.append(collector)
+    
+    @staticmethod
+    def format_labels(key: tuple, extra: tuple = ()) -> str:
+        """Render a label set as {name="value",...}"""
+        pairs = key + extra
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{label}="{value}"' for label, value in pairs) + "}"
+    
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format"""
+        lines = []
+        
+        def header(name, metric_type, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+        
+        with self.lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {name: {key: list(state) for key, state in series.items()} for name, series in self.histograms.items()}
+        
+        for name, series in sorted(counters.items()):
+            header(name, "counter", self.descriptions.get(name, ("counter", name))[1])
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{self.format_labels(key)} {value}")
+        
+        for name, series in sorted(histograms.items()):
+            header(name, "histogram", self.descriptions.get(name, ("histogram", name))[1])
+            buckets = self.histogram_buckets.get(name, self.buckets)
+            for key, state in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(buckets, state):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self.format_labels(key, (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{self.format_labels(key, (('le', '+Inf'),))} {state[-1]}")
+                lines.append(f"{name}_sum{self.format_labels(key)} {state[-2]}")
+                lines.append(f"{name}_count{self.format_labels(key)} {state[-1]}")
+        
+        for collector in self.collectors:
+            try:
+                for name, metric_type, help_text, series in collector():
+                    header(name, metric_type, help_text)
+                    for key, value in series.items():
+                        lines.append(f"{name}{self.format_labels(key)} {value}")
+            except Exception as e:
+                logger.error(f"Metrics collector error: {e}")
+        
+        return "\n".join(lines) + "\n"
+
+MODEL_PRECISIONS = ("float32", "bfloat16", "int8")
+
+class BatchedLSTMEngine:
+    """Runs every algorithm's WeatherLSTM in a single stacked forward pass
+    
+    precision "bfloat16" keeps the stacked weights in bfloat16; "int8" swaps
+    each LSTM/attention projection for a dynamically quantized Linear per
+    algorithm. Confidences are always returned as float32. Both reduced
+    precisions are memory savings (2x and ~4x smaller weights), not speedups:
+    on CPU, int8 runs one quantized matmul per algorithm and is slower than
+    the stacked float32 bmm at every batch size, and bfloat16 is slower at
+    small batches. Check `--precision-report` on the target hardware. The
+    saving is only realised once the float32 modules are released, which the
+    integration does when every model can be reloaded from an artifact.
+    """
+    
+    def __init__(self, models: Dict, precision: str = "float32", normalization: Optional[Dict] = None):
+        modules = list(models.values())
+        config = self.module_config(models)
+        self.setup(self.stack_modules(modules, config["num_layers"]), config, precision, normalization)
+    
+    @classmethod
+    def from_tensors(cls, tensors: Dict, config: Dict, precision: str = "float32",
+                     normalization: Optional[Dict] = None) -> "BatchedLSTMEngine":
+        """Engine over already stacked tensors (see stack_modules)
+        
+        float32 uses the tensors as given, so memory-mapped artifact tensors
+        stay shared file-backed pages across processes.
+        """
+        engine = cls.__new__(cls)
+        engine.setup(tensors, config, precision, normalization)
+        return engine
+    
+    @staticmethod
+    def module_config(models: Dict) -> Dict:
+        """Shape of a set of WeatherLSTM modules, in the order they are stacked"""
+        first = next(iter(models.values()))
+        return {
+            "algorithms": list(models.keys()),
+            "num_layers": first.lstm.num_layers,
+            "hidden_size": first.lstm.hidden_size,
+            "num_heads": first.attention.num_heads
+        }
+    
+    @staticmethod
+    def stack_modules(modules: List, num_layers: int) -> Dict:
+        """Every projection of every module stacked into float32 [A, ...] tensors
+        
+        Weights are pre-transposed to [A, in, out] for batched matmul and
+        biases are [A, 1, out]; the q/k/v projections are split out of
+        in_proj. The output head (output_size == 1) is [A, 1, H] and [A, 1].
+        """
+        import torch
+        
+        def stack(getter):
+            return torch.stack([getter(module).detach().float() for module in modules])
+        
+        tensors = {}
+        for layer in range(num_layers):
+            tensors[f"ih.{layer}.weight"] = stack(lambda m: getattr(m.lstm, f"weight_ih_l{layer}")).transpose(1, 2).contiguous()
+            tensors[f"ih.{layer}.bias"] = stack(
+                lambda m: getattr(m.lstm, f"bias_ih_l{layer}") + getattr(m.lstm, f"bias_hh_l{layer}")
+            ).unsqueeze(1)
+            tensors[f"hh.{layer}.weight"] = stack(lambda m: getattr(m.lstm, f"weight_hh_l{layer}")).transpose(1, 2).contiguous()
+        
+        in_w = stack(lambda m: m.attention.in_proj_weight).transpose(1, 2)
+        in_b = stack(lambda m: m.attention.in_proj_bias).unsqueeze(1)
+        for name, weight, bias in zip("qkv", in_w.chunk(3, dim=2), in_b.chunk(3, dim=2)):
+            tensors[f"{name}.weight"] = weight.contiguous()
+            tensors[f"{name}.bias"] = bias.contiguous()
+        tensors["out.weight"] = stack(lambda m: m.attention.out_proj.weight).transpose(1, 2).contiguous()
+        tensors["out.bias"] = stack(lambda m: m.attention.out_proj.bias).unsqueeze(1)
+        
+        tensors["fc.weight"] = stack(lambda m: m.fc.weight[0]).unsqueeze(1)
+        tensors["fc.bias"] = stack(lambda m: m.fc.bias)
+        return tensors
+    
+    def setup(self, tensors: Dict, config: Dict, precision: str, normalization: Optional[Dict]):
+        """Adopt stacked float32 tensors at the engine's precision"""
+        import torch
+        
+        if precision not in MODEL_PRECISIONS:
+            raise ValueError(f"Unknown model precision: {precision}")
+        
+        # Feature statistics the models expect inputs to be normalized with
+        self.norm_mean = self.norm_scale = None
+        if normalization:
+            self.norm_mean = torch.tensor(normalization["mean"], dtype=torch.float32)
+            self.norm_scale = torch.tensor(normalization["scale"], dtype=torch.float32)
+        
+        self.algorithm_names = list(config["algorithms"])
+        self.precision = precision
+        self.dtype = torch.bfloat16 if precision == "bfloat16" else torch.float32
+        self.num_layers = config["num_layers"]
+        self.hidden_size = config["hidden_size"]
+        self.num_heads = config["num_heads"]
+        self.head_dim = self.hidden_size // self.num_heads
+        
+        def cast(name):
+            return tensors[name].to(self.dtype)  # no copy for float32
+        
+        # Projections as (weight [A, in, out], bias [A, 1, out] or None)
+        self.projections = {}
+        for layer in range(self.num_layers):
+            self.projections[("ih", layer)] = (cast(f"ih.{layer}.weight"), cast(f"ih.{layer}.bias"))
+            self.projections[("hh", layer)] = (cast(f"hh.{layer}.weight"), None)
+        for name in ("q", "k", "v", "out"):
+            self.projections[name] = (cast(f"{name}.weight"), cast(f"{name}.bias"))
+        self.fc_w = cast("fc.weight")
+        self.fc_b = cast("fc.bias")
+        
+        # int8: one dynamically quantized Linear per algorithm and projection;
+        # the float copies are dropped so only int8 weights stay resident
+        self.quantized = {}
+        if precision == "int8":
+            for key, (weight, bias) in self.projections.items():
+                self.quantized[key] = [
+                    self.quantize_linear(weight[a].t(), None if bias is None else bias[a, 0])
+                    for a in range(len(self.algorithm_names))
+                ]
+            self.projections = {}
+    
+    def subset(self, names) -> "BatchedLSTMEngine":
+        """Engine scoring only `names`, sliced from this one's (possibly quantized) weights"""
+        index = [self.algorithm_names.index(name) for name in names]
+        engine = self.__class__.__new__(self.__class__)
+        engine.__dict__.update(self.__dict__)
+        engine.algorithm_names = list(names)
+        engine.projections = {
+            key: (weight[index], None if bias is None else bias[index])
+            for key, (weight, bias) in self.projections.items()
+        }
+        engine.quantized = {key: [modules[a] for a in index] for key, modules in self.quantized.items()}
+        engine.fc_w = self.fc_w[index]
+        engine.fc_b = self.fc_b[index]
+        return engine
+    
+    @staticmethod
+    def quantize_linear(weight, bias):
+        """Dynamic int8 Linear from a float [out, in] weight (per-channel symmetric)"""
+        import torch
+        from torch.ao.nn.quantized.dynamic import Linear as DynamicLinear
+        
+        scales = (weight.abs().amax(dim=1) / 127.0).clamp(min=1e-12).double()
+        zero_points = torch.zeros(weight.shape[0], dtype=torch.long)
+        qweight = torch.quantize_per_channel(weight.float(), scales, zero_points, 0, torch.qint8)
+        
+        linear = DynamicLinear(weight.shape[1], weight.shape[0], dtype=torch.qint8)
+        linear.set_weight_bias(qweight, None if bias is None else bias.float())
+        return linear
+    
+    def linear(self, x, key):
+        """Apply projection `key` per algorithm: x [A or 1, N, in] -> [A, N, out]"""
+        import torch
+        
+        if self.quantized:
+            modules = self.quantized[key]
+            if x.shape[0] == 1:
+                return torch.stack([module(x[0]) for module in modules])
+            return torch.stack([module(x[a]) for a, module in enumerate(modules)])
+        
+        weight, bias = self.projections[key]
+        if bias is None:
+            return torch.matmul(x, weight)
+        if x.shape[0] != weight.shape[0]:
+            return torch.matmul(x, weight) + bias
+        return torch.baddbmm(bias, x, weight)
+    
+    def weight_bytes(self) -> int:
+        """Resident bytes of the engine's weights"""
+        total = self.fc_w.numel() * self.fc_w.element_size() + self.fc_b.numel() * self.fc_b.element_size()
+        for weight, bias in self.projections.values():
+            total += weight.numel() * weight.element_size()
+            if bias is not None:
+                total += bias.numel() * bias.element_size()
+        for modules in self.quantized.values():
+            for module in modules:
+                weight, bias = module._weight_bias()
+                total += weight.numel() * weight.element_size()
+                if bias is not None:
+                    total += bias.numel() * bias.element_size()
+        return total
+    
+    def forward(self, inputs):
+        """Score a [N, T, F] feature tensor with every algorithm, returning [N, A]"""
+        import torch
+        
+        inputs = inputs.to(self.dtype)
+        batch_size, seq_len, _ = inputs.shape
+        hidden = self.hidden_size
+        num_algorithms = len(self.algorithm_names)
+        
+        # Stacked LSTM layers; layer input starts shared across algorithms
+        layer_input = inputs.reshape(1, batch_size * seq_len, -1)
+        for layer in range(self.num_layers):
+            projected = self.linear(layer_input, ("ih", layer))
+            projected = projected.view(num_algorithms, batch_size, seq_len, 4 * hidden)
+            
+            h = inputs.new_zeros(num_algorithms, batch_size, hidden)
+            c = inputs.new_zeros(num_algorithms, batch_size, hidden)
+            steps = []
+            for t in range(seq_len):
+                gates = projected[:, :, t] + self.linear(h, ("hh", layer))
+                i, f, g, o = gates.chunk(4, dim=2)
+                c = torch.sigmoid(f) * c + torch.sigmoid(i) * torch.tanh(g)
+                h = torch.sigmoid(o) * torch.tanh(c)
+                steps.append(h)
+            layer_input = torch.stack(steps, dim=2).reshape(num_algorithms, batch_size * seq_len, hidden)
+        
+        last_step = layer_input.view(num_algorithms, batch_size, seq_len, hidden)[:, :, -1]
+        
+        # Self-attention; only the last position feeds the output head, so
+        # queries are computed for that position alone. Projections stay 3-D
+        # (bmm) so weights are never expanded across the batch
+        q = self.linear(last_step, "q")
+        k = self.linear(layer_input, "k")
+        v = self.linear(layer_input, "v")
+        
+        q = q.view(num_algorithms, batch_size, self.num_heads, self.head_dim)
+        k = k.view(num_algorithms, batch_size, seq_len, self.num_heads, self.head_dim)
+        v = v.view(num_algorithms, batch_size, seq_len, self.num_heads, self.head_dim)
+        
+        scores = torch.einsum("anhd,anthd->anht", q, k) / (self.head_dim ** 0.5)
+        attended = torch.einsum("anht,anthd->anhd", torch.softmax(scores, dim=-1), v)
+        attended = attended.reshape(num_algorithms, batch_size, hidden)
+        attn_out = self.linear(attended, "out")
+        
+        logits = (attn_out * self.fc_w).sum(dim=-1) + self.fc_b
+        return torch.sigmoid(logits).transpose(0, 1).float()
+    
+    def normalize(self, inputs):
+        """Apply the models' feature normalization to a float32 [..., F] tensor"""
+        if self.norm_mean is None:
+            return inputs
+        return (inputs - self.norm_mean) / self.norm_scale
+    
+    def prepare_inputs(self, feature_rows):
+        """Feature rows as a contiguous, normalized float32 [N, F] tensor"""
+        import torch
+        
+        return self.normalize(torch.as_tensor(feature_rows, dtype=torch.float32)).contiguous()
+    
+    def predict(self, feature_rows: List[List[float]]) -> List[List[float]]:
+        """Score a batch of feature rows, returning one confidence per algorithm per row"""
+        import torch
+        
+        input_tensor = self.prepare_inputs(feature_rows).unsqueeze(1)
+        with torch.no_grad():
+            output = self.forward(input_tensor)
+        return output.clamp(0.0, 1.0).tolist()
+    
+    def step(self, inputs, h, c, keys, values, valid):
+        """Advance N sequences by one observation each, reusing carried state
+        
+        inputs [N, F]; h, c [L, A, N, H]; keys, values [A, N, W, H] hold the
+        attention keys/values of earlier positions and valid [N, W] marks the
+        usable ones. Returns (confidences [N, A], h, c, new key, new value),
+        the new key/value being [A, N, H].
+        """
+        import torch
+        
+        num_algorithms = len(self.algorithm_names)
+        batch_size = inputs.shape[0]
+        inputs = self.normalize(inputs)
+        inputs, h, c, keys, values = (tensor.to(self.dtype) for tensor in (inputs, h, c, keys, values))
+        
+        # One LSTM step per layer from the carried hidden state
+        layer_input = inputs.unsqueeze(0)
+        new_h, new_c = [], []
+        for layer in range(self.num_layers):
+            gates = self.linear(layer_input, ("ih", layer)) + self.linear(h[layer], ("hh", layer))
+            i, f, g, o = gates.chunk(4, dim=2)
+            cell = torch.sigmoid(f) * c[layer] + torch.sigmoid(i) * torch.tanh(g)
+            hidden = torch.sigmoid(o) * torch.tanh(cell)
+            new_h.append(hidden)
+            new_c.append(cell)
+            layer_input = hidden
+        
+        # Attend from the new position over the cached window plus itself
+        q = self.linear(layer_input, "q")
+        k_new = self.linear(layer_input, "k")
+        v_new = self.linear(layer_input, "v")
+        
+        all_k = torch.cat([keys, k_new.unsqueeze(2)], dim=2)
+        all_v = torch.cat([values, v_new.unsqueeze(2)], dim=2)
+        mask = torch.cat([valid, valid.new_ones(batch_size, 1)], dim=1)
+        
+        positions = all_k.shape[2]
+        q = q.view(num_algorithms, batch_size, self.num_heads, self.head_dim)
+        all_k = all_k.view(num_algorithms, batch_size, positions, self.num_heads, self.head_dim)
+        all_v = all_v.view(num_algorithms, batch_size, positions, self.num_heads, self.head_dim)
+        
+        scores = torch.einsum("anhd,anthd->anht", q, all_k) / (self.head_dim ** 0.5)
+        scores = scores.masked_fill(~mask[None, :, None, :], float("-inf"))
+        attended = torch.einsum("anht,anthd->anhd", torch.softmax(scores, dim=-1), all_v)
+        attended = attended.reshape(num_algorithms, batch_size, self.hidden_size)
+        attn_out = self.linear(attended, "out")
+        
+        logits = (attn_out * self.fc_w).sum(dim=-1) + self.fc_b
+        confidences = torch.sigmoid(logits).transpose(0, 1).float().clamp(0.0, 1.0)
+        return confidences, torch.stack(new_h), torch.stack(new_c), k_new, v_new
+
+class VectorizedFallbackEngine:
+    """NumPy fallback scorer holding every algorithm's weights in one matrix"""
+    
+    def __init__(self, fallback_models: Dict):
+        import numpy as np
+        
+        self.np = np
+        self.algorithm_names = list(fallback_models.keys())
+        width = max(len(model["weights"]) for model in fallback_models.values())
+        
+        # [A, K] weights (zero-padded) and [A] biases
+        self.weights = np.zeros((len(self.algorithm_names), width), dtype=np.float64)
+        for row, name in enumerate(self.algorithm_names):
+            model_weights = fallback_models[name]["weights"]
+            self.weights[row, :len(model_weights)] = model_weights
+        
+        # Algorithms each column belongs to; padding must not be multiplied in
+        # (inf * 0 would turn a finite scalar-path sum into NaN)
+        widths = np.array([len(fallback_models[name]["weights"]) for name in self.algorithm_names])
+        self.column_algorithms = [
+            None if (widths > column).all() else np.flatnonzero(widths > column)
+            for column in range(width)
+        ]
+        self.bias = np.array([fallback_models[name]["bias"] for name in self.algorithm_names], dtype=np.float64)
+        self.decay = np.frompyfunc(self.scalar_decay, 1, 1)
+    
+    @staticmethod
+    def scalar_decay(exponent: float) -> float:
+        """Same power as fallback_predict, with overflow reported as inf"""
+        try:
+            return pow(2.718, exponent)
+        except OverflowError:
+            return float("inf")
+    
+    def predict(self, feature_rows: List[List[float]]) -> List[List[float]]:
+        """Score a batch of feature rows, returning one confidence per algorithm per row"""
+        np = self.np
+        features = np.asarray(feature_rows, dtype=np.float64)
+        width = self.weights.shape[1]
+        
+        # Weighted sum accumulated feature by feature over the whole [N, A]
+        # block; the scalar path's summation order is kept so both agree exactly
+        prediction = np.zeros((features.shape[0], len(self.algorithm_names)), dtype=np.float64)
+        with np.errstate(over="ignore", invalid="ignore"):
+            for column in range(min(width, features.shape[1])):
+                algorithms = self.column_algorithms[column]
+                if algorithms is None:
+                    prediction += features[:, column:column + 1] * self.weights[:, column]
+                else:
+                    prediction[:, algorithms] += features[:, column:column + 1] * self.weights[algorithms, column]
+            prediction += self.bias
+        
+        # Sigmoid activation. The power goes through libm like the scalar
+        # path (NumPy's SIMD pow can differ by an ulp); a finite exponent that
+        # overflows maps to the scalar path's 0.5 default (an infinite one
+        # does not raise there)
+        with np.errstate(over="ignore", invalid="ignore"):
+            decay = self.decay(-prediction).astype(np.float64)
+            confidence = np.minimum(np.maximum(1 / (1 + decay), 0.1), 0.95)
+        confidence[np.isinf(decay) & np.isfinite(prediction)] = 0.5
+        
+        return confidence.tolist()
+
+class FeatureSchema:
+    """Validates, imputes and clamps a batch of observations into a feature matrix
+    
+    Fields must be real numbers, Python or NumPy (numeric strings are accepted
+    for CSV input). Missing or null fields take the schema default and
+    out-of-range values are clamped; bools, containers, non-numeric strings
+    and infinities reject the row before any model runs.
+    """
+    
+    def __init__(self, schema: Optional[Dict] = None):
+        schema = schema or FEATURE_SCHEMA
+        self.fields = tuple(schema)
+        self.defaults = [float(schema[name]["default"]) for name in self.fields]
+        self.lower = [float(schema[name]["min"]) for name in self.fields]
+        self.upper = [float(schema[name]["max"]) for name in self.fields]
+        try:
+            import numpy as np
+            self.np = np
+            self.default_array = np.array(self.defaults)
+            self.lower_array = np.array(self.lower)
+            self.upper_array = np.array(self.upper)
+        except ImportError:
+            self.np = None
+    
+    def parse(self, weather_data) -> Tuple[Optional[List[float]], Optional[str]]:
+        """Raw field values (NaN where missing) or the reason the row is rejected"""
+        if not isinstance(weather_data, dict):
+            return None, getattr(weather_data, "error", "observation must be a JSON object")
+        values = []
+        for name in self.fields:
+            value = weather_data.get(name)
+            try:
+                if isinstance(value, (numbers.Real, str)) and not isinstance(value, bool):
+                    value = float(value)
+                elif value is None:
+                    value = math.nan
+                else:
+                    return None, f"{name} must be a number, got {type(value).__name__}"
+            except (ValueError, OverflowError):
+                return None, f"{name} must be a number, got {value!r}"
+            if value in (math.inf, -math.inf):
+                return None, f"{name} must be finite"
+            values.append(value)
+        return values, None
+    
+    def prepare(self, batch: List) -> Tuple[object, object, List[Optional[str]]]:
+        """Feature matrix, validity mask and per-row errors (None where valid)
+        
+        With NumPy the matrix is a contiguous float32 [N, F] array and the
+        mask a bool array, ready for the engines; without it they are lists.
+        Rejected rows hold the schema defaults so the matrix stays dense.
+        """
+        parsed = [self.parse(weather_data) for weather_data in batch]
+        errors = [error for _, error in parsed]
+        
+        if self.np is not None:
+            np = self.np
+            matrix = np.array([values if values is not None else self.defaults for values, _ in parsed],
+                              dtype=np.float64).reshape(len(parsed), len(self.fields))
+            matrix = np.where(np.isnan(matrix), self.default_array, matrix)
+            np.clip(matrix, self.lower_array, self.upper_array, out=matrix)
+            valid = np.array([error is None for error in errors], dtype=bool)
+            return np.ascontiguousarray(matrix, dtype=np.float32), valid, errors
+        
+        matrix = [
+            [min(max(value, low), high) if value == value else default
+             for value, default, low, high in zip(values, self.defaults, self.lower, self.upper)]
+            if values is not None else list(self.defaults)
+            for values, _ in parsed
+        ]
+        return matrix, [error is None for error in errors], errors
+
+def select_rows(rows, indices: List[int]):
+    """Rows at `indices` of a feature matrix (NumPy array or list of rows)"""
+    if len(indices) == len(rows) and indices == list(range(len(rows))):
+        return rows
+    if isinstance(rows, list):
+        return [rows[index] for index in indices]
+    return rows[indices]
+
+def row_lists(rows) -> List[List[float]]:
+    """A feature matrix as plain Python lists (for the scalar paths)"""
+    return rows if isinstance(rows, list) else rows.tolist()
+
+# Event-type and rarity thresholds; override with a JSON file named by
+# CLASSIFICATION_CONFIG to retune without code changes
+DEFAULT_CLASSIFICATION = {
+    # Ascending, strict ">" (confidence above 0.8 is the most severe type)
+    "event_type_thresholds": [0.6, 0.8],
+    # Most severe first
+    "event_types": {
+        "ThermalDrift-v2": ["heat_wave", "cold_snap", "thermal_anomaly"],
+        "StormChaser-v4": ["thunderstorm", "tornado", "hurricane"],
+        "EcoBalance-v1": ["climate_shift", "seasonal_anomaly", "eco_change"],
+        "AuroraPredictor-v3": ["aurora_borealis", "solar_storm", "magnetic_anomaly"],
+        "AquaDetect-v2": ["heavy_rain", "flood", "drought"]
+    },
+    "default_event_types": ["weather_event"],
+    # Ascending, inclusive ">=" (labels has one more entry than thresholds)
+    "rarity_thresholds": [0.50, 0.70, 0.85, 0.95],
+    "rarity_labels": ["common", "uncommon", "rare", "epic", "legendary"]
+}
+
+class ClassificationTables:
+    """Event-type and rarity thresholds compiled into sorted arrays and label tables"""
+    
+    VECTORIZE_MIN_ROWS = 16
+    
+    def __init__(self, config: Optional[Dict] = None):
+        config = {**DEFAULT_CLASSIFICATION, **(config or {})}
+        self.event_thresholds = tuple(sorted(float(t) for t in config["event_type_thresholds"]))
+        self.rarity_thresholds = tuple(sorted(float(t) for t in config["rarity_thresholds"]))
+        self.rarity_labels = tuple(sys.intern(label) for label in config["rarity_labels"])
+        if len(self.rarity_labels) != len(self.rarity_thresholds) + 1:
+            raise ValueError("rarity_labels needs exactly one more entry than rarity_thresholds")
+        
+        levels = len(self.event_thresholds) + 1
+        self.default_event_labels = self.level_labels(config["default_event_types"], levels)
+        self.event_labels = {
+            algorithm: self.level_labels(types, levels)
+            for algorithm, types in config["event_types"].items()
+        }
+        self.tables: Dict[tuple, tuple] = {}
+        
+        try:
+            import numpy as np
+            self.np = np
+            self.event_array = np.array(self.event_thresholds)
+            self.rarity_array = np.array(self.rarity_thresholds)
+            self.rarity_table = np.array(self.rarity_labels, dtype=object)
+        except ImportError:
+            self.np = None
+    
+    @staticmethod
+    def level_labels(types: List[str], levels: int) -> tuple:
+        """Labels indexed by level, lowest confidence first; short lists reuse the first type"""
+        types = [sys.intern(t) for t in types]
+        return tuple(
+            types[levels - 1 - level] if levels - 1 - level < len(types) else types[0]
+            for level in range(levels)
+        )
+    
+    def event_type(self, algorithm: str, confidence: float) -> str:
+        """Scalar event-type lookup"""
+        if confidence != confidence:  # NaN compares false everywhere: lowest level
+            level = 0
+        else:
+            level = bisect.bisect_left(self.event_thresholds, confidence)
+        return self.event_labels.get(algorithm, self.default_event_labels)[level]
+    
+    def rarity(self, confidence: float) -> str:
+        """Scalar rarity lookup"""
+        if confidence != confidence:
+            return self.rarity_labels[0]
+        return self.rarity_labels[bisect.bisect_right(self.rarity_thresholds, confidence)]
+    
+    def event_table(self, algorithms: tuple):
+        """[A, levels] object array of event labels for an algorithm order"""
+        table = self.tables.get(algorithms)
+        if table is None:
+            table = self.tables[algorithms] = self.np.array(
+                [self.event_labels.get(algorithm, self.default_event_labels) for algorithm in algorithms],
+                dtype=object
+            )
+        return table
+    
+    def classify(self, algorithms: tuple, confidence_rows: List[List[float]]) -> Tuple[List[List[str]], List[List[str]]]:
+        """Event types and rarities for a whole batch (rows x algorithms)"""
+        if self.np is None or len(confidence_rows) < self.VECTORIZE_MIN_ROWS:
+            return (
+                [[self.event_type(a, c) for a, c in zip(algorithms, row)] for row in confidence_rows],
+                [[self.rarity(c) for c in row] for row in confidence_rows]
+            )
+        
+        np = self.np
+        confidences = np.asarray(confidence_rows, dtype=np.float64)
+        nan = np.isnan(confidences)
+        event_levels = np.where(nan, 0, np.searchsorted(self.event_array, confidences, side="left"))
+        rarity_levels = np.where(nan, 0, np.searchsorted(self.rarity_array, confidences, side="right"))
+        
+        events = self.event_table(algorithms)[np.arange(len(algorithms)), event_levels]
+        return events.tolist(), self.rarity_table[rarity_levels].tolist()
+    
+    def to_config(self) -> Dict:
+        """Active thresholds in config-file form"""
+        return {
+            "event_type_thresholds": list(self.event_thresholds),
+            "rarity_thresholds": list(self.rarity_thresholds),
+            "rarity_labels": list(self.rarity_labels)
+        }
+
+class LocationContext:
+    """Rolling window for one location: a ring of feature rows plus, in
+    PyTorch mode, the carried LSTM state and per-position attention keys/values
+    
+    `state_rows` counts the observations folded into the carried state since
+    it was last primed from the window.
+    """
+    
+    __slots__ = ("features", "next_slot", "size", "h", "c", "keys", "values", "engine", "state_rows")
+    
+    def __init__(self, window: int, width: int):
+        self.features = array("d", bytes(8 * window * width))
+        self.next_slot = 0
+        self.size = 0
+        self.h = self.c = self.keys = self.values = None
+        self.engine = None
+        self.state_rows = 0
+    
+    def clear_state(self):
+        """Forget model state (kept observations can be replayed)"""
+        self.h = self.c = self.keys = self.values = None
+        self.engine = None
+
+class LocationContextStore:
+    """Bounded per-location observation windows for incremental sequence inference"""
+    
+    def __init__(self, window: int = 24, max_locations: int = 1024, width: int = 8):
+        self.window = max(1, window)
+        self.max_locations = max(1, max_locations)
+        self.width = width
+        self.contexts: "OrderedDict[str, LocationContext]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+        self.replays = 0
+    
+    def get(self, location: str) -> LocationContext:
+        """Fetch (or create) a location's context, evicting the least recently seen"""
+        context = self.contexts.get(location)
+        if context is None:
+            context = self.contexts[location] = LocationContext(self.window, self.width)
+            while len(self.contexts) > self.max_locations:
+                self.contexts.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.contexts.move_to_end(location)
+        return context
+    
+    def window_rows(self, context: LocationContext) -> List[List[float]]:
+        """A context's observations, oldest first"""
+        start = (context.next_slot - context.size) % self.window
+        rows = []
+        for offset in range(context.size):
+            slot = (start + offset) % self.window
+            rows.append(list(context.features[slot * self.width:(slot + 1) * self.width]))
+        return rows
+    
+    def record(self, context: LocationContext, features: List[float]) -> int:
+        """Append an observation; returns the ring slot it occupies"""
+        slot = context.next_slot
+        context.features[slot * self.width:(slot + 1) * self.width] = array("d", features)
+        context.next_slot = (slot + 1) % self.window
+        context.size = min(context.size + 1, self.window)
+        return slot
+    
+    def clear_states(self):
+        """Drop model state everywhere (e.g. after models reload)"""
+        with self.lock:
+            for context in self.contexts.values():
+                context.clear_state()
+    
+    def stats(self) -> Dict:
+        """Occupancy and eviction counters"""
+        return {
+            "window": self.window,
+            "locations": len(self.contexts),
+            "max_locations": self.max_locations,
+            "evictions": self.evictions,
+            "replays": self.replays
+        }
+
+# Meteorological seasons by month (northern hemisphere)
+SEASONS = ("winter", "winter", "spring", "spring", "spring", "summer",
+           "summer", "summer", "autumn", "autumn", "autumn", "winter")
+
+class EnsemblePruner:
+    """Opt-in early exit for the algorithm ensemble
+    
+    Algorithms are ranked by their win counts for the observation's
+    (region, season) bucket and "topk" mode scores just the k most frequent
+    winners, with every `explore_every`-th row scored in full to keep the win
+    counts honest. The winner is approximate: a skipped algorithm may have won.
+    
+    There is no exact (bound-based) mode: the algorithms' confidences sit
+    within a few hundredths of each other, so no ceiling cheaper than scoring
+    them falls below the best score and nothing would be skipped.
+    """
+    
+    MODES = ("off", "topk")
+    
+    def __init__(self, mode: str = "off", top_k: int = 2, explore_every: int = 20, max_buckets: int = 256):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown early-exit mode: {mode}")
+        self.mode = mode
+        self.top_k = max(1, top_k)
+        self.explore_every = max(0, explore_every)
+        self.max_buckets = max_buckets
+        self.lock = threading.Lock()
+        self.explore_counter = itertools.count()
+        self.bucket_wins: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.total_wins: Dict[str, int] = {}
+        self.rows = 0
+        self.explored_rows = 0
+        self.evaluations = 0
+        self.skipped = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+    
+    @staticmethod
+    def bucket(weather_data: Dict) -> Tuple[str, str]:
+        """(region, season) of an observation; "*" where unknown"""
+        region = str(weather_data.get("region") or "*")
+        season = weather_data.get("season")
+        if not season:
+            season = "*"
+            stamp = weather_data.get("timestamp") or weather_data.get("date")
+            if stamp:
+                try:
+                    month = datetime.fromisoformat(str(stamp).replace("Z", "+00:00")).month
+                    southern = float(weather_data.get("latitude", 0)) < 0
+                    season = SEASONS[(month + 5) % 12 if southern else month - 1]
+                except (ValueError, TypeError):
+                    pass
+        return region, str(season)
+    
+    def order(self, bucket: Tuple[str, str], algorithms: Tuple[str, ...]) -> List[str]:
+        """Algorithms by bucket win count, then overall win count, then declaration order"""
+        counts = self.bucket_wins.get(bucket, {})
+        total = self.total_wins
+        return sorted(algorithms, key=lambda name: (-counts.get(name, 0), -total.get(name, 0), algorithms.index(name)))
+    
+    def plan(self, bucket: Tuple[str, str], algorithms: Tuple[str, ...]) -> Tuple[List[str], bool]:
+        """Algorithms to score for a row, and whether the row is scored in full"""
+        if self.mode == "topk" and self.explore_every and next(self.explore_counter) % self.explore_every == 0:
+            return list(algorithms), True
+        order = self.order(bucket, algorithms)
+        return order[:self.top_k], False
+    
+    def record(self, bucket: Tuple[str, str], winner: Optional[str], evaluated: int, total: int, explored: bool):
+        """Count the work done for one row and, when the winner is exact, learn from it"""
+        with self.lock:
+            self.rows += 1
+            self.explored_rows += explored
+            self.evaluations += evaluated
+            self.skipped += total - evaluated
+            if winner is None or not explored:
+                return
+            if bucket not in self.bucket_wins and len(self.bucket_wins) >= self.max_buckets:
+                bucket = ("*", bucket[1])
+            counts = self.bucket_wins.setdefault(bucket, {})
+            counts[winner] = counts.get(winner, 0) + 1
+            self.total_wins[winner] = self.total_wins.get(winner, 0) + 1
+    
+    def stats(self) -> Dict:
+        with self.lock:
+            possible = self.evaluations + self.skipped
+            total_wins = sum(self.total_wins.values())
+            return {
+                "mode": self.mode,
+                "top_k": self.top_k if self.mode == "topk" else None,
+                "rows": self.rows,
+                "explored_rows": self.explored_rows,
+                "algorithm_evaluations": self.evaluations,
+                "skipped_evaluations": self.skipped,
+                "skip_rate": self.skipped / possible if possible else 0.0,
+                "win_rates": {name: wins / total_wins for name, wins in self.total_wins.items()},
+                "buckets": len(self.bucket_wins)
+            }
+
+class PredictionCache:
+    """Size-bounded LRU/TTL cache of predictions keyed on quantized features"""
+    
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 60.0, quantization: Optional[Dict] = None):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.steps = list((quantization or FEATURE_QUANTIZATION).values())
+        self.entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        try:
+            import numpy as np
+            self.np = np
+            self.step_array = np.array([step or 1.0 for step in self.steps])
+            self.quantized_columns = np.array([bool(step) for step in self.steps])
+        except ImportError:
+            self.np = None
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+    
+    def key(self, features: List[float]) -> Optional[tuple]:
+        """Quantize a feature row into a cache key (None if uncacheable)"""
+        if not self.enabled:
+            return None
+        try:
+            return tuple(round(f / step) if step else f for f, step in zip(features, self.steps))
+        except (ValueError, OverflowError):
+            return None  # NaN / inf features
+    
+    def keys(self, rows) -> List[Optional[tuple]]:
+        """Cache keys for every row of a feature matrix, quantized in one pass for arrays"""
+        if not self.enabled:
+            return [None] * len(rows)
+        if isinstance(rows, list) or self.np is None:
+            return [self.key(features) for features in rows]
+        np = self.np
+        values = rows.astype(np.float64)
+        quantized = np.where(self.quantized_columns, np.rint(values / self.step_array), values)
+        finite = np.isfinite(quantized).all(axis=1)
+        return [tuple(key) if ok else None for key, ok in zip(quantized.tolist(), finite.tolist())]
+    
+    def get(self, key: Optional[tuple]) -> Optional[Dict]:
+        """Return a copy of the cached prediction, or None on miss/expiry"""
+        if key is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+    
+    def put(self, key: Optional[tuple], result: Dict):
+        """Store a prediction, evicting the least recently used entries"""
+        if key is None:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, dict(result))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every cached prediction (e.g. after models reload)"""
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+class ModelArtifactStore:
+    """Versioned on-disk store of per-algorithm model weights
+    
+    Layout: <root>/<version>/<algorithm>.pt plus engine.pt (every
+    algorithm's weights already stacked and transposed for BatchedLSTMEngine)
+    and manifest.json, with <root>/LATEST naming the newest version. Files are
+    loaded memory-mapped; a float32 engine computes straight from engine.pt,
+    so several worker processes share the same file-backed pages.
+    """
+    
+    def __init__(self, root: str, version: str = "latest"):
+        self.root = Path(root)
+        self.requested_version = version
+    
+    def resolve_version(self, requested: Optional[str] = None) -> Optional[str]:
+        """Resolve `requested` or the configured version ("latest" follows the LATEST marker)"""
+        requested = requested or self.requested_version
+        if requested != "latest":
+            return requested if (self.root / requested).is_dir() else None
+        
+        marker = self.root / "LATEST"
+        if marker.is_file():
+            version = marker.read_text().strip()
+            if (self.root / version).is_dir():
+                return version
+        return None
+    
+    def artifact_path(self, algorithm: str, version: Optional[str] = None) -> Optional[Path]:
+        """Path of an algorithm's weights file, or None if it does not exist"""
+        version = version or self.resolve_version()
+        if version is None:
+            return None
+        path = self.root / version / f"{algorithm}.pt"
+        return path if path.is_file() else None
+    
+    def load_state(self, algorithm: str, version: Optional[str] = None) -> Optional[Dict]:
+        """Memory-map an algorithm's saved weights, or None if no artifact exists"""
+        return self.load_tensors(self.artifact_path(algorithm, version))
+    
+    def load_engine(self, version: Optional[str] = None) -> Optional[Tuple[Dict, Dict]]:
+        """Memory-map a version's stacked engine tensors: (tensors, config), or None if it has none"""
+        version = version or self.resolve_version()
+        manifest = self.load_manifest(version)
+        engine = manifest.get("engine") if manifest else None
+        if not engine:
+            return None
+        tensors = self.load_tensors(self.root / version / engine["weights"])
+        return (tensors, engine) if tensors is not None else None
+    
+    @staticmethod
+    def load_tensors(path: Optional[Path]) -> Optional[Dict]:
+        """torch.load a tensor dict memory-mapped (None if the file is missing)"""
+        import torch
+        
+        if path is None or not path.is_file():
+            return None
+        try:
+            return torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+        except TypeError:
+            # torch < 2.1 has no mmap loading; read the file instead
+            return torch.load(path, weights_only=True, map_location="cpu")
+    
+    def load_manifest(self, version: Optional[str] = None) -> Optional[Dict]:
+        """A version's manifest.json, or None if it has none"""
+        version = version or self.resolve_version()
+        path = self.root / version / "manifest.json" if version else None
+        if path is None or not path.is_file():
+            return None
+        with open(path) as f:
+            return json.load(f)
+    
+    def algorithm_configs(self, version: Optional[str] = None) -> Optional[Dict]:
+        """Algorithm configs recorded with a version (older artifacts have none)"""
+        manifest = self.load_manifest(version)
+        if not manifest:
+            return None
+        configs = {
+            algorithm: entry["config"]
+            for algorithm, entry in manifest.get("algorithms", {}).items()
+            if "config" in entry
+        }
+        return configs if len(configs) == len(manifest.get("algorithms", {})) and configs else None
+    
+    def save(self, models: Dict, algorithms: Optional[Dict] = None, normalization: Optional[Dict] = None) -> str:
+        """Write every model, plus their stacked engine tensors, as a new version and point LATEST at it"""
+        import torch
+        
+        version = datetime.now().strftime("v%Y%m%d-%H%M%S")
+        staging = self.root / f".{version}.tmp"
+        staging.mkdir(parents=True, exist_ok=False)
+        
+        manifest = {
+            "version": version,
+            "created": datetime.now().isoformat(),
+            "torch_version": torch.__version__,
+            "features": list(FEATURE_SCHEMA),
+            "normalization": normalization,
+            "algorithms": {}
+        }
+        for algorithm, model in models.items():
+            torch.save(model.state_dict(), staging / f"{algorithm}.pt")
+            entry = {"weights": f"{algorithm}.pt"}
+            if algorithms and algorithm in algorithms:
+                entry["config"] = algorithms[algorithm]
+            manifest["algorithms"][algorithm] = entry
+        
+        config = BatchedLSTMEngine.module_config(models)
+        tensors = BatchedLSTMEngine.stack_modules(list(models.values()), config["num_layers"])
+        torch.save({name: tensor.clone() for name, tensor in tensors.items()}, staging / "engine.pt")
+        manifest["engine"] = {"weights": "engine.pt", **config}
+        
+        with open(staging / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+        
+        # Publish atomically: rename the staged directory, then swap the marker
+        staging.rename(self.root / version)
+        marker_tmp = self.root / "LATEST.tmp"
+        marker_tmp.write_text(version)
+        os.replace(marker_tmp, self.root / "LATEST")
+        
+        logger.info(f"💾 Saved {len(models)} model artifacts to {self.root / version}")
+        return version
+    
+    def info(self) -> Dict:
+        """Store location and the version in use"""
+        return {
+            "root": str(self.root),
+            "requested_version": self.requested_version,
+            "resolved_version": self.resolve_version()
+        }
+
+def inference_worker_main(worker_id: int, config: Dict, requests, responses):
+    """Worker process: hold the models and score slots of the shared ring buffer"""
+    from multiprocessing import shared_memory
+    import numpy as np
+    
+    for key, value in config["env"].items():
+        os.environ[key] = value
+    try:
+        import torch
+        torch.set_num_threads(config["threads"])
+    except ImportError:
+        pass
+    
+    ai = WeatherAIIntegration()
+    input_memory = shared_memory.SharedMemory(name=config["input_name"])
+    output_memory = shared_memory.SharedMemory(name=config["output_name"])
+    inputs = np.ndarray(config["input_shape"], dtype=np.float32, buffer=input_memory.buf)
+    outputs = np.ndarray(config["output_shape"], dtype=np.float64, buffer=output_memory.buf)
+    responses.put(("ready", os.getpid(), ai.model_status))
+    
+    try:
+        while True:
+            message = requests.get()
+            if message is None:
+                break
+            slot, rows = message
+            started = time.perf_counter()
+            error = None
+            try:
+                outputs[slot, :rows] = ai.score_features_local(inputs[slot, :rows])
+            except Exception as e:
+                error = str(e)
+            responses.put((slot, time.perf_counter() - started, error))
+    finally:
+        del inputs, outputs
+        input_memory.close()
+        output_memory.close()
+
+class InferenceWorker:
+    """Parent-side handle for one worker process and its shared-memory ring"""
+    
+    def __init__(self, worker_id: int, context, slots: int, max_rows: int, num_features: int, num_algorithms: int):
+        from multiprocessing import shared_memory
+        import numpy as np
+        
+        self.worker_id = worker_id
+        self.input_shape = (slots, max_rows, num_features)
+        self.output_shape = (slots, max_rows, num_algorithms)
+        self.input_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(self.input_shape)) * 4)
+        self.output_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(self.output_shape)) * 8)
+        self.inputs = np.ndarray(self.input_shape, dtype=np.float32, buffer=self.input_memory.buf)
+        self.outputs = np.ndarray(self.output_shape, dtype=np.float64, buffer=self.output_memory.buf)
+        
+        self.requests = context.Queue()
+        self.responses = context.Queue()
+        self.free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.pending: Dict[int, Future] = {}
+        self.pending_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.dead = False
+        self.on_exit: Optional[Callable[["InferenceWorker"], None]] = None
+        self.process = None
+        self.pid = None
+        
+        # Utilization
+        self.started_at = time.perf_counter()
+        self.busy_seconds = 0.0
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+    
+    def start(self, context, config: Dict):
+        """Launch the worker process attached to this handle's shared memory"""
+        config = {
+            **config,
+            "input_name": self.input_memory.name,
+            "output_name": self.output_memory.name,
+            "input_shape": self.input_shape,
+            "output_shape": self.output_shape
+        }
+        self.process = context.Process(
+            target=inference_worker_main,
+            args=(self.worker_id, config, self.requests, self.responses),
+            name=f"inference-worker-{self.worker_id}",
+            daemon=True
+        )
+        self.process.start()
+        threading.Thread(target=self.read_responses, name=f"inference-reader-{self.worker_id}", daemon=True).start()
+    
+    def read_responses(self):
+        """Complete pending futures as the worker reports finished slots"""
+        while True:
+            try:
+                message = self.responses.get(timeout=0.5)
+            except queue.Empty:
+                if self.process is not None and not self.process.is_alive():
+                    self.handle_exit()
+                    return
+                continue
+            if message is None:
+                return
+            if message[0] == "ready":
+                self.pid = message[1]
+                self.ready.set()
+                continue
+            
+            slot, busy, error = message
+            self.busy_seconds += busy
+            self.batches += 1
+            with self.pending_lock:
+                future, rows = self.pending.pop(slot)
+            if error:
+                self.errors += 1
+                result = None
+            else:
+                result = self.outputs[slot, :rows].tolist()
+            
+            # Copy out before freeing the slot so callers never hold ring slots
+            self.free_slots.put(slot)
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+    
+    def handle_exit(self):
+        """The process died: fail everything it still owed and tell the pool"""
+        with self.pending_lock:
+            self.dead = True
+            pending, self.pending = self.pending, {}
+        exitcode = self.process.exitcode if self.process is not None else None
+        logger.error(f"❌ Inference worker {self.worker_id} exited (code {exitcode}) with {len(pending)} batches pending")
+        for future, _ in pending.values():
+            future.set_exception(RuntimeError(f"Inference worker {self.worker_id} exited (code {exitcode})"))
+        if self.on_exit is not None:
+            self.on_exit(self)
+    
+    def submit(self, rows: List[List[float]]) -> Future:
+        """Write rows into a free slot and hand the slot to the worker"""
+        while True:
+            if self.dead:
+                raise RuntimeError(f"Inference worker {self.worker_id} is not running")
+            try:
+                slot = self.free_slots.get(timeout=0.5)  # waits while the ring is full
+                break
+            except queue.Empty:
+                continue
+        self.inputs[slot, :len(rows)] = rows
+        future = Future()
+        with self.pending_lock:
+            if self.dead:
+                raise RuntimeError(f"Inference worker {self.worker_id} is not running")
+            self.pending[slot] = (future, len(rows))
+        self.rows += len(rows)
+        self.requests.put((slot, len(rows)))
+        return future
+    
+    def stats(self) -> Dict:
+        """Per-worker utilization"""
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.pid,
+            "alive": bool(self.process and self.process.is_alive()) and not self.dead,
+            "batches": self.batches,
+            "rows": self.rows,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "utilization": self.busy_seconds / elapsed if elapsed > 0 else 0.0,
+            "free_slots": self.free_slots.qsize()
+        }
+    
+    def close(self):
+        """Stop the worker process and release its shared memory"""
+        try:
+            self.requests.put(None)
+            if self.process is not None:
+                self.process.join(timeout=5)
+                if self.process.is_alive():
+                    self.process.terminate()
+        finally:
+            self.responses.put(None)
+            del self.inputs, self.outputs
+            self.input_memory.close()
+            self.input_memory.unlink()
+            self.output_memory.close()
+            self.output_memory.unlink()
+
+class InferenceWorkerPool:
+    """Process pool where each worker holds the models; rows travel through shared memory
+    
+    A worker that exits is restarted after an exponential backoff. One that
+    keeps exiting (max_restarts times, each within stable_seconds of starting)
+    is given up on and the pool reports itself unhealthy.
+    """
+    
+    def __init__(self, num_workers: int, algorithms: int, threads_per_worker: Optional[int] = None,
+                 slots: int = 8, max_rows: int = 256, start_method: str = "spawn", result_timeout: float = 30.0,
+                 max_restarts: int = 5, restart_backoff: float = 1.0, max_restart_backoff: float = 60.0,
+                 stable_seconds: float = 300.0):
+        self.context = multiprocessing.get_context(start_method)
+        self.slots = slots
+        self.max_rows = max_rows
+        self.algorithms = algorithms
+        self.result_timeout = result_timeout
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.stable_seconds = stable_seconds
+        self.crash_counts: Dict[int, int] = {}
+        self.failed_workers: List[int] = []
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        self.workers = [self.new_worker(worker_id) for worker_id in range(num_workers)]
+        self.next_index = itertools.count()
+        self.dispatch_lock = threading.Lock()
+        self.config: Optional[Dict] = None
+        self.restarts = 0
+        self.closed = False
+    
+    def new_worker(self, worker_id: int) -> InferenceWorker:
+        worker = InferenceWorker(worker_id, self.context, self.slots, self.max_rows,
+                                 num_features=len(FEATURE_SCHEMA), num_algorithms=self.algorithms)
+        worker.on_exit = self.replace_worker
+        return worker
+    
+    def start(self, env: Dict[str, str], timeout: float = 120.0) -> bool:
+        """Spawn every worker and wait until they have loaded their models"""
+        self.config = {"threads": self.threads_per_worker, "env": env}
+        for worker in self.workers:
+            worker.start(self.context, self.config)
+        deadline = time.monotonic() + timeout
+        return all(worker.ready.wait(max(0.0, deadline - time.monotonic())) for worker in self.workers)
+    
+    @property
+    def healthy(self) -> bool:
+        """False once any worker has exhausted its restarts"""
+        return not self.failed_workers
+    
+    def replace_worker(self, dead: InferenceWorker):
+        """Schedule a restart for a worker whose process exited, backing off on repeated crashes"""
+        with self.dispatch_lock:
+            if self.closed:
+                return
+            # A worker that stayed up for stable_seconds starts a fresh crash streak
+            crashes = 1
+            if time.perf_counter() - dead.started_at < self.stable_seconds:
+                crashes += self.crash_counts.get(dead.worker_id, 0)
+            self.crash_counts[dead.worker_id] = crashes
+            if crashes > self.max_restarts:
+                self.failed_workers.append(dead.worker_id)
+                logger.error(f"❌ Inference worker {dead.worker_id} exited {crashes} times in a row - "
+                             f"not restarting it, worker pool unhealthy")
+                return
+        
+        delay = min(self.restart_backoff * 2 ** (crashes - 1), self.max_restart_backoff)
+        logger.info(f"🔁 Restarting inference worker {dead.worker_id} in {delay:.1f}s "
+                    f"(restart {crashes} of {self.max_restarts})")
+        timer = threading.Timer(delay, self.restart_worker, args=(dead,))
+        timer.daemon = True
+        timer.start()
+    
+    def restart_worker(self, dead: InferenceWorker):
+        """Swap an exited worker for a fresh one; it takes traffic once its models load"""
+        with self.dispatch_lock:
+            if self.closed:
+                return  # close() stops the handle still in self.workers
+            replacement = self.new_worker(dead.worker_id)
+            self.workers[self.workers.index(dead)] = replacement
+            self.restarts += 1
+        try:
+            replacement.start(self.context, self.config)
+        except Exception as e:
+            logger.error(f"❌ Could not restart inference worker {dead.worker_id}: {e}")
+            self.replace_worker(replacement)
+        finally:
+            dead.close()
+    
+    def pick_worker(self) -> InferenceWorker:
+        """Next ready worker, round robin; raises if none is running"""
+        with self.dispatch_lock:
+            for _ in range(len(self.workers)):
+                worker = self.workers[next(self.next_index) % len(self.workers)]
+                if worker.ready.is_set() and not worker.dead:
+                    return worker
+        raise RuntimeError("No inference worker is running")
+    
+    def score(self, feature_rows: List[List[float]]) -> List[List[float]]:
+        """Spread rows over the workers in ring-sized chunks and gather confidences
+        
+        Raises if a worker dies or misses result_timeout, so callers can
+        score in-process instead.
+        """
+        submitted = []
+        for start in range(0, len(feature_rows), self.max_rows):
+            chunk = feature_rows[start:start + self.max_rows]
+            submitted.append(self.pick_worker().submit(chunk))
+        
+        confidences = []
+        deadline = time.monotonic() + self.result_timeout
+        for future in submitted:
+            try:
+                confidences.extend(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeout:
+                raise TimeoutError(f"Inference workers did not answer within {self.result_timeout}s") from None
+        return confidences
+    
+    def stats(self) -> Dict:
+        """Pool configuration and per-worker utilization"""
+        return {
+            "workers": len(self.workers),
+            "threads_per_worker": self.threads_per_worker,
+            "max_rows_per_slot": self.max_rows,
+            "restarts": self.restarts,
+            "healthy": self.healthy,
+            "failed_workers": list(self.failed_workers),
+            "per_worker": [worker.stats() for worker in self.workers]
+        }
+    
+    def close(self):
+        """Stop every worker (safe to call more than once)"""
+        with self.dispatch_lock:
+            if self.closed:
+                return
+            self.closed = True
+        for worker in self.workers:
+            try:
+                worker.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Error stopping inference worker {worker.worker_id}: {e}")
+
+class ModelVersion:
+    """One generation of algorithm configs and models, published as a unit
+    
+    Requests pin the active version for their whole duration, so a reload
+    can swap in a new one while in-flight requests finish on the old.
+    """
+    
+    def __init__(self, version: str, algorithms: Dict, artifact_version: Optional[str] = None):
+        self.version = version
+        self.algorithms = algorithms
+        self.artifact_version = artifact_version
+        self.pytorch_models: Dict = {}
+        self.batched_engine: Optional[BatchedLSTMEngine] = None
+        self.fallback_models: Dict = {}
+        self.fallback_engine: Optional[VectorizedFallbackEngine] = None
+        self.model_sources: Dict[str, str] = {}
+        self.worker_pool: Optional[InferenceWorkerPool] = None
+        self.subset_engines: Dict[Tuple[str, ...], object] = {}
+        self.normalization: Optional[Dict] = None
+        self.activated_at: Optional[str] = None
+        self.retired_at: Optional[str] = None
+        self.readers = 0
+        self.readers_lock = threading.Condition()
+    
+    def acquire(self):
+        with self.readers_lock:
+            self.readers += 1
+    
+    def release(self):
+        with self.readers_lock:
+            self.readers -= 1
+            if self.readers == 0:
+                self.readers_lock.notify_all()
+    
+    def wait_for_readers(self, timeout: Optional[float] = None) -> bool:
+        """Block until no request holds this version"""
+        with self.readers_lock:
+            return self.readers_lock.wait_for(lambda: self.readers == 0, timeout)
+    
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "artifact_version": self.artifact_version,
+            "algorithms": len(self.algorithms),
+            "activated_at": self.activated_at,
+            "retired_at": self.retired_at,
+            "in_flight": self.readers
+        }
+
+def model_version_attribute(name: str) -> property:
+    """Integration attribute stored on the pinned (or active) ModelVersion"""
+    return property(
+        lambda self: getattr(self.models, name),
+        lambda self, value: setattr(self.models, name, value)
+    )
+
+def pins_model_version(method):
+    """Run an integration method against one model version, even across a reload"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.pinned_models():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class WeatherAIIntegration:
     """Weather AI integration for SD environment"""
     
-    def __init__(self):
+    # Per-version state lives on ModelVersion so a reload swaps it as a unit
+    algorithms = model_version_attribute("algorithms")
+    pytorch_models = model_version_attribute("pytorch_models")
+    batched_engine = model_version_attribute("batched_engine")
+    fallback_models = model_version_attribute("fallback_models")
+    fallback_engine = model_version_attribute("fallback_engine")
+    model_sources = model_version_attribute("model_sources")
+    worker_pool = model_version_attribute("worker_pool")
+    
+    def __init__(self, background: bool = False):
         self.model_status = "initializing"
-        self.sd_env_active = self.check_sd_environment()
-        self.pytorch_available = self.check_pytorch()
+        self.model_lock = threading.Lock()
+        self.prediction_cache = PredictionCache(
+            max_size=int(os.environ.get("PREDICTION_CACHE_SIZE", "4096")),
+            ttl_seconds=float(os.environ.get("PREDICTION_CACHE_TTL", "60"))
+        )
         
-        # Weather algorithms config
-        self.algorithms = {
+        self.artifact_store = ModelArtifactStore(
+            os.environ.get("MODEL_ARTIFACT_DIR", str(Path(__file__).resolve().parent / "models")),
+            os.environ.get("MODEL_ARTIFACT_VERSION", "latest")
+        )
+        self.context_store = LocationContextStore(
+            window=int(os.environ.get("CONTEXT_WINDOW", "24")),
+            max_locations=int(os.environ.get("CONTEXT_MAX_LOCATIONS", "1024"))
+        )
+        self.metrics = MetricsRegistry()
+        self.describe_metrics()
+        self.classification = self.load_classification()
+        self.feature_schema = FeatureSchema()
+        self.torch_capture: Optional["TorchTraceCapture"] = None
+        early_exit = os.environ.get("EARLY_EXIT_MODE", "off")
+        if early_exit not in EnsemblePruner.MODES:
+            logger.warning(f"⚠️ Unknown EARLY_EXIT_MODE {early_exit!r} - early exit disabled")
+            early_exit = "off"
+        self.pruner = EnsemblePruner(
+            mode=early_exit,
+            top_k=int(os.environ.get("EARLY_EXIT_TOP_K", "2")),
+            explore_every=int(os.environ.get("EARLY_EXIT_EXPLORE_EVERY", "20"))
+        )
+        self.health_payload = SplicedPayload()
+        self.model_info_payload = SplicedPayload()
+        
+        # Startup: "eager" builds every model in parallel, "lazy" on first use
+        self.model_init_mode = os.environ.get("MODEL_INIT_MODE", "eager")
+        self.startup_timeout = float(os.environ.get("MODEL_STARTUP_TIMEOUT", "60"))
+        
+        # Batched engine precision: float32, bfloat16 or int8 (dynamic quantization)
+        self.precision = os.environ.get("MODEL_PRECISION", "float32")
+        if self.precision not in MODEL_PRECISIONS:
+            logger.warning(f"⚠️ Unknown MODEL_PRECISION {self.precision!r} - using float32")
+            self.precision = "float32"
+        self.startup_timings: Dict[str, float] = {}
+        self.ready_event = threading.Event()
+        self.sd_env_active = False
+        self.pytorch_available = False
+        
+        # Model registry: the active version, per-thread pins and retired versions
+        self.model_pin = threading.local()
+        self.reload_lock = threading.Lock()
+        self.model_generation = 1
+        self.retired_models: List[ModelVersion] = []
+        
+        # Weather algorithms config (MODEL_ALGORITHMS overrides with a JSON object)
+        algorithms_json = os.environ.get("MODEL_ALGORITHMS")
+        self.active_models = ModelVersion("local-1", json.loads(algorithms_json) if algorithms_json else {
             "ThermalDrift-v2": {
                 "specialization": "Temperature anomalies and thermal flows",
                 "accuracy": 94.2,
@@ -57,9 +1678,257 @@ class WeatherAIIntegration:
                 "model_type": "GRU",
                 "status": "ready"
             }
-        }
+        })
+        
+        if background:
+            # Heavy imports and model builds happen off the caller's thread so
+            # the server can bind and answer /health while warming
+            self.model_status = "warming"
+            threading.Thread(target=self.start, name="model-warmup", daemon=True).start()
+        else:
+            self.start()
+    
+    def start(self):
+        """Probe the environment and initialize models, timing each phase"""
+        try:
+            self.sd_env_active = self.run_startup_phase("sd_environment_probe", self.check_sd_environment)
+            self.pytorch_available = self.run_startup_phase("pytorch_import", self.check_pytorch)
+            if self.pytorch_available:
+                self.adopt_artifact_version()
+            self.run_startup_phase("model_initialization", self.initialize_models)
+            self.name_model_version(self.active_models)
+            self.release_float_modules(self.active_models)
+            self.active_models.activated_at = datetime.now().isoformat()
+        finally:
+            self.ready_event.set()
         
-        self.initialize_models()
+        total = sum(self.startup_timings[phase] for phase in ("sd_environment_probe", "pytorch_import", "model_initialization"))
+        logger.info(f"⏱️ Startup complete in {total * 1000:.1f} ms")
+        
+        # Optional process pool; requests are served in-process until it is up
+        num_workers = int(os.environ.get("INFERENCE_WORKERS", "0"))
+        if num_workers > 0 and self.model_status == "ready":
+            self.run_startup_phase("worker_pool", lambda: self.start_worker_pool(num_workers))
+    
+    def start_worker_pool(self, num_workers: int):
+        """Start the multi-process inference backend"""
+        try:
+            # Workers must score with the same weights: pin them to an artifact
+            env = {"INFERENCE_WORKERS": "0", "MODEL_INIT_MODE": "eager", "MODEL_ALGORITHMS": json.dumps(self.algorithms)}
+            if self.pytorch_available:
+                if all(self.model_sources.get(algorithm) == "artifact" for algorithm in self.algorithms):
+                    version = self.models.artifact_version
+                else:
+                    version = self.save_model_artifacts()
+                env["MODEL_ARTIFACT_DIR"] = str(self.artifact_store.root)
+                env["MODEL_ARTIFACT_VERSION"] = version
+            
+            threads = os.environ.get("INFERENCE_WORKER_THREADS")
+            pool = InferenceWorkerPool(
+                num_workers,
+                algorithms=len(self.algorithms),
+                threads_per_worker=int(threads) if threads else None,
+                slots=int(os.environ.get("INFERENCE_WORKER_SLOTS", "8")),
+                max_rows=int(os.environ.get("INFERENCE_WORKER_MAX_ROWS", "256")),
+                start_method=os.environ.get("INFERENCE_WORKER_START_METHOD", "spawn"),
+                result_timeout=float(os.environ.get("INFERENCE_WORKER_TIMEOUT", "30")),
+                max_restarts=int(os.environ.get("INFERENCE_WORKER_MAX_RESTARTS", "5")),
+                restart_backoff=float(os.environ.get("INFERENCE_WORKER_RESTART_BACKOFF", "1"))
+            )
+            if not pool.start(env):
+                pool.close()
+                logger.error("❌ Inference workers did not become ready - staying in-process")
+                return
+            
+            self.worker_pool = pool
+            atexit.register(pool.close)
+            logger.info(f"✅ Inference worker pool ready ({num_workers} workers x {pool.threads_per_worker} threads)")
+        except Exception as e:
+            logger.error(f"❌ Could not start inference worker pool: {e}")
+    
+    @property
+    def models(self) -> ModelVersion:
+        """Model version pinned by the current thread, else the active one"""
+        return getattr(self.model_pin, "version", None) or self.active_models
+    
+    @contextmanager
+    def pinned_models(self, version: Optional[ModelVersion] = None):
+        """Pin a model version (default: the current one) for this thread"""
+        previous = getattr(self.model_pin, "version", None)
+        version = version or previous or self.active_models
+        version.acquire()
+        self.model_pin.version = version
+        try:
+            yield version
+        finally:
+            self.model_pin.version = previous
+            version.release()
+    
+    def adopt_artifact_version(self, models: Optional[ModelVersion] = None):
+        """Point a model version at the configured artifacts, taking their algorithm configs"""
+        models = models or self.models
+        models.artifact_version = self.artifact_store.resolve_version()
+        if models.artifact_version is None:
+            return
+        models.version = models.artifact_version
+        configs = self.artifact_store.algorithm_configs(models.artifact_version)
+        if configs and not os.environ.get("MODEL_ALGORITHMS"):
+            models.algorithms = configs
+    
+    def name_model_version(self, models: ModelVersion):
+        """Give locally built models a weight-derived id
+        
+        Separate processes (the API server and a --schedule writer) then
+        share a version id exactly when they score with the same weights.
+        Versions loaded wholly from an artifact keep the artifact's name.
+        """
+        if models.artifact_version is not None and models.version == models.artifact_version \
+                and "fresh" not in models.model_sources.values():
+            return
+        digest = hashlib.sha1(json.dumps([models.algorithms, models.normalization, self.precision],
+                                         sort_keys=True).encode("utf-8"))
+        if models.pytorch_models:
+            for algorithm in sorted(models.pytorch_models):
+                for key, tensor in models.pytorch_models[algorithm].state_dict().items():
+                    digest.update(f"{algorithm}/{key}".encode("utf-8"))
+                    digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+        elif self.pytorch_available:
+            digest.update(os.urandom(16))  # lazily built models get random weights in every process
+        else:
+            digest.update(json.dumps(models.fallback_models, sort_keys=True).encode("utf-8"))
+        models.version = f"local-{digest.hexdigest()[:12]}"
+    
+    def release_float_modules(self, models: ModelVersion):
+        """Drop a reduced-precision version's float32 modules once its engine is built
+        
+        Only artifact-backed modules are released: they reload from the
+        artifact if a per-algorithm path needs one. Fresh weights cannot be
+        rebuilt, so they stay resident.
+        """
+        if self.precision == "float32" or not models.pytorch_models or models.batched_engine is None:
+            return
+        if any(models.model_sources.get(algorithm) != "artifact" for algorithm in models.algorithms):
+            logger.warning(f"⚠️ {self.precision} models were not loaded from an artifact - float32 weights stay "
+                           f"resident (save them with --save-models to release them)")
+            return
+        with self.model_lock:
+            models.pytorch_models = {}
+        logger.info(f"   🧹 Released float32 modules ({self.precision} engine serves all algorithms)")
+    
+    def reload_models(self, version: Optional[str] = None, algorithms: Optional[Dict] = None,
+                      warmup_rows: int = 8) -> Dict:
+        """Build, warm and atomically activate a new model version
+        
+        Weights come from artifact `version` (default: the configured one);
+        algorithm configs from `algorithms`, that version's manifest or the
+        active version, in that order. Requests keep being served by the
+        active version throughout and in-flight ones finish on it.
+        """
+        with self.reload_lock:
+            started = time.perf_counter()
+            current = self.active_models
+            
+            artifact_version = None
+            if self.pytorch_available:
+                artifact_version = self.artifact_store.resolve_version(version)
+                if version and artifact_version is None:
+                    raise ValueError(f"Unknown model version: {version}")
+            
+            self.model_generation += 1
+            configs = algorithms or (artifact_version and self.artifact_store.algorithm_configs(artifact_version))
+            candidate = ModelVersion(
+                artifact_version if artifact_version and not algorithms else f"local-{self.model_generation}",
+                dict(configs or current.algorithms),
+                artifact_version
+            )
+            logger.info(f"🔁 Loading model version {candidate.version} ({len(candidate.algorithms)} algorithms)...")
+            
+            with self.pinned_models(candidate):
+                if self.pytorch_available:
+                    self.initialize_pytorch_models()
+                    engine = self.get_batched_engine()
+                    self.initialize_fallback_models()
+                else:
+                    self.initialize_fallback_models()
+                    engine = self.fallback_engine
+                
+                # Warm up (and sanity-check) with synthetic observations
+                rng = random.Random(0)
+                rows = [[rng.random() for _ in range(8)] for _ in range(max(1, warmup_rows))]
+                scores = engine.predict(rows) if engine is not None else [
+                    [self.fallback_predict(algorithm, row) for algorithm in candidate.algorithms] for row in rows
+                ]
+                if any(len(row) != len(candidate.algorithms) for row in scores):
+                    raise RuntimeError("Warm-up produced the wrong number of confidences")
+                self.build_predictions(scores)
+                
+                if current.worker_pool is not None:
+                    self.start_worker_pool(len(current.worker_pool.workers))
+                self.name_model_version(candidate)
+                self.release_float_modules(candidate)
+            
+            # Publish: a single reference swap; readers pinned to `current` keep it
+            candidate.activated_at = datetime.now().isoformat()
+            self.active_models = candidate
+            self.prediction_cache.clear()
+            current.retired_at = candidate.activated_at
+            self.retired_models = (self.retired_models + [current])[-4:]
+            threading.Thread(target=self.drain_model_version, args=(current,), name="model-drain", daemon=True).start()
+            
+            elapsed = time.perf_counter() - started
+            logger.info(f"✅ Model version {candidate.version} active ({elapsed * 1000:.1f} ms, replaced {current.version})")
+            return {"version": candidate.version, "previous_version": current.version, "load_ms": round(elapsed * 1000, 1)}
+    
+    def drain_model_version(self, version: ModelVersion):
+        """Release a retired version's worker pool once its last request finishes"""
+        version.wait_for_readers()
+        if version.worker_pool is not None:
+            version.worker_pool.close()
+            version.worker_pool = None
+        logger.info(f"♻️ Model version {version.version} drained")
+    
+    def run_startup_phase(self, phase: str, func):
+        """Run one startup phase and record how long it took"""
+        started = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.startup_timings[phase] = time.perf_counter() - started
+            logger.info(f"⏱️ {phase}: {self.startup_timings[phase] * 1000:.1f} ms")
+    
+    def wait_until_ready(self) -> bool:
+        """Block until startup finishes (or times out)"""
+        return self.ready_event.wait(self.startup_timeout)
+    
+    def load_classification(self, config: Optional[Dict] = None) -> ClassificationTables:
+        """Compile thresholds from `config`, CLASSIFICATION_CONFIG or the defaults"""
+        if config is None:
+            path = os.environ.get("CLASSIFICATION_CONFIG")
+            if path:
+                with open(path) as f:
+                    config = json.load(f)
+                logger.info(f"📐 Classification thresholds loaded from {path}")
+        return ClassificationTables(config)
+    
+    def reload_classification(self, config: Optional[Dict] = None):
+        """Swap in new thresholds; cached predictions are dropped"""
+        self.classification = self.load_classification(config)
+        self.prediction_cache.clear()
+    
+    def describe_metrics(self):
+        """Register help text for the hot-path metrics"""
+        metrics = self.metrics
+        metrics.describe("weather_ai_stage_seconds", "histogram", "Time spent per prediction stage (per batch)")
+        metrics.describe("weather_ai_inference_seconds", "histogram", "Model inference time per batch by engine")
+        metrics.describe("weather_ai_algorithm_inference_seconds", "histogram", "Single-algorithm inference time (scalar paths)")
+        metrics.describe("weather_ai_batch_rows", "histogram", "Rows per predict_batch call",
+                         buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+        metrics.describe("weather_ai_predictions_total", "counter", "Predictions by outcome")
+        metrics.describe("weather_ai_algorithm_evaluations_total", "counter", "Rows scored per algorithm")
+        metrics.describe("weather_ai_algorithm_wins_total", "counter", "Predictions won per algorithm")
+        metrics.describe("weather_ai_algorithm_skips_total", "counter", "Rows where early exit skipped an algorithm")
+        metrics.describe("weather_ai_scalar_fallbacks_total", "counter", "Fallbacks from a faster engine to a slower path")
+        metrics.describe("weather_ai_errors_total", "counter", "Errors by stage")
     
     def check_sd_environment(self) -> bool:
         """Check if SD environment is active"""
@@ -87,6 +1956,9 @@ class WeatherAIIntegration:
     
     def check_pytorch(self) -> bool:
         """Check PyTorch availability"""
+        if os.environ.get("AI_FORCE_FALLBACK", "0") == "1":
+            logger.info("ℹ️ AI_FORCE_FALLBACK=1 - using fallback mode")
+            return False
         try:
             import torch
             logger.info(f"✅ PyTorch {torch.__version__} available")
@@ -105,6 +1977,7 @@ class WeatherAIIntegration:
             else:
                 self.initialize_fallback_models()
                 
+            self.invalidate_prediction_cache()
             self.model_status = "ready"
             logger.info("✅ AI models initialized successfully")
             
@@ -142,11 +2015,121 @@ class WeatherAIIntegration:
                 output = self.fc(self.dropout(attn_out[:, -1, :]))
                 return torch.sigmoid(output)
         
-        # Initialize models for each algorithm
+        self.model_factory = WeatherLSTM
         self.pytorch_models = {}
-        for algorithm in self.algorithms.keys():
-            self.pytorch_models[algorithm] = WeatherLSTM()
-            logger.info(f"   ✅ {algorithm} model loaded")
+        self.batched_engine = None
+        self.models.normalization = self.resolve_normalization()
+        
+        if self.model_init_mode == "lazy":
+            logger.info("   💤 Lazy mode - models are built on first use")
+            return
+        
+        # Initialize models for each algorithm in parallel, into the version being built
+        version = self.models
+        
+        def build(algorithm: str):
+            with self.pinned_models(version):
+                return self.build_pytorch_model(algorithm)
+        
+        with ThreadPoolExecutor(max_workers=len(self.algorithms), thread_name_prefix="model-init") as pool:
+            models = pool.map(build, self.algorithms.keys())
+            self.pytorch_models = dict(zip(self.algorithms.keys(), models))
+        
+        self.get_batched_engine()
+    
+    def resolve_normalization(self) -> Optional[Dict]:
+        """Feature statistics for the version being built: its artifact's, else the defaults
+        
+        Artifacts saved before statistics were recorded keep raw inputs.
+        """
+        artifact_version = self.models.artifact_version
+        manifest = self.artifact_store.load_manifest(artifact_version) if artifact_version else None
+        if manifest is not None:
+            return manifest.get("normalization")
+        return DEFAULT_FEATURE_NORMALIZATION
+    
+    def build_pytorch_model(self, algorithm: str):
+        """Load one algorithm's model from its artifact, or build it fresh"""
+        import torch
+        
+        started = time.perf_counter()
+        state = None
+        try:
+            state = self.artifact_store.load_state(algorithm, self.models.artifact_version)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load {algorithm} artifact: {e}")
+        
+        if state is not None:
+            # Skip random init: build on the meta device and adopt the
+            # memory-mapped tensors directly
+            try:
+                with torch.device("meta"):
+                    model = self.model_factory()
+                model.load_state_dict(state, assign=True)
+            except TypeError:
+                # torch < 2.1 cannot assign; pay for the init and copy instead
+                model = self.model_factory()
+                model.load_state_dict(state)
+            self.model_sources[algorithm] = "artifact"
+        else:
+            model = self.model_factory()
+            self.model_sources[algorithm] = "fresh"
+        model.eval()
+        
+        self.startup_timings[f"model:{algorithm}"] = time.perf_counter() - started
+        logger.info(
+            f"   ✅ {algorithm} model loaded from {self.model_sources[algorithm]} "
+            f"({self.startup_timings[f'model:{algorithm}'] * 1000:.1f} ms)"
+        )
+        return model
+    
+    def save_model_artifacts(self) -> str:
+        """Persist the current weights as a new artifact version"""
+        models = {algorithm: self.get_pytorch_model(algorithm) for algorithm in self.algorithms}
+        return self.artifact_store.save(models, algorithms=self.algorithms, normalization=self.models.normalization)
+    
+    def get_pytorch_model(self, algorithm: str):
+        """Return an algorithm's model, building it on first use"""
+        model = self.pytorch_models.get(algorithm)
+        if model is None:
+            with self.model_lock:
+                model = self.pytorch_models.get(algorithm)
+                if model is None:
+                    model = self.build_pytorch_model(algorithm)
+                    self.pytorch_models[algorithm] = model
+        return model
+    
+    def get_batched_engine(self) -> BatchedLSTMEngine:
+        """Return the batched engine: from the artifact's stacked tensors, else built from the models"""
+        if self.batched_engine is None:
+            stacked = self.load_engine_artifact()
+            models = None if stacked else {algorithm: self.get_pytorch_model(algorithm) for algorithm in self.algorithms}
+            with self.model_lock:
+                if self.batched_engine is None:
+                    if stacked:
+                        engine = BatchedLSTMEngine.from_tensors(*stacked, precision=self.precision,
+                                                                normalization=self.models.normalization)
+                    else:
+                        engine = BatchedLSTMEngine(models, precision=self.precision,
+                                                   normalization=self.models.normalization)
+                    self.batched_engine = engine
+                    logger.info(f"   ⚡ Batched engine ready ({len(self.algorithms)} algorithms per pass, "
+                                f"{self.precision}, {'artifact' if stacked else 'stacked from models'})")
+        return self.batched_engine
+    
+    def load_engine_artifact(self) -> Optional[Tuple[Dict, Dict]]:
+        """The artifact version's stacked engine tensors, if they cover exactly these algorithms"""
+        version = self.models.artifact_version
+        if version is None or "fresh" in self.model_sources.values():
+            return None
+        try:
+            stacked = self.artifact_store.load_engine(version)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load engine artifact: {e}")
+            return None
+        if stacked is None or stacked[1]["algorithms"] != list(self.algorithms):
+            return None
+        return stacked
     
     def initialize_fallback_models(self):
         """Initialize fallback models (no PyTorch)"""
@@ -161,81 +2144,421 @@ class WeatherAIIntegration:
                 "initialized": True
             }
             logger.info(f"   ✅ {algorithm} fallback model ready")
+        
+        try:
+            self.fallback_engine = VectorizedFallbackEngine(self.fallback_models)
+            logger.info("   ⚡ Vectorized NumPy fallback engine ready")
+        except ImportError:
+            self.fallback_engine = None
+            logger.warning("⚠️ NumPy not available - using scalar fallback")
+    
+    def predict_weather_event(self, weather_data: Dict) -> Dict:
+        """Predict weather events using AI"""
+        return self.predict_batch([weather_data])[0]
+    
+    @pins_model_version
+    def predict_batch(self, weather_batch: List[Dict]) -> List[Dict]:
+        """Predict weather events for many observations in one pass"""
+        if not self.wait_until_ready():
+            return [self.error_result(RuntimeError("Models are still warming up")) for _ in weather_batch]
+        
+        metrics = self.metrics
+        version = self.models.version
+        results: List[Optional[Dict]] = [None] * len(weather_batch)
+        row_indices = []
+        row_keys = []
+        
+        with metrics.time("weather_ai_stage_seconds", stage="feature_extraction"):
+            # Invalid rows are rejected here, before any model runs
+            rows, valid, errors = self.feature_schema.prepare(weather_batch)
+            for index, error in enumerate(errors):
+                if error is not None:
+                    metrics.inc("weather_ai_errors_total", stage="validation")
+                    results[index] = self.invalid_result(error)
+        
+        with metrics.time("weather_ai_stage_seconds", stage="cache_lookup"):
+            for index, (key, ok) in enumerate(zip(self.prediction_cache.keys(rows), valid)):
+                if not ok:
+                    continue
+                if key is not None:
+                    key = (version, key)  # never serve another model version's result
+                cached = self.prediction_cache.get(key)
+                if cached is not None:
+                    results[index] = cached
+                    continue
+                
+                row_indices.append(index)
+                row_keys.append(key)
+        
+        # Rows still to score, as one contiguous matrix
+        feature_rows = select_rows(rows, row_indices)
+        if row_indices:
+            # Early exit runs in-process; a worker pool always scores every algorithm
+            pruned = self.pruner.enabled and self.worker_pool is None
+            try:
+                with metrics.time("weather_ai_stage_seconds", stage="inference"):
+                    if pruned:
+                        scored = self.score_pruned(feature_rows, [weather_batch[index] for index in row_indices])
+                    else:
+                        confidences = self.score_features(feature_rows)
+                with metrics.time("weather_ai_stage_seconds", stage="classification"):
+                    predictions = self.build_pruned_predictions(scored) if pruned else self.build_predictions(confidences)
+                    for row, (index, key, result) in enumerate(zip(row_indices, row_keys, predictions)):
+                        results[index] = result
+                        # A pruned result depends on the row's bucket and plan; only
+                        # fully evaluated rows are the same for every caller
+                        if not pruned or len(scored[row][0]) == len(self.algorithms):
+                            self.prediction_cache.put(key, result)
+            except Exception as e:
+                logger.error(f"❌ Prediction error: {e}")
+                metrics.inc("weather_ai_errors_total", stage="inference")
+                for index in row_indices:
+                    results[index] = self.error_result(e)
+            else:
+                if not pruned:
+                    for algorithm in self.algorithms:
+                        metrics.inc("weather_ai_algorithm_evaluations_total", len(feature_rows), algorithm=algorithm)
+                for index in row_indices:
+                    metrics.inc("weather_ai_algorithm_wins_total", algorithm=results[index]["algorithm"])
+        
+        succeeded = sum(1 for result in results if result["success"])
+        metrics.observe("weather_ai_batch_rows", len(weather_batch))
+        metrics.inc("weather_ai_predictions_total", succeeded, outcome="success")
+        if succeeded < len(results):
+            metrics.inc("weather_ai_predictions_total", len(results) - succeeded, outcome="error")
+        return results
+    
+    def invalidate_prediction_cache(self):
+        """Drop cached predictions; call whenever models or algorithms change"""
+        self.prediction_cache.clear()
+        self.context_store.clear_states()
+    
+    @pins_model_version
+    def predict_with_context(self, observations: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Predict from each location's rolling window, one incremental step per observation
+        
+        Observations for the same location are applied in order. Unlike
+        predict_batch this is stateful, so results are never cached.
+        """
+        if not self.wait_until_ready():
+            return [self.error_result(RuntimeError("Models are still warming up")) for _ in observations]
+        
+        results: List[Optional[Dict]] = [None] * len(observations)
+        pending = []
+        rows, _, errors = self.feature_schema.prepare([weather_data for _, weather_data in observations])
+        for index, ((location, _), features, error) in enumerate(zip(observations, row_lists(rows), errors)):
+            if error is None:
+                pending.append((index, str(location), features))
+            else:
+                self.metrics.inc("weather_ai_errors_total", stage="validation")
+                results[index] = self.invalid_result(error)
+        
+        store = self.context_store
+        with store.lock, self.metrics.time("weather_ai_stage_seconds", stage="context_inference"):
+            # Each round holds at most one observation per location
+            while pending:
+                seen = set()
+                round_items, deferred = [], []
+                for item in pending:
+                    (deferred if item[1] in seen else round_items).append(item)
+                    seen.add(item[1])
+                pending = deferred
+                
+                contexts = [store.get(location) for _, location, _ in round_items]
+                try:
+                    confidences = self.context_step([(context, features) for context, (_, _, features) in zip(contexts, round_items)])
+                except Exception as e:
+                    logger.error(f"❌ Context prediction error: {e}")
+                    self.metrics.inc("weather_ai_errors_total", stage="context_inference")
+                    for index, _, _ in round_items:
+                        results[index] = self.error_result(e)
+                    continue
+                
+                for (index, location, _), context, result in zip(round_items, contexts, self.build_predictions(confidences)):
+                    result["location"] = location
+                    result["context_length"] = context.size
+                    results[index] = result
+        
+        return results
+    
+    def context_step(self, items: List[tuple]) -> List[List[float]]:
+        """Record one observation per context and score it against the window
+        
+        The carried LSTM state cannot forget a row once it leaves the window,
+        so it is re-primed from the window once per `window` observations:
+        scores equal a full replay of the window up to the first wrap and
+        right after each re-prime, and are approximate in between (confidences
+        typically differ by under 1e-2).
+        """
+        store = self.context_store
+        if not self.pytorch_available:
+            # Fallback models are stateless: keep the window, score the latest row
+            for context, features in items:
+                store.record(context, features)
+            return self.score_features_local([features for _, features in items])
+        
+        import torch
+        
+        engine = self.get_batched_engine()
+        
+        # Contexts built by another engine (or never), or whose state has
+        # outlived its window, replay their kept window first
+        for context, _ in items:
+            if context.engine is not engine or context.state_rows >= 2 * store.window - 1:
+                self.replay_context(context, engine)
+        
+        h = torch.stack([context.h for context, _ in items], dim=2)
+        c = torch.stack([context.c for context, _ in items], dim=2)
+        keys = torch.stack([context.keys for context, _ in items], dim=1)
+        values = torch.stack([context.values for context, _ in items], dim=1)
+        valid = torch.zeros(len(items), store.window, dtype=torch.bool)
+        for row, (context, _) in enumerate(items):
+            valid[row, :context.size] = True
+            if context.size == store.window:
+                valid[row, context.next_slot] = False  # about to be overwritten
+        
+        inputs = torch.tensor([features for _, features in items], dtype=torch.float32)
+        with torch.no_grad():
+            confidences, h, c, k_new, v_new = engine.step(inputs, h, c, keys, values, valid)
+        
+        for row, (context, features) in enumerate(items):
+            slot = store.record(context, features)
+            context.h = h[:, :, row].clone()
+            context.c = c[:, :, row].clone()
+            context.keys[:, slot] = k_new[:, row]
+            context.values[:, slot] = v_new[:, row]
+            context.state_rows += 1
+        
+        return confidences.tolist()
+    
+    def replay_context(self, context: LocationContext, engine: BatchedLSTMEngine):
+        """Rebuild a context's model state from the kept observations that stay
+        in the window once the next one is recorded"""
+        import torch
+        
+        store = self.context_store
+        num_algorithms = len(engine.algorithm_names)
+        rows = store.window_rows(context)[max(0, context.size - store.window + 1):]
+        
+        context.h = torch.zeros(engine.num_layers, num_algorithms, engine.hidden_size)
+        context.c = torch.zeros(engine.num_layers, num_algorithms, engine.hidden_size)
+        context.keys = torch.zeros(num_algorithms, store.window, engine.hidden_size)
+        context.values = torch.zeros(num_algorithms, store.window, engine.hidden_size)
+        context.next_slot = 0
+        context.size = 0
+        context.state_rows = 0
+        context.engine = engine
+        if rows:
+            store.replays += 1
+            for features in rows:
+                self.context_step([(context, features)])
+    
+    def score_features(self, feature_rows: List[List[float]]) -> List[List[float]]:
+        """Score feature rows with every algorithm (rows x algorithms)"""
+        metrics = self.metrics
+        if self.worker_pool is not None:
+            try:
+                with metrics.time("weather_ai_inference_seconds", engine="worker_pool"):
+                    return self.worker_pool.score(feature_rows)
+            except Exception as e:
+                logger.error(f"Worker pool prediction error: {e}")
+                metrics.inc("weather_ai_scalar_fallbacks_total", source="worker_pool")
+        
+        return self.score_features_local(feature_rows)
+    
+    def score_features_local(self, feature_rows: List[List[float]]) -> List[List[float]]:
+        """Score a feature matrix (float32 array or list of rows) in this process"""
+        metrics = self.metrics
+        if self.pytorch_available:
+            try:
+                with metrics.time("weather_ai_inference_seconds", engine="batched_lstm"), \
+                        self.torch_scope("batched_lstm"):
+                    return self.get_batched_engine().predict(feature_rows)
+            except Exception as e:
+                logger.error(f"Batched PyTorch prediction error: {e}")
+                metrics.inc("weather_ai_scalar_fallbacks_total", source="batched_lstm")
+                with metrics.time("weather_ai_inference_seconds", engine="pytorch_scalar"):
+                    return [
+                        [self.pytorch_predict(algorithm, features) for algorithm in self.algorithms]
+                        for features in row_lists(feature_rows)
+                    ]
+        
+        if self.fallback_engine is not None:
+            try:
+                with metrics.time("weather_ai_inference_seconds", engine="numpy_fallback"):
+                    return self.fallback_engine.predict(feature_rows)
+            except Exception as e:
+                logger.error(f"Vectorized fallback prediction error: {e}")
+                metrics.inc("weather_ai_scalar_fallbacks_total", source="numpy_fallback")
+        
+        with metrics.time("weather_ai_inference_seconds", engine="scalar_fallback"):
+            return [
+                [self.fallback_predict(algorithm, features) for algorithm in self.algorithms]
+                for features in row_lists(feature_rows)
+            ]
+    
+    def get_subset_engine(self, names: Tuple[str, ...]):
+        """Engine scoring only `names` (declaration order), built once per subset; None means scalar fallback"""
+        models = self.models
+        if len(names) == len(models.algorithms):
+            return self.get_batched_engine() if self.pytorch_available else self.fallback_engine
+        
+        engine = models.subset_engines.get(names, False)
+        if engine is False:
+            full = self.get_batched_engine() if self.pytorch_available else None
+            with self.model_lock:
+                engine = models.subset_engines.get(names, False)
+                if engine is False:
+                    if full is not None:
+                        engine = full.subset(names)
+                    elif self.fallback_engine is not None:
+                        engine = VectorizedFallbackEngine({name: self.fallback_models[name] for name in names})
+                    else:
+                        engine = None
+                    models.subset_engines[names] = engine
+        return engine
+    
+    def score_subsets(self, feature_rows: List[List[float]], subsets: List[List[str]], scores: List[Dict[str, float]]):
+        """Score each row with its own algorithm subset, grouping rows that share one"""
+        position = {name: index for index, name in enumerate(self.algorithms)}
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for row, names in enumerate(subsets):
+            if names:
+                groups.setdefault(tuple(sorted(names, key=position.__getitem__)), []).append(row)
+        
+        for names, rows in groups.items():
+            engine = self.get_subset_engine(names)
+            batch = select_rows(feature_rows, rows)
+            if engine is None:
+                confidences = [[self.fallback_predict(name, features) for name in names] for features in row_lists(batch)]
+            else:
+                confidences = engine.predict(batch)
+            for row, row_confidences in zip(rows, confidences):
+                scores[row].update(zip(names, row_confidences))
+            for name in names:
+                self.metrics.inc("weather_ai_algorithm_evaluations_total", len(rows), algorithm=name)
     
-    def predict_weather_event(self, weather_data: Dict) -> Dict:
-        """Predict weather events using AI"""
-        try:
-            # Extract features
-            features = self.extract_features(weather_data)
-            
-            # Run predictions through all algorithms
-            predictions = {}
-            for algorithm_name, config in self.algorithms.items():
-                if self.pytorch_available:
-                    prediction = self.pytorch_predict(algorithm_name, features)
-                else:
-                    prediction = self.fallback_predict(algorithm_name, features)
-                
-                predictions[algorithm_name] = {
+    def score_pruned(self, feature_rows: List[List[float]], weather_rows: List[Dict]) -> List[Tuple[Tuple[str, ...], List[float]]]:
+        """Score rows with early exit, returning (algorithms evaluated, their confidences) per row"""
+        pruner = self.pruner
+        algorithms = tuple(self.algorithms)
+        buckets = [pruner.bucket(weather_data) for weather_data in weather_rows]
+        plans = [pruner.plan(bucket, algorithms) for bucket in buckets]
+        
+        scores: List[Dict[str, float]] = [{} for _ in feature_rows]
+        with self.metrics.time("weather_ai_inference_seconds", engine=f"early_exit_{pruner.mode}"):
+            self.score_subsets(feature_rows, [names for names, _ in plans], scores)
+        
+        scored = []
+        for bucket, (_, explored), row_scores in zip(buckets, plans, scores):
+            evaluated = tuple(name for name in algorithms if name in row_scores)
+            confidences = [row_scores[name] for name in evaluated]
+            winner = evaluated[max(range(len(evaluated)), key=confidences.__getitem__)]
+            pruner.record(bucket, winner, len(evaluated), len(algorithms), explored)
+            for name in algorithms:
+                if name not in row_scores:
+                    self.metrics.inc("weather_ai_algorithm_skips_total", algorithm=name)
+            scored.append((evaluated, confidences))
+        return scored
+    
+    def build_pruned_predictions(self, scored: List[Tuple[Tuple[str, ...], List[float]]]) -> List[Dict]:
+        """build_predictions for rows that were each scored on their own algorithm subset"""
+        results: List[Optional[Dict]] = [None] * len(scored)
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for row, (names, _) in enumerate(scored):
+            groups.setdefault(names, []).append(row)
+        for names, rows in groups.items():
+            for row, result in zip(rows, self.build_predictions([scored[row][1] for row in rows], names)):
+                results[row] = result
+        return results
+    
+    def build_prediction(self, confidences: List[float]) -> Dict:
+        """Build the prediction response from per-algorithm confidences"""
+        return self.build_predictions([confidences])[0]
+    
+    def build_predictions(self, confidence_rows: List[List[float]],
+                          algorithms: Optional[Tuple[str, ...]] = None) -> List[Dict]:
+        """Build prediction responses for a batch, classifying it in one pass"""
+        algorithms = algorithms or tuple(self.algorithms)
+        event_rows, rarity_rows = self.classification.classify(algorithms, confidence_rows)
+        model_type = "pytorch" if self.pytorch_available else "fallback"
+        model_version = self.models.version
+        
+        results = []
+        for confidences, event_types, rarities in zip(confidence_rows, event_rows, rarity_rows):
+            predictions = {
+                algorithm_name: {
                     "confidence": prediction,
-                    "event_type": self.get_event_type(algorithm_name, prediction),
-                    "rarity": self.calculate_rarity(prediction),
+                    "event_type": event_type,
+                    "rarity": rarity,
                     "algorithm": algorithm_name
                 }
+                for algorithm_name, prediction, event_type, rarity in zip(algorithms, confidences, event_types, rarities)
+            }
             
-            # Select best prediction
-            best_algorithm = max(predictions.keys(), key=lambda k: predictions[k]["confidence"])
-            best_prediction = predictions[best_algorithm]
+            # Select best prediction (first wins ties, as before)
+            best = max(range(len(algorithms)), key=confidences.__getitem__)
             
-            return {
+            results.append({
                 "success": True,
-                "algorithm": best_algorithm,
-                "confidence": best_prediction["confidence"],
-                "event_type": best_prediction["event_type"],
-                "rarity": best_prediction["rarity"],
+                "algorithm": algorithms[best],
+                "confidence": confidences[best],
+                "event_type": event_types[best],
+                "rarity": rarities[best],
                 "all_predictions": predictions,
-                "model_type": "pytorch" if self.pytorch_available else "fallback"
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Prediction error: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "model_type": "error"
-            }
+                "model_type": model_type,
+                "model_version": model_version
+            })
+        return results
+    
+    def error_result(self, error: Exception) -> Dict:
+        """Build the failed prediction response"""
+        return {
+            "success": False,
+            "error": str(error),
+            "model_type": "error"
+        }
+    
+    def invalid_result(self, error: str) -> Dict:
+        """Failed prediction for an observation rejected by the schema"""
+        return {**self.error_result(ValueError(error)), "invalid_input": True}
     
     def extract_features(self, weather_data: Dict) -> List[float]:
-        """Extract numerical features from weather data"""
-        return [
-            float(weather_data.get("temperature", 20)),
-            float(weather_data.get("humidity", 50)),
-            float(weather_data.get("pressure", 1013)),
-            float(weather_data.get("wind_speed", 10)),
-            float(weather_data.get("visibility", 10)),
-            float(weather_data.get("cloud_cover", 0)),
-            float(weather_data.get("uv_index", 5)),
-            float(weather_data.get("precipitation", 0))
-        ]
+        """Extract numerical features from weather data, raising ValueError if it is invalid"""
+        rows, _, errors = self.feature_schema.prepare([weather_data])
+        if errors[0] is not None:
+            raise ValueError(errors[0])
+        return row_lists(rows)[0]
+    
+    def torch_scope(self, name: str):
+        """torch.profiler scope around one inference call while a trace is being captured"""
+        capture = self.torch_capture
+        return capture.record(name) if capture is not None else NO_PROFILE
     
     def pytorch_predict(self, algorithm: str, features: List[float]) -> float:
         """Make prediction using PyTorch model"""
         try:
             import torch
-            model = self.pytorch_models[algorithm]
+            model = self.get_pytorch_model(algorithm)
             
-            # Convert to tensor
-            input_tensor = torch.tensor([features], dtype=torch.float32).unsqueeze(0)
-            
-            # Make prediction
-            with torch.no_grad():
-                output = model(input_tensor)
-                confidence = float(output.squeeze())
+            with self.metrics.time("weather_ai_algorithm_inference_seconds", algorithm=algorithm), \
+                    self.torch_scope(f"pytorch_predict/{algorithm}"):
+                # Convert to tensor, normalized with the version's feature statistics
+                input_tensor = torch.tensor([features], dtype=torch.float32).unsqueeze(0)
+                normalization = self.models.normalization
+                if normalization:
+                    input_tensor = (input_tensor - torch.tensor(normalization["mean"])) / torch.tensor(normalization["scale"])
+                
+                # Make prediction
+                with torch.no_grad():
+                    output = model(input_tensor)
+                    confidence = float(output.squeeze())
             
             return min(max(confidence, 0.0), 1.0)  # Clamp to [0, 1]
             
         except Exception as e:
             logger.error(f"PyTorch prediction error: {e}")
+            self.metrics.inc("weather_ai_scalar_fallbacks_total", source="pytorch_predict")
             return self.fallback_predict(algorithm, features)
     
     def fallback_predict(self, algorithm: str, features: List[float]) -> float:
@@ -255,71 +2578,487 @@ class WeatherAIIntegration:
             
         except Exception as e:
             logger.error(f"Fallback prediction error: {e}")
+            self.metrics.inc("weather_ai_errors_total", stage="fallback_predict")
             return 0.5  # Default confidence
     
     def get_event_type(self, algorithm: str, confidence: float) -> str:
         """Determine event type based on algorithm and confidence"""
-        event_types = {
-            "ThermalDrift-v2": ["heat_wave", "cold_snap", "thermal_anomaly"],
-            "StormChaser-v4": ["thunderstorm", "tornado", "hurricane"],
-            "EcoBalance-v1": ["climate_shift", "seasonal_anomaly", "eco_change"],
-            "AuroraPredictor-v3": ["aurora_borealis", "solar_storm", "magnetic_anomaly"],
-            "AquaDetect-v2": ["heavy_rain", "flood", "drought"]
-        }
-        
-        types = event_types.get(algorithm, ["weather_event"])
-        if confidence > 0.8:
-            return types[0]  # Most severe
-        elif confidence > 0.6:
-            return types[1] if len(types) > 1 else types[0]
-        else:
-            return types[2] if len(types) > 2 else types[0]
+        return self.classification.event_type(algorithm, confidence)
     
     def calculate_rarity(self, confidence: float) -> str:
         """Calculate rarity based on confidence"""
-        if confidence >= 0.95:
-            return "legendary"
-        elif confidence >= 0.85:
-            return "epic"
-        elif confidence >= 0.70:
-            return "rare"
-        elif confidence >= 0.50:
-            return "uncommon"
-        else:
-            return "common"
+        return self.classification.rarity(confidence)
     
+    @pins_model_version
     def get_model_info(self) -> Dict:
         """Get model information"""
         return {
             "status": self.model_status,
+            "model_version": self.models.version,
+            "model_versions": self.model_versions_info(),
             "sd_environment": self.sd_env_active,
             "pytorch_available": self.pytorch_available,
+            "precision": self.precision,
             "algorithms": self.algorithms,
             "python_version": sys.version,
             "working_directory": str(Path.cwd()),
+            "prediction_cache": self.prediction_cache.stats(),
+            "artifacts": {**self.artifact_store.info(), "sources": dict(self.model_sources)},
+            "worker_pool": self.worker_pool.stats() if self.worker_pool else None,
+            "context_windows": self.context_store.stats(),
+            "early_exit": self.pruner.stats(),
+            "classification": self.classification.to_config(),
             "timestamp": datetime.now().isoformat()
         }
     
     def health_check(self) -> Dict:
         """Health check endpoint"""
+        pool = self.active_models.worker_pool
+        status = "healthy" if self.ready_event.is_set() else "warming"
+        if status == "healthy" and pool is not None and not pool.healthy:
+            status = "degraded"  # a worker kept crashing and is no longer restarted
         return {
-            "status": "healthy",
+            "status": status,
             "model_status": self.model_status,
+            "model_version": self.active_models.version,
             "sd_environment": self.sd_env_active,
             "pytorch_available": self.pytorch_available,
             "algorithms_count": len(self.algorithms),
+            "startup_timings_ms": {phase: round(seconds * 1000, 1) for phase, seconds in list(self.startup_timings.items())},
             "timestamp": datetime.now().isoformat()
         }
 
+    def model_versions_info(self) -> Dict:
+        """The active model version and recently retired ones still draining or drained"""
+        return {
+            "active": self.active_models.info(),
+            "retired": [version.info() for version in self.retired_models]
+        }
+    
+    @pins_model_version
+    def model_info_json(self) -> bytes:
+        """get_model_info() as JSON, re-serializing the static tables only when they change"""
+        static_key = (id(self.algorithms), id(self.classification), self.sd_env_active, self.pytorch_available, self.precision)
+        return self.model_info_payload.render(
+            static_key,
+            lambda: {
+                "sd_environment": self.sd_env_active,
+                "pytorch_available": self.pytorch_available,
+                "precision": self.precision,
+                "algorithms": self.algorithms,
+                "python_version": sys.version,
+                "working_directory": str(Path.cwd()),
+                "classification": self.classification.to_config()
+            },
+            {
+                "status": self.model_status,
+                "model_version": self.models.version,
+                "model_versions": self.model_versions_info(),
+                "prediction_cache": self.prediction_cache.stats(),
+                "artifacts": {**self.artifact_store.info(), "sources": dict(self.model_sources)},
+                "worker_pool": self.worker_pool.stats() if self.worker_pool else None,
+                "context_windows": self.context_store.stats(),
+                "early_exit": self.pruner.stats(),
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    
+    def health_json(self) -> bytes:
+        """health_check() as JSON; after warm-up only the timestamp is serialized per call"""
+        pool = self.active_models.worker_pool
+        static_key = (self.ready_event.is_set(), self.model_status, self.active_models.version, self.sd_env_active,
+                      self.pytorch_available, len(self.algorithms), len(self.startup_timings),
+                      pool is None or pool.healthy)
+        health = self.health_check
+        return self.health_payload.render(
+            static_key,
+            lambda: {key: value for key, value in health().items() if key != "timestamp"},
+            {"timestamp": datetime.now().isoformat()}
+        )
+
+class MicroBatchDispatcher:
+    """Coalesces concurrent prediction requests into batches run on a worker thread
+    
+    A request that arrives while no batch is running is dispatched at once;
+    requests arriving while one is in flight wait for it and go out together
+    as the next batch, so batching only ever adds latency under load.
+    """
+    
+    def __init__(self, ai: WeatherAIIntegration, max_batch_size: int = 64):
+        self.ai = ai
+        self.max_batch_size = max(1, max_batch_size)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker_task: Optional[asyncio.Task] = None
+        
+        # Tuning metrics
+        self.batches_run = 0
+        self.requests_served = 0
+        self.batch_size_counts: Dict[int, int] = {}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def ensure_started(self):
+        """Start the collector task on the running event loop"""
+        if self.worker_task is None or self.worker_task.done():
+            self.queue = asyncio.Queue()
+            self.worker_task = asyncio.get_running_loop().create_task(self.collect_batches())
+    
+    async def submit(self, weather_data: Dict) -> Dict:
+        """Queue one observation and wait for its prediction"""
+        self.ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((weather_data, future, time.perf_counter()))
+        return await future
+    
+    async def run(self, weather_batch: List[Dict]) -> List[Dict]:
+        """Run an already-formed batch on the worker thread, bypassing the queue"""
+        return await self.run_with(self.ai.predict_batch, weather_batch)
+    
+    async def run_with(self, func, *args):
+        """Run any prediction call on the worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+    
+    async def collect_batches(self):
+        """Dispatch whatever is waiting (up to a full batch) as soon as the previous batch is done"""
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self.execute(batch)
+    
+    async def execute(self, batch: List[tuple]):
+        """Score a coalesced batch and fan results back out to the waiting requests"""
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            wait = started - enqueued
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        self.batches_run += 1
+        self.requests_served += len(batch)
+        self.batch_size_counts[len(batch)] = self.batch_size_counts.get(len(batch), 0) + 1
+        
+        try:
+            results = await self.run([weather_data for weather_data, _, _ in batch])
+        except Exception as e:
+            logger.error(f"❌ Batch execution error: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def stats(self) -> Dict:
+        """Queue depth, batch-size histogram and wait-time metrics"""
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_batch_size": self.max_batch_size,
+            "batches_run": self.batches_run,
+            "requests_served": self.requests_served,
+            "avg_batch_size": self.requests_served / self.batches_run if self.batches_run else 0.0,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self.batch_size_counts.items())},
+            "avg_wait_ms": self.total_wait / self.requests_served * 1000.0 if self.requests_served else 0.0,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "timestamp": datetime.now().isoformat()
+        }
+
+def runtime_metrics(ai: WeatherAIIntegration, dispatcher: Optional[MicroBatchDispatcher] = None) -> List[tuple]:
+    """Scrape-time gauges and counters from the cache, dispatcher and worker pool"""
+    cache = ai.prediction_cache
+    collected = [
+        ("weather_ai_model_ready", "gauge", "1 once models are initialized", {(): int(ai.model_status == "ready")}),
+        ("weather_ai_prediction_cache_hits_total", "counter", "Prediction cache hits", {(): cache.hits}),
+        ("weather_ai_prediction_cache_misses_total", "counter", "Prediction cache misses", {(): cache.misses}),
+        ("weather_ai_prediction_cache_entries", "gauge", "Prediction cache occupancy", {(): len(cache.entries)})
+    ]
+    if dispatcher is not None:
+        collected.append((
+            "weather_ai_dispatcher_queue_depth", "gauge", "Requests waiting for a micro-batch",
+            {(): dispatcher.queue.qsize() if dispatcher.queue else 0}
+        ))
+    if ai.worker_pool is not None:
+        utilization = {
+            (("worker", str(worker["worker_id"])),): worker["utilization"]
+            for worker in ai.worker_pool.stats()["per_worker"]
+        }
+        collected.append(("weather_ai_worker_utilization", "gauge", "Busy fraction per inference worker", utilization))
+        collected.append(("weather_ai_worker_pool_healthy", "gauge", "0 once a worker has exhausted its restarts",
+                          {(): int(ai.worker_pool.healthy)}))
+    return collected
+
+# On-demand profiling (admin only, off unless PROFILING_ENABLED=1)
+NO_PROFILE = nullcontext()
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler: a background thread records every thread's Python stack"""
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.samples_lock = threading.Lock()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+    
+    def start(self, seconds: float):
+        """Sample for `seconds` (or until stop())"""
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, args=(seconds,), name="sampling-profiler", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+    
+    def run(self, seconds: float):
+        own_id = threading.get_ident()
+        deadline = self.started_at + seconds
+        labels: Dict[object, str] = {}
+        
+        def label(code) -> str:
+            # One frame per function, so samples aggregate into a flame graph
+            text = labels.get(code)
+            if text is None:
+                text = labels[code] = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+            return text
+        
+        while not self.stop_event.wait(self.interval) and time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks.append(tuple(reversed(stack)))
+            with self.samples_lock:
+                self.samples.update(stacks)
+                self.sample_count += 1
+        self.elapsed = time.perf_counter() - self.started_at
+    
+    def snapshot(self) -> Counter:
+        """Copy of the samples so far; safe while the sampler is still running"""
+        with self.samples_lock:
+            return Counter(self.samples)
+    
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format (flamegraph.pl, speedscope, inferno)"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.snapshot().most_common())
+    
+    def speedscope(self) -> Dict:
+        """speedscope.app file: one sampled profile per thread, weights in milliseconds"""
+        frames: List[Dict] = []
+        frame_index: Dict[str, int] = {}
+        profiles: Dict[str, Dict] = {}
+        for stack, count in self.snapshot().items():
+            thread, *calls = stack
+            indices = []
+            for name in calls:
+                if name not in frame_index:
+                    frame_index[name] = len(frames)
+                    frames.append({"name": name})
+                indices.append(frame_index[name])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled", "name": thread, "unit": "milliseconds",
+                "startValue": 0, "endValue": 0, "samples": [], "weights": []
+            })
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval * 1000)
+            profile["endValue"] += count * self.interval * 1000
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"weather-ai {datetime.now().isoformat()}",
+            "exporter": "weather-ai SamplingProfiler",
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda profile: -profile["endValue"])
+        }
+    
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": self.sample_count,
+            "unique_stacks": len(self.snapshot()),
+            "seconds": round(time.perf_counter() - self.started_at if self.running else self.elapsed, 3)
+        }
+
+class TorchTraceCapture:
+    """torch.profiler traces of inference calls for a bounded window
+    
+    torch.profiler only sees the thread it was started on, so each call is
+    profiled in its own thread; concurrent calls skip profiling rather than
+    wait. Op totals are aggregated across calls and the first `max_traces`
+    calls are exported as Chrome traces.
+    """
+    
+    def __init__(self, seconds: float, max_calls: int = 100, max_traces: int = 10,
+                 directory: Optional[str] = None):
+        import tempfile
+        from torch.profiler import ProfilerActivity, profile
+        
+        # The profiler's one-off initialization takes ~1-2 s; pay it here, not in a request
+        with profile(activities=[ProfilerActivity.CPU]):
+            pass
+        
+        self.deadline = time.perf_counter() + seconds
+        self.max_calls = max_calls
+        self.max_traces = max_traces
+        self.directory = Path(directory or tempfile.mkdtemp(prefix="weather-ai-torch-"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.skipped = 0
+        self.traces: List[Path] = []
+        self.ops: Dict[str, Dict] = {}
+    
+    @property
+    def active(self) -> bool:
+        return self.calls < self.max_calls and time.perf_counter() < self.deadline
+    
+    def record(self, name: str):
+        if not self.active:
+            return NO_PROFILE
+        if not self.lock.acquire(blocking=False):
+            self.skipped += 1
+            return NO_PROFILE
+        return self.profiled(name)
+    
+    @contextmanager
+    def profiled(self, name: str):
+        """Profile one call; the capture lock is already held"""
+        from torch.profiler import ProfilerActivity, profile, record_function
+        
+        try:
+            with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+                with record_function(name):
+                    yield
+            self.calls += 1
+            for event in prof.key_averages():
+                op = self.ops.setdefault(event.key, {"calls": 0, "self_cpu_us": 0.0, "cpu_us": 0.0})
+                op["calls"] += event.count
+                op["self_cpu_us"] += event.self_cpu_time_total
+                op["cpu_us"] += event.cpu_time_total
+            if len(self.traces) < self.max_traces:
+                path = self.directory / f"trace-{len(self.traces)}.json"
+                prof.export_chrome_trace(str(path))
+                self.traces.append(path)
+        finally:
+            self.lock.release()
+    
+    def summary(self, top: int = 30) -> Dict:
+        ops = sorted(self.ops.items(), key=lambda item: -item[1]["self_cpu_us"])[:top]
+        return {
+            "active": self.active,
+            "calls": self.calls,
+            "skipped_concurrent": self.skipped,
+            "traces": len(self.traces),
+            "ops": [{"op": key, **{name: round(value, 1) for name, value in stats.items()}} for key, stats in ops]
+        }
+
+# Entry points whose allocations an allocation profile attributes to predictions
+ALLOCATION_SCOPES = ("predict_weather_event", "predict_batch", "predict_with_context")
+
+def allocation_diff(seconds: float, top: int = 25, frames: int = 64,
+                    scopes: Iterable[Callable] = ()) -> Dict:
+    """tracemalloc snapshots `seconds` apart, diffed by allocation site
+    
+    Only allocations made (directly or deeper) inside `scopes` are counted;
+    each is attributed to its innermost frame.
+    """
+    import tracemalloc
+    
+    ranges = []
+    for func in scopes:
+        code = getattr(func, "__wrapped__", func).__code__
+        lines = [line for _, _, line in code.co_lines() if line is not None]
+        ranges.append((code.co_filename, code.co_firstlineno, max(lines)))
+    
+    def in_scope(traceback) -> bool:
+        return not ranges or any(
+            frame.filename == filename and first <= frame.lineno <= last
+            for frame in traceback for filename, first, last in ranges
+        )
+    
+    def by_site(snapshot) -> Dict[Tuple[str, int], List[int]]:
+        sites: Dict[Tuple[str, int], List[int]] = {}
+        for trace in snapshot.traces:
+            if in_scope(trace.traceback):
+                frame = trace.traceback[-1]  # ordered oldest first
+                site = sites.setdefault((frame.filename, frame.lineno), [0, 0])
+                site[0] += trace.size
+                site[1] += 1
+        return sites
+    
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+    
+    old, new = by_site(before), by_site(after)
+    diffs = []
+    for site in set(old) | set(new):
+        size, count = new.get(site, (0, 0))
+        old_size, old_count = old.get(site, (0, 0))
+        if size != old_size or count != old_count:
+            diffs.append({
+                "site": f"{site[0]}:{site[1]}",
+                "size_diff_bytes": size - old_size,
+                "count_diff": count - old_count,
+                "size_bytes": size,
+                "count": count
+            })
+    diffs.sort(key=lambda entry: -abs(entry["size_diff_bytes"]))
+    return {
+        "seconds": seconds,
+        "frames": frames,
+        "scopes": [f"{filename}:{first}-{last}" for filename, first, last in ranges],
+        "traced_current_bytes": traced_current,
+        "traced_peak_bytes": traced_peak,
+        "in_scope_bytes": sum(size for size, _ in new.values()),
+        "top": diffs[:top]
+    }
+
 # FastAPI integration (if available)
+def failure_status(result: Dict) -> int:
+    """HTTP status for a failed prediction: 422 for observations predict_batch rejected during validation, else 500"""
+    return 422 if result.get("invalid_input") else 500
+
 def create_api_server():
     """Create FastAPI server if available"""
     try:
-        from fastapi import FastAPI, HTTPException
+        from fastapi import FastAPI, HTTPException, Request, Response
         from fastapi.middleware.cors import CORSMiddleware
         import uvicorn
         
-        app = FastAPI(title="WeatherNFT AI", version="1.0.0")
+        class FastJSONResponse(Response):
+            """JSON response rendered with orjson when available; bytes pass through"""
+            media_type = "application/json"
+            
+            def render(self, content) -> bytes:
+                return content if isinstance(content, bytes) else json_dumps(content)
+        
+        app = FastAPI(title="WeatherNFT AI", version="1.0.0", default_response_class=FastJSONResponse)
         
         # Enable CORS
         app.add_middleware(
@@ -330,40 +3069,945 @@ def create_api_server():
             allow_headers=["*"],
         )
         
-        # Initialize AI
-        ai = WeatherAIIntegration()
+        # Initialize AI; models warm up in the background unless disabled
+        background = os.environ.get("AI_BACKGROUND_STARTUP", "1") != "0"
+        ai = WeatherAIIntegration(background=background)
+        dispatcher = MicroBatchDispatcher(ai, max_batch_size=int(os.environ.get("PREDICT_MAX_BATCH_SIZE", "64")))
+        
+        metrics = ai.metrics
+        metrics.describe("weather_ai_http_request_seconds", "histogram", "HTTP request latency by path")
+        metrics.describe("weather_ai_http_requests_total", "counter", "HTTP requests by path and status")
+        metrics.add_collector(lambda: runtime_metrics(ai, dispatcher))
+        
+        @app.middleware("http")
+        async def record_request_metrics(request, call_next):
+            started = time.perf_counter()
+            response = await call_next(request)
+            # Label by route template so unknown paths cannot explode cardinality
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            metrics.observe("weather_ai_http_request_seconds", time.perf_counter() - started, path=path)
+            metrics.inc("weather_ai_http_requests_total", path=path, status=str(response.status_code))
+            return response
+        
+        def compact_result(result: Dict) -> Dict:
+            """Winner-only response for clients that skip all_predictions"""
+            return {key: value for key, value in result.items() if key != "all_predictions"}
         
         @app.get("/health")
         async def health():
-            return ai.health_check()
+            return FastJSONResponse(ai.health_json())
+        
+        @app.get("/metrics")
+        async def prometheus_metrics():
+            return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
         
         @app.get("/model/info")
         async def model_info():
-            return ai.get_model_info()
+            return FastJSONResponse(ai.model_info_json())
+        
+        # Admin endpoints are disabled unless ADMIN_TOKEN is set
+        admin_token = os.environ.get("ADMIN_TOKEN", "")
+        
+        def require_admin(request: Request):
+            if not admin_token:
+                raise HTTPException(status_code=404, detail="Not Found")
+            if not hmac.compare_digest(request.headers.get("x-admin-token", ""), admin_token):
+                raise HTTPException(status_code=403, detail="Invalid admin token")
+        
+        @app.post("/model/reload")
+        async def model_reload(request: Request, payload: Optional[dict] = None):
+            require_admin(request)
+            payload = payload or {}
+            try:
+                # Built and warmed off the event loop; requests keep flowing meanwhile
+                return FastJSONResponse(await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: ai.reload_models(payload.get("version"), payload.get("algorithms"))
+                ))
+            except ValueError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            except Exception as e:
+                logger.error(f"❌ Model reload failed: {e}")
+                raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+        
+        # Profiling endpoints are only registered with PROFILING_ENABLED=1 (and need ADMIN_TOKEN)
+        if os.environ.get("PROFILING_ENABLED", "0") == "1":
+            max_profile_seconds = float(os.environ.get("PROFILING_MAX_SECONDS", "300"))
+            profiling = {"cpu": None, "memory": False}
+            
+            def profile_seconds(seconds: float) -> float:
+                if not 0 < seconds <= max_profile_seconds:
+                    raise HTTPException(status_code=422, detail=f"seconds must be in (0, {max_profile_seconds:g}]")
+                return seconds
+            
+            @app.post("/admin/profile/cpu")
+            async def profile_cpu_start(request: Request, seconds: float = 10.0, interval_ms: float = 5.0):
+                require_admin(request)
+                profiler = profiling["cpu"]
+                if profiler is not None and profiler.running:
+                    raise HTTPException(status_code=409, detail="A CPU profile is already running")
+                seconds = profile_seconds(seconds)  # a rejected request keeps the last profile
+                profiler = profiling["cpu"] = SamplingProfiler(interval=max(interval_ms, 1.0) / 1000)
+                profiler.start(seconds)
+                logger.info(f"🔬 CPU sampling profile started ({seconds:g} s)")
+                return FastJSONResponse(profiler.stats())
+            
+            @app.post("/admin/profile/cpu/stop")
+            async def profile_cpu_stop(request: Request):
+                require_admin(request)
+                profiler = profiling["cpu"]
+                if profiler is None:
+                    raise HTTPException(status_code=404, detail="No CPU profile")
+                await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+                return FastJSONResponse(profiler.stats())
+            
+            @app.get("/admin/profile/cpu")
+            async def profile_cpu_result(request: Request, format: str = "speedscope"):
+                require_admin(request)
+                profiler = profiling["cpu"]
+                if profiler is None:
+                    raise HTTPException(status_code=404, detail="No CPU profile")
+                if format == "stats":
+                    return FastJSONResponse(profiler.stats())
+                if format == "collapsed":
+                    return Response(content=profiler.collapsed(), media_type="text/plain",
+                                    headers={"Content-Disposition": "attachment; filename=profile.collapsed"})
+                if format == "speedscope":
+                    return FastJSONResponse(profiler.speedscope(),
+                                            headers={"Content-Disposition": "attachment; filename=profile.speedscope.json"})
+                raise HTTPException(status_code=422, detail="format must be speedscope, collapsed or stats")
+            
+            @app.post("/admin/profile/torch")
+            async def profile_torch_start(request: Request, seconds: float = 10.0, max_calls: int = 100):
+                require_admin(request)
+                if not ai.pytorch_available:
+                    raise HTTPException(status_code=409, detail="PyTorch is not available")
+                capture = ai.torch_capture
+                if capture is not None and capture.active:
+                    raise HTTPException(status_code=409, detail="A torch trace is already being captured")
+                seconds = profile_seconds(seconds)
+                ai.torch_capture = await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: TorchTraceCapture(seconds, max_calls=max_calls, directory=os.environ.get("PROFILING_DIR"))
+                )
+                logger.info(f"🔬 torch.profiler capture armed ({seconds:g} s, up to {max_calls} calls)")
+                return FastJSONResponse(ai.torch_capture.summary())
+            
+            @app.get("/admin/profile/torch")
+            async def profile_torch_result(request: Request, top: int = 30):
+                require_admin(request)
+                if ai.torch_capture is None:
+                    raise HTTPException(status_code=404, detail="No torch trace")
+                return FastJSONResponse(ai.torch_capture.summary(top))
+            
+            @app.get("/admin/profile/torch/trace/{index}")
+            async def profile_torch_trace(request: Request, index: int):
+                require_admin(request)
+                capture = ai.torch_capture
+                if capture is None or not 0 <= index < len(capture.traces):
+                    raise HTTPException(status_code=404, detail="No such trace")
+                return Response(content=capture.traces[index].read_bytes(), media_type="application/json",
+                                headers={"Content-Disposition": f"attachment; filename=torch-trace-{index}.json"})
+            
+            @app.post("/admin/profile/memory")
+            async def profile_memory(request: Request, seconds: float = 10.0, top: int = 25, scoped: bool = True):
+                require_admin(request)
+                scopes = [getattr(WeatherAIIntegration, name) for name in ALLOCATION_SCOPES] if scoped else []
+                seconds = profile_seconds(seconds)
+                if profiling["memory"]:
+                    raise HTTPException(status_code=409, detail="An allocation profile is already running")
+                profiling["memory"] = True
+                logger.info(f"🔬 tracemalloc allocation profile ({seconds:g} s)")
+                try:
+                    return FastJSONResponse(await asyncio.get_running_loop().run_in_executor(
+                        None, lambda: allocation_diff(seconds, top=top, scopes=scopes)
+                    ))
+                finally:
+                    profiling["memory"] = False
         
         @app.post("/predict")
-        async def predict(weather_data: dict):
+        async def predict(weather_data: dict, compact: bool = False):
             try:
-                result = ai.predict_weather_event(weather_data)
+                result = await dispatcher.submit(weather_data)
                 if result["success"]:
-                    return result
+                    with metrics.time("weather_ai_stage_seconds", stage="serialization"):
+                        body = json_dumps(compact_result(result) if compact else result)
+                    return FastJSONResponse(body)
                 else:
-                    raise HTTPException(status_code=500, detail=result["error"])
+                    raise HTTPException(status_code=failure_status(result), detail=result["error"])
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+        
+        @app.post("/predict/batch")
+        async def predict_batch(weather_batch: List[dict], compact: bool = False):
+            try:
+                results = await dispatcher.run(weather_batch)
+                if compact:
+                    results = [compact_result(result) for result in results]
+                return FastJSONResponse({"results": results})
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
         
+        @app.post("/predict/context")
+        async def predict_context(weather_data: dict, compact: bool = False):
+            location = weather_data.get("location")
+            if location is None:
+                raise HTTPException(status_code=422, detail="location is required")
+            result = (await dispatcher.run_with(ai.predict_with_context, [(location, weather_data)]))[0]
+            if not result["success"]:
+                raise HTTPException(status_code=failure_status(result), detail=result["error"])
+            return FastJSONResponse(compact_result(result) if compact else result)
+        
+        # Precomputed predictions for the mint path: PRECOMPUTE_DB enables lookups, a
+        # live PRECOMPUTE_FEED fills misses on demand, and PRECOMPUTE_LOCATIONS runs
+        # the scheduler in-process
+        store = open_precomputed_store()
+        max_age = float(os.environ.get("PRECOMPUTE_MAX_AGE_SECONDS", "900"))
+        feed = None
+        feed_spec = os.environ.get("PRECOMPUTE_FEED", "")
+        if feed_spec:
+            feed = load_weather_feed(feed_spec)
+            if getattr(feed, "is_synthetic", False):
+                logger.warning(f"⚠️ PRECOMPUTE_FEED {feed_spec!r} serves synthetic data - ignored")
+                feed = None
+        if store is not None:
+            metrics.describe("weather_ai_precomputed_lookups_total", "counter", "Precomputed prediction lookups by outcome")
+            registry = os.environ.get("PRECOMPUTE_LOCATIONS", "")
+            if registry and feed is None:
+                logger.warning("⚠️ PRECOMPUTE_LOCATIONS ignored - no live weather feed (PRECOMPUTE_FEED) configured")
+            elif registry:
+                node_id = os.environ.get("SCHEDULER_NODE_ID", "local")
+                scheduler = LocationScheduler(
+                    ai, feed, node_id=node_id,
+                    nodes=[node for node in os.environ.get("SCHEDULER_NODES", "").split(",") if node] or [node_id],
+                    default_interval=float(os.environ.get("PRECOMPUTE_INTERVAL_SECONDS", "300")),
+                    store=store
+                )
+                load_location_registry(scheduler, feed, registry)
+                stop_event = threading.Event()
+                
+                def precompute():
+                    ai.wait_until_ready()
+                    scheduler.run_forever(stop_event)
+                
+                threading.Thread(target=precompute, name="precompute", daemon=True).start()
+                logger.info(f"🗓️ Precomputing {scheduler.stats()['owned_locations']} locations into {store.path}")
+        
+        @app.post("/predict/mint")
+        async def predict_mint(weather_data: dict, compact: bool = False, max_age_seconds: Optional[float] = None):
+            location = weather_data.get("location")
+            if location is None:
+                raise HTTPException(status_code=422, detail="location is required")
+            location = str(location)
+            loop = asyncio.get_running_loop()
+            
+            if store is not None:
+                # Clients may tighten the staleness bound, not loosen it
+                bound = max_age if max_age_seconds is None else min(max_age_seconds, max_age)
+                result, outcome = await loop.run_in_executor(None, store.lookup, location, bound, ai.models.version)
+                metrics.inc("weather_ai_precomputed_lookups_total", outcome=outcome)
+                if result is not None:
+                    result.update(precomputed=True, age_seconds=round(time.time() - result["scored_at"], 3))
+                    return FastJSONResponse(compact_result(result) if compact else result)
+            
+            # Miss or stale: score the feed's current conditions, else the posted ones
+            observation, source = None, "request"
+            if feed is not None:
+                try:
+                    observation = (await loop.run_in_executor(None, feed.fetch, [location])).get(location)
+                except Exception as e:
+                    logger.error(f"❌ Weather feed fetch for {location} failed: {e}")
+                if observation is not None:
+                    source = "feed"
+            if observation is None:
+                observation = {key: value for key, value in weather_data.items() if key in FEATURE_SCHEMA}
+            if not observation:
+                raise HTTPException(status_code=404, detail="No current conditions for this location; post them to score live")
+            
+            result = await dispatcher.submit(observation)
+            if not result["success"]:
+                raise HTTPException(status_code=failure_status(result), detail=result["error"])
+            result = {**result, "location": location, "scored_at": time.time()}
+            if store is not None and source == "feed":
+                # Only feed data goes into the store, so later lookups hit
+                try:
+                    await loop.run_in_executor(None, store.put_many, [(location, result)])
+                except sqlite3.Error as e:
+                    logger.error(f"❌ Precomputed store write failed: {e}")
+            result.update(precomputed=False, conditions=source)
+            return FastJSONResponse(compact_result(result) if compact else result)
+        
+        @app.get("/predict/stats")
+        async def predict_stats():
+            stats = dispatcher.stats()
+            if store is not None:
+                stats["precomputed"] = {**store.stats(), "max_age_seconds": max_age}
+            return FastJSONResponse(stats)
+        
         return app, ai
         
     except ImportError:
         logger.warning("FastAPI not available - using basic mode")
         return None, WeatherAIIntegration()
 
+# Location-sharded scheduled scoring
+class ConsistentHashRing:
+    """Maps location ids to nodes; adding or removing a node only moves ~1/N of them"""
+    
+    def __init__(self, nodes: Iterable[str], replicas: int = 64):
+        self.replicas = replicas
+        self.points: List[int] = []
+        self.owners: List[str] = []
+        self.nodes = sorted(set(nodes))
+        for node in self.nodes:
+            for replica in range(replicas):
+                point = self.hash(f"{node}#{replica}")
+                index = bisect.bisect(self.points, point)
+                self.points.insert(index, point)
+                self.owners.insert(index, node)
+    
+    @staticmethod
+    def hash(key: str) -> int:
+        """Stable 64-bit hash (Python's hash() is salted per process)"""
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+    
+    def node_for(self, key: str) -> str:
+        """Node owning a key (first ring point clockwise from its hash)"""
+        index = bisect.bisect(self.points, self.hash(key)) % len(self.points)
+        return self.owners[index]
+
+class InMemoryWeatherFeed:
+    """Offline stand-in for the weather provider
+    
+    Serves explicitly set observations, otherwise a deterministic synthetic
+    reading per location that drifts slowly with time. Never used to fill
+    the precomputed store.
+    """
+    
+    is_synthetic = True
+    
+    def __init__(self, observations: Optional[Dict[str, Dict]] = None, seed: int = 0):
+        self.observations: Dict[str, Dict] = dict(observations or {})
+        self.seed = seed
+        self.fetches = 0
+    
+    def update(self, location: str, weather_data: Dict):
+        """Pin the conditions served for a location"""
+        self.observations[location] = weather_data
+    
+    def synthetic_reading(self, location: str, now: float) -> Dict:
+        """Deterministic per-location reading"""
+        rng = random.Random(f"{self.seed}:{location}")
+        drift = (now / 3600.0) % 24  # slow diurnal cycle
+        return {
+            "temperature": rng.uniform(-20, 35) + 5 * ((drift - 12) / 12),
+            "humidity": rng.uniform(10, 100),
+            "pressure": rng.uniform(970, 1040),
+            "wind_speed": rng.uniform(0, 80),
+            "visibility": rng.uniform(1, 20),
+            "cloud_cover": rng.uniform(0, 100),
+            "uv_index": rng.uniform(0, 11),
+            "precipitation": rng.uniform(0, 30)
+        }
+    
+    def fetch(self, locations: List[str], now: Optional[float] = None) -> Dict[str, Dict]:
+        """Current conditions for a batch of locations"""
+        now = time.time() if now is None else now
+        self.fetches += 1
+        return {
+            location: self.observations.get(location) or self.synthetic_reading(location, now)
+            for location in locations
+        }
+
+def load_weather_feed(spec: str):
+    """Instantiate a weather provider from `module:factory`
+    
+    The factory takes no arguments and returns an object whose
+    `fetch(locations, now)` returns {location: observation} for the
+    locations it has current conditions for. Offline stand-ins set
+    `is_synthetic = True` so their readings never reach the store.
+    """
+    import importlib
+    
+    module_name, _, factory = spec.partition(":")
+    if not module_name or not factory:
+        raise ValueError(f"Weather feed must be given as module:factory, got {spec!r}")
+    return getattr(importlib.import_module(module_name), factory)()
+
+class PrecomputedStore:
+    """Durable SQLite store of scored predictions, keyed by (location, time bucket)
+    
+    The scheduler writes each batch in one transaction; readers get the
+    newest result for a location with an indexed point query. WAL mode lets
+    the API read while a scheduler (in-process or another process on the
+    same host) writes.
+    """
+    
+    def __init__(self, path: str, bucket_seconds: float = 300.0, retention_seconds: float = 86400.0):
+        self.path = str(path)
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.local = threading.local()
+        self.writes = 0
+        
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self.connection() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " location TEXT NOT NULL,"
+                " bucket INTEGER NOT NULL,"
+                " scored_at REAL NOT NULL,"
+                " model_version TEXT,"
+                " result TEXT NOT NULL,"
+                " PRIMARY KEY (location, bucket)"
+                ") WITHOUT ROWID"
+            )
+    
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections are not shared across threads)"""
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = self.local.db = sqlite3.connect(self.path, timeout=30.0)
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+    
+    def bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+    
+    def put_many(self, entries: Iterable[Tuple[str, Dict]]):
+        """Write (location, result) pairs; results carry scored_at and model_version"""
+        rows = [
+            (location, self.bucket(result["scored_at"]), result["scored_at"],
+             result.get("model_version"), json_dumps(result).decode("utf-8"))
+            for location, result in entries
+            if result.get("success")
+        ]
+        if not rows:
+            return
+        with self.connection() as db:
+            db.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)", rows)
+        self.writes += len(rows)
+    
+    def lookup(self, location: str, max_age: float, model_version: Optional[str] = None,
+               now: Optional[float] = None) -> Tuple[Optional[Dict], str]:
+        """Newest result for a location no older than max_age: (result, "hit"), else (None, "miss"/"stale")"""
+        now = time.time() if now is None else now
+        row = self.connection().execute(
+            "SELECT scored_at, model_version, result FROM predictions"
+            " WHERE location = ? AND bucket >= ? ORDER BY bucket DESC LIMIT 1",
+            (location, self.bucket(now - max_age))
+        ).fetchone()
+        if row is None:
+            return None, "miss"
+        scored_at, version, result = row
+        # Results from a model version that has since been replaced are stale too
+        if now - scored_at > max_age or (model_version is not None and version != model_version):
+            return None, "stale"
+        return json.loads(result), "hit"
+    
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop results older than the retention window"""
+        now = time.time() if now is None else now
+        with self.connection() as db:
+            cursor = db.execute("DELETE FROM predictions WHERE bucket < ?",
+                                (self.bucket(now - self.retention_seconds),))
+        return cursor.rowcount
+    
+    def stats(self) -> Dict:
+        rows, locations = self.connection().execute(
+            "SELECT COUNT(*), COUNT(DISTINCT location) FROM predictions"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "rows": rows,
+            "locations": locations,
+            "bucket_seconds": self.bucket_seconds,
+            "writes": self.writes
+        }
+
+class LocationScheduler:
+    """Scores registered locations when due, in batches, for this node's shard"""
+    
+    def __init__(self, ai: WeatherAIIntegration, feed, node_id: str = "local",
+                 nodes: Optional[List[str]] = None, batch_size: int = 256,
+                 default_interval: float = 600.0, on_result: Optional[Callable[[str, Dict], None]] = None,
+                 store: Optional[PrecomputedStore] = None, retry_interval: float = 30.0):
+        self.ai = ai
+        self.feed = feed
+        self.node_id = node_id
+        self.batch_size = max(1, batch_size)
+        self.default_interval = default_interval
+        self.on_result = on_result
+        self.store = store
+        self.retry_interval = retry_interval
+        if store is not None and getattr(feed, "is_synthetic", False):
+            raise ValueError("Precomputed results need a live weather feed, not synthetic data")
+        self.ring = ConsistentHashRing(nodes or [node_id])
+        
+        self.locations: Dict[str, Dict] = {}  # every registered location
+        self.schedule: List[tuple] = []  # heap of (next_due, location) for owned locations
+        self.latest: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        
+        self.runs = 0
+        self.batches = 0
+        self.scored = 0
+        self.failures = 0
+        self.batch_errors = 0
+        self.unavailable = 0
+    
+    def owns(self, location: str) -> bool:
+        """Whether this node's shard contains the location"""
+        return self.ring.node_for(location) == self.node_id
+    
+    def register(self, location: str, interval: Optional[float] = None, first_due: Optional[float] = None, **metadata):
+        """Add or update a location; only locations in this node's shard get scheduled"""
+        with self.lock:
+            entry = {
+                "interval": float(interval) if interval else self.default_interval,
+                "next_due": time.time() if first_due is None else first_due,
+                "metadata": metadata
+            }
+            self.locations[location] = entry
+            if self.owns(location):
+                heapq.heappush(self.schedule, (entry["next_due"], location))
+    
+    def unregister(self, location: str):
+        """Stop scheduling a location (stale heap entries are skipped lazily)"""
+        with self.lock:
+            self.locations.pop(location, None)
+            self.latest.pop(location, None)
+    
+    def set_nodes(self, nodes: List[str]):
+        """Re-shard after cluster membership changes"""
+        with self.lock:
+            self.ring = ConsistentHashRing(nodes)
+            self.schedule = [
+                (entry["next_due"], location)
+                for location, entry in self.locations.items()
+                if self.owns(location)
+            ]
+            heapq.heapify(self.schedule)
+    
+    def pop_due(self, now: float) -> List[str]:
+        """Remove and return every owned location due at `now`"""
+        due = []
+        with self.lock:
+            while self.schedule and self.schedule[0][0] <= now:
+                next_due, location = heapq.heappop(self.schedule)
+                entry = self.locations.get(location)
+                if entry is None or entry["next_due"] != next_due:
+                    continue  # unregistered or rescheduled since
+                due.append(location)
+        return due
+    
+    def run_once(self, now: Optional[float] = None) -> int:
+        """Score every due location in batches; returns how many were scored"""
+        now = time.time() if now is None else now
+        due = self.pop_due(now)
+        self.runs += 1
+        scored = 0
+        
+        for batch in iter_batches(due, self.batch_size):
+            missing = []
+            try:
+                weather = self.feed.fetch(batch, now)
+                missing = [location for location in batch if weather.get(location) is None]
+                batch = [location for location in batch if weather.get(location) is not None]
+                results = self.ai.predict_batch([weather[location] for location in batch])
+            except Exception as e:
+                # The batch was already popped: retry it soon rather than drop it
+                batch += missing
+                logger.error(f"❌ Scheduled batch of {len(batch)} locations failed: {e}")
+                self.retry_later(batch, now)
+                with self.lock:
+                    self.batch_errors += 1
+                    self.failures += len(batch)
+                continue
+            
+            # No current conditions from the feed: retry, never guess
+            if missing:
+                self.retry_later(missing, now)
+                with self.lock:
+                    self.unavailable += len(missing)
+            self.batches += 1
+            scored += len(batch)
+            
+            with self.lock:
+                for location, result in zip(batch, results):
+                    entry = self.locations.get(location)
+                    if entry is None:
+                        continue
+                    result = {**result, "location": location, "scored_at": now}
+                    self.latest[location] = result
+                    self.scored += 1
+                    if not result["success"]:
+                        self.failures += 1
+                    
+                    entry["next_due"] = now + entry["interval"]
+                    heapq.heappush(self.schedule, (entry["next_due"], location))
+            
+            if self.store is not None:
+                try:
+                    self.store.put_many((location, self.latest[location]) for location in batch if location in self.latest)
+                except sqlite3.Error as e:
+                    logger.error(f"❌ Precomputed store write failed: {e}")
+            
+            if self.on_result is not None:
+                for location in batch:
+                    if location in self.latest:
+                        try:
+                            self.on_result(location, self.latest[location])
+                        except Exception as e:
+                            logger.error(f"❌ on_result failed for {location}: {e}")
+        
+        return scored
+    
+    def retry_later(self, locations: List[str], now: float):
+        """Reschedule popped locations after min(interval, retry_interval)"""
+        with self.lock:
+            for location in locations:
+                entry = self.locations.get(location)
+                if entry is not None:
+                    entry["next_due"] = now + min(entry["interval"], self.retry_interval)
+                    heapq.heappush(self.schedule, (entry["next_due"], location))
+    
+    def seconds_until_due(self, now: Optional[float] = None) -> Optional[float]:
+        """Time until the next owned location is due (None if nothing is scheduled)"""
+        now = time.time() if now is None else now
+        with self.lock:
+            if not self.schedule:
+                return None
+            return max(0.0, self.schedule[0][0] - now)
+    
+    def run_forever(self, stop_event: threading.Event, idle_sleep: float = 1.0):
+        """Keep scoring due locations until stop_event is set"""
+        while not stop_event.is_set():
+            try:
+                self.run_once()
+                if self.store is not None and self.runs % 100 == 1:
+                    self.store.prune()
+            except Exception as e:
+                # Keep the loop alive: run_once reschedules its own failed batches
+                logger.error(f"❌ Scheduler run failed: {e}")
+                self.batch_errors += 1
+            wait = self.seconds_until_due()
+            stop_event.wait(idle_sleep if wait is None else min(wait, idle_sleep * 60))
+    
+    def stats(self) -> Dict:
+        """Shard ownership and throughput counters"""
+        with self.lock:
+            owned = sum(1 for location in self.locations if self.owns(location))
+        return {
+            "node_id": self.node_id,
+            "nodes": self.ring.nodes,
+            "registered_locations": len(self.locations),
+            "owned_locations": owned,
+            "runs": self.runs,
+            "batches": self.batches,
+            "scored": self.scored,
+            "failures": self.failures,
+            "batch_errors": self.batch_errors,
+            "unavailable": self.unavailable
+        }
+
+def load_location_registry(scheduler: LocationScheduler, feed, path: str):
+    """Register every location in a JSONL registry; the in-memory feed also pins any weather it carries"""
+    for entry in iter_observations(path):
+        if not isinstance(entry, dict) or entry.get("location") in (None, ""):
+            logger.warning(f"⚠️ Skipping registry entry without a location: {getattr(entry, 'error', entry)}")
+            continue
+        location = str(entry["location"])
+        if entry.get("weather") and isinstance(feed, InMemoryWeatherFeed):
+            feed.update(location, entry["weather"])
+        scheduler.register(location, interval=entry.get("interval"))
+
+def open_precomputed_store(path: Optional[str] = None) -> Optional[PrecomputedStore]:
+    """PrecomputedStore configured from PRECOMPUTE_* env vars (None without a path)"""
+    path = path or os.environ.get("PRECOMPUTE_DB", "")
+    if not path:
+        return None
+    return PrecomputedStore(
+        path,
+        bucket_seconds=float(os.environ.get("PRECOMPUTE_BUCKET_SECONDS", "300")),
+        retention_seconds=float(os.environ.get("PRECOMPUTE_RETENTION_SECONDS", "86400"))
+    )
+
+def schedule_cli(args: List[str]):
+    """Handle `--schedule LOCATIONS [--node-id ID] [--nodes a,b,c] [--store DB --feed MOD:FACTORY] [--once]`"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog=f"{Path(__file__).name} --schedule")
+    parser.add_argument("locations", help="JSONL registry: {\"location\", \"interval\"?, \"weather\"?} per line")
+    parser.add_argument("--node-id", default=os.environ.get("SCHEDULER_NODE_ID", "local"))
+    parser.add_argument("--nodes", default=os.environ.get("SCHEDULER_NODES", ""), help="Comma-separated node ids")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--interval", type=float, default=600.0, help="Default scoring interval (seconds)")
+    parser.add_argument("--store", default=os.environ.get("PRECOMPUTE_DB", ""),
+                        help="SQLite file to write results to for the API's precomputed lookups")
+    parser.add_argument("--feed", default=os.environ.get("PRECOMPUTE_FEED", ""),
+                        help="Weather provider as module:factory (default: offline synthetic feed)")
+    parser.add_argument("--once", action="store_true", help="Score everything due now and exit")
+    options = parser.parse_args(args)
+    if options.store and not options.feed:
+        parser.error("--store needs a live weather feed (--feed or PRECOMPUTE_FEED)")
+    
+    nodes = [node for node in options.nodes.split(",") if node] or [options.node_id]
+    feed = load_weather_feed(options.feed) if options.feed else InMemoryWeatherFeed()
+    ai = WeatherAIIntegration()
+    scheduler = LocationScheduler(ai, feed, node_id=options.node_id, nodes=nodes,
+                                  batch_size=options.batch_size, default_interval=options.interval,
+                                  store=open_precomputed_store(options.store))
+    load_location_registry(scheduler, feed, options.locations)
+    
+    stats = scheduler.stats()
+    print(f"📍 Node {options.node_id}: {stats['owned_locations']}/{stats['registered_locations']} locations in shard")
+    
+    if options.once:
+        started = time.perf_counter()
+        scored = scheduler.run_once()
+        print(f"✅ Scored {scored} locations in {time.perf_counter() - started:.2f}s")
+        return
+    
+    stop_event = threading.Event()
+    try:
+        scheduler.run_forever(stop_event)
+    except KeyboardInterrupt:
+        stop_event.set()
+        print(f"\n🛑 Scheduler stopped: {scheduler.stats()}")
+
+# Bulk scoring (historical archives)
+class MalformedObservation(str):
+    """Raw text of an input line that is not valid JSON; scored as a per-row error"""
+    
+    def __new__(cls, text: str, error: str):
+        line = super().__new__(cls, text)
+        line.error = error
+        return line
+
+def iter_observations(input_path: str) -> Iterator[Dict]:
+    """Stream observations from a JSONL or CSV file ("-" reads JSONL from stdin)"""
+    if input_path == "-":
+        source = sys.stdin
+    else:
+        source = open(input_path, newline="", encoding="utf-8")
+    
+    try:
+        if input_path.lower().endswith(".csv"):
+            for row in csv.DictReader(source):
+                # Empty CSV cells fall back to extract_features defaults
+                yield {key: value for key, value in row.items() if value not in ("", None)}
+        else:
+            for number, line in enumerate(source, 1):
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield MalformedObservation(line, f"line {number}: invalid JSON ({e})")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Group an iterable into fixed-size lists without materializing it"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def result_record(row: int, result: Dict) -> Dict:
+    """Flatten a prediction into one output record"""
+    record = {
+        "row": row,
+        "success": result["success"],
+        "algorithm": result.get("algorithm"),
+        "confidence": result.get("confidence"),
+        "event_type": result.get("event_type"),
+        "rarity": result.get("rarity"),
+        "model_type": result.get("model_type"),
+        "error": result.get("error")
+    }
+    for algorithm, prediction in result.get("all_predictions", {}).items():
+        record[f"confidence_{algorithm}"] = prediction["confidence"]
+    return record
+
+class JsonlResultWriter:
+    """Appends result records (with their input) as JSON lines"""
+    
+    def __init__(self, output_path: str):
+        self.file = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8")
+    
+    def write(self, records: List[Dict], observations: List[Dict]):
+        for record, observation in zip(records, observations):
+            self.file.write(json.dumps({**record, "input": observation}) + "\n")
+        self.file.flush()
+    
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+class ParquetResultWriter:
+    """Writes result records as Parquet row groups, one per batch"""
+    
+    def __init__(self, output_path: str, algorithms: Iterable[str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        self.pa = pa
+        self.schema = pa.schema(
+            [
+                ("row", pa.int64()),
+                ("success", pa.bool_()),
+                ("algorithm", pa.string()),
+                ("confidence", pa.float64()),
+                ("event_type", pa.string()),
+                ("rarity", pa.string()),
+                ("model_type", pa.string()),
+                ("error", pa.string())
+            ]
+            + [(f"confidence_{algorithm}", pa.float64()) for algorithm in algorithms]
+        )
+        self.writer = pq.ParquetWriter(output_path, self.schema)
+    
+    def write(self, records: List[Dict], observations: List[Dict]):
+        self.writer.write_table(self.pa.Table.from_pylist(records, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+def score_stream(ai: WeatherAIIntegration, observations: Iterable[Dict], batch_size: int = 256) -> Iterator[Tuple[List[Dict], List[Dict]]]:
+    """Score a stream of observations in fixed-size batches"""
+    for batch in iter_batches(observations, batch_size):
+        yield batch, ai.predict_batch(batch)
+
+def score_file(ai: WeatherAIIntegration, input_path: str, output_path: str, batch_size: int = 256,
+               output_format: Optional[str] = None, progress_interval: float = 5.0) -> Dict:
+    """Stream an observation archive through the models into a results file"""
+    if output_format is None:
+        output_format = "parquet" if output_path.lower().endswith(".parquet") else "jsonl"
+    if output_format == "parquet":
+        writer = ParquetResultWriter(output_path, ai.algorithms.keys())
+    else:
+        writer = JsonlResultWriter(output_path)
+    
+    rows = 0
+    failures = 0
+    started = time.perf_counter()
+    last_report = started
+    try:
+        for observations, results in score_stream(ai, iter_observations(input_path), batch_size):
+            records = [result_record(rows + offset, result) for offset, result in enumerate(results)]
+            writer.write(records, observations)
+            rows += len(records)
+            failures += sum(1 for result in results if not result["success"])
+            
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                print(f"   ⏳ {rows:,} rows scored ({rows / (now - started):,.0f} rows/s)", file=sys.stderr)
+    finally:
+        writer.close()
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "failures": failures,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+        "output": output_path,
+        "format": output_format
+    }
+
+def score_file_cli(args: List[str]):
+    """Handle `--score-file INPUT [--output PATH] [--batch-size N] [--format jsonl|parquet]`"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog=f"{Path(__file__).name} --score-file")
+    parser.add_argument("input", help="JSONL or CSV observations ('-' for JSONL on stdin)")
+    parser.add_argument("--output", default="-", help="Results path (.jsonl or .parquet, '-' for stdout)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default=None)
+    options = parser.parse_args(args)
+    
+    ai = WeatherAIIntegration()
+    try:
+        summary = score_file(ai, options.input, options.output, options.batch_size, options.format)
+    except ImportError as e:
+        print(f"❌ Parquet output requires pyarrow: {e}", file=sys.stderr)
+        return
+    print(
+        f"✅ Scored {summary['rows']:,} rows ({summary['failures']:,} failed) in {summary['seconds']:.1f}s "
+        f"- {summary['rows_per_second']:,.0f} rows/s → {summary['output']}",
+        file=sys.stderr
+    )
+
+def run_server():
+    """Start the API server; it binds before the models finish warming up"""
+    try:
+        app, _ = create_api_server()
+        if app:
+            print(f"\n🚀 Starting API server on http://localhost:8000")
+            print(f"📝 API docs: http://localhost:8000/docs")
+            
+            # Import uvicorn here to avoid global import issues
+            import uvicorn
+            uvicorn.run(app, host="0.0.0.0", port=8000)
+        else:
+            print("❌ Cannot start server - FastAPI not available")
+    except Exception as e:
+        print(f"❌ Server error: {e}")
+
 # CLI interface
 def main():
     """Main CLI interface"""
+    # Bulk-score a historical archive (before the banner: results may go to stdout)
+    if len(sys.argv) > 1 and sys.argv[1] == "--score-file":
+        score_file_cli(sys.argv[2:])
+        return
+    
+    # Benchmark suite (JSON report on stdout by default)
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from benchmarks.prediction_bench import run_cli
+        run_cli(sys.modules[__name__], sys.argv[2:])
+        return
+    
+    # Reduced-precision accuracy drift against float32 (JSON report on stdout by default)
+    if len(sys.argv) > 1 and sys.argv[1] == "--precision-report":
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from benchmarks.precision_report import run_cli
+        run_cli(sys.modules[__name__], sys.argv[2:])
+        return
+    
     print("🌦️ WeatherNFT.live - SD PyTorch Integration")
     print("=" * 50)
     
+    # Start API server if requested, skipping the blocking self-test so the
+    # port is bound right away
+    if len(sys.argv) > 1 and sys.argv[1] == "--server":
+        run_server()
+        return
+    
+    # Persist the current model weights as a new artifact version
+    if len(sys.argv) > 1 and sys.argv[1] == "--save-models":
+        ai = WeatherAIIntegration()
+        if not ai.pytorch_available:
+            print("❌ Cannot save models - PyTorch not available")
+            return
+        version = ai.save_model_artifacts()
+        print(f"💾 Saved model artifacts: {ai.artifact_store.root / version}")
+        return
+    
+    # Scheduled scoring for this node's shard of the location registry
+    if len(sys.argv) > 1 and sys.argv[1] == "--schedule":
+        schedule_cli(sys.argv[2:])
+        return
+    
     # Initialize AI
     ai = WeatherAIIntegration()
     
@@ -395,23 +4039,7 @@ def main():
     else:
         print(f"❌ Prediction failed: {result['error']}")
     
-    # Start API server if requested
-    if len(sys.argv) > 1 and sys.argv[1] == "--server":
-        try:
-            app, _ = create_api_server()
-            if app:
-                print(f"\n🚀 Starting API server on http://localhost:8000")
-                print(f"📝 API docs: http://localhost:8000/docs")
-                
-                # Import uvicorn here to avoid global import issues
-                import uvicorn
-                uvicorn.run(app, host="0.0.0.0", port=8000)
-            else:
-                print("❌ Cannot start server - FastAPI not available")
-        except Exception as e:
-            print(f"❌ Server error: {e}")
-    else:
-        print(f"\n💡 To start API server: python {__file__} --server")
+    print(f"\n💡 To start API server: python {__file__} --server")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,121 +1,315 @@
 #!/usr/bin/env python3
 """
 Simple SD AI Mock Server for Testing
+Concurrent asyncio HTTP/1.1 server with keep-alive, artificial latency and
+error injection. With --engine fallback, predictions come from the real
+WeatherAIIntegration fallback engine (no torch required).
 """
 
+import os
+import sys
 import json
-import http.server
-import socketserver
-from urllib.parse import urlparse, parse_qs
+import random
+import asyncio
+import argparse
+import importlib.util
+from pathlib import Path
+from contextlib import suppress
+from urllib.parse import urlsplit
 from datetime import datetime
 
-class SDMockHandler(http.server.BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            response = {
-                "status": "healthy",
-                "model_status": "ready",
-                "sd_environment": False,
-                "pytorch_available": False,
-                "algorithms_count": 5,
-                "timestamp": datetime.now().isoformat()
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
-        elif self.path == '/model/info':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            response = {
-                "status": "ready",
-                "sd_environment": False,
-                "pytorch_available": False,
-                "algorithms": {
-                    "ThermalDrift-v2": {"accuracy": 94.2, "model_type": "LSTM", "status": "ready"},
-                    "StormChaser-v4": {"accuracy": 97.8, "model_type": "CNN-LSTM", "status": "ready"},
-                    "EcoBalance-v1": {"accuracy": 91.5, "model_type": "Transformer", "status": "ready"},
-                    "AuroraPredictor-v3": {"accuracy": 89.3, "model_type": "RNN", "status": "ready"},
-                    "AquaDetect-v2": {"accuracy": 96.1, "model_type": "GRU", "status": "ready"}
-                },
-                "algorithms_count": 5,
-                "python_version": "3.8.10 (default, Nov 14 2022, 12:59:47)",
-                "timestamp": datetime.now().isoformat()
-            }
-            self.wfile.write(json.dumps(response).encode())
+ALGORITHMS = {
+    "ThermalDrift-v2": {"accuracy": 94.2, "model_type": "LSTM", "status": "ready"},
+    "StormChaser-v4": {"accuracy": 97.8, "model_type": "CNN-LSTM", "status": "ready"},
+    "EcoBalance-v1": {"accuracy": 91.5, "model_type": "Transformer", "status": "ready"},
+    "AuroraPredictor-v3": {"accuracy": 89.3, "model_type": "RNN", "status": "ready"},
+    "AquaDetect-v2": {"accuracy": 96.1, "model_type": "GRU", "status": "ready"}
+}
+
+MOCK_PREDICTION = {
+    "success": True,
+    "algorithm": "StormChaser-v4",
+    "confidence": 0.87,
+    "event_type": "thunderstorm",
+    "rarity": "rare",
+    "all_predictions": {
+        "ThermalDrift-v2": {"confidence": 0.72, "event_type": "heat_wave", "rarity": "rare"},
+        "StormChaser-v4": {"confidence": 0.87, "event_type": "thunderstorm", "rarity": "rare"},
+        "EcoBalance-v1": {"confidence": 0.65, "event_type": "climate_shift", "rarity": "uncommon"}
+    },
+    "model_type": "fallback"
+}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 422: "Unprocessable Entity",
+           500: "Internal Server Error", 501: "Not Implemented"}
+
+class LatencyModel:
+    """Artificial latency in milliseconds, e.g. `fixed:50`, `uniform:10:80`,
+    `normal:50:10`, `lognormal:40:0.5` (median, sigma) or `exponential:30` (mean)"""
+    
+    def __init__(self, spec: str = "0", rng: random.Random = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, params = spec.partition(":")
+        if kind.replace(".", "", 1).isdigit():
+            kind, params = "fixed", kind
+        self.kind = kind
+        self.params = [float(value) for value in params.split(":") if value]
+        
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+        if expected.get(kind) != len(self.params):
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+    
+    def sample(self) -> float:
+        """Draw one delay in seconds"""
+        rng, params = self.rng, self.params
+        if self.kind == "fixed":
+            delay = params[0]
+        elif self.kind == "uniform":
+            delay = rng.uniform(params[0], params[1])
+        elif self.kind == "normal":
+            delay = rng.gauss(params[0], params[1])
+        elif self.kind == "lognormal":
+            delay = params[0] * rng.lognormvariate(0.0, params[1])
         else:
-            self.send_response(404)
-            self.end_headers()
-    
-    def do_POST(self):
-        if self.path == '/predict':
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            
-            try:
-                weather_data = json.loads(post_data.decode('utf-8'))
+            delay = rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+        return max(0.0, delay) / 1000
+
+class MockBackend:
+    """Canned responses"""
+    
+    name = "mock"
+    
+    def health(self):
+        return {
+            "status": "healthy",
+            "model_status": "ready",
+            "sd_environment": False,
+            "pytorch_available": False,
+            "algorithms_count": len(ALGORITHMS),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def model_info(self):
+        return {
+            "status": "ready",
+            "sd_environment": False,
+            "pytorch_available": False,
+            "algorithms": ALGORITHMS,
+            "algorithms_count": len(ALGORITHMS),
+            "python_version": "3.8.10 (default, Nov 14 2022, 12:59:47)",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def predict_batch(self, weather_batch):
+        return [MOCK_PREDICTION for _ in weather_batch]
+    
+    def failure_status(self, result) -> int:
+        return 500
+
+class FallbackBackend:
+    """Real WeatherAIIntegration in fallback mode"""
+    
+    name = "fallback"
+    
+    def __init__(self):
+        # Never pick up torch or start worker processes, even if available
+        os.environ.setdefault("AI_FORCE_FALLBACK", "1")
+        os.environ.setdefault("INFERENCE_WORKERS", "0")
+        
+        path = Path(__file__).resolve().parent / "sd-pytorch-integration.py"
+        spec = importlib.util.spec_from_file_location("sd_pytorch_integration", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        self.module = module
+        self.ai = module.WeatherAIIntegration()
+    
+    def health(self):
+        return self.ai.health_json()
+    
+    def model_info(self):
+        return self.ai.model_info_json()
+    
+    def predict_batch(self, weather_batch):
+        return self.ai.predict_batch(weather_batch)
+    
+    def failure_status(self, result) -> int:
+        """Same mapping as the real server (422 for rejected observations)"""
+        return self.module.failure_status(result)
+
+class MockServer:
+    """HTTP/1.1 keep-alive server; one coroutine per connection"""
+    
+    def __init__(self, backend, latency: LatencyModel, error_rate: float = 0.0,
+                 keepalive_timeout: float = 15.0, rng: random.Random = None):
+        self.backend = backend
+        self.latency = latency
+        self.error_rate = error_rate
+        self.keepalive_timeout = keepalive_timeout
+        self.rng = rng or random.Random()
+        self.stats = {"connections": 0, "open_connections": 0, "requests": 0, "injected_errors": 0}
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it or goes idle"""
+        self.stats["connections"] += 1
+        self.stats["open_connections"] += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError, ConnectionError):
+                    break
                 
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                parts = request_line.split(" ")
+                if len(parts) != 3:
+                    await self.send(writer, 400, {"detail": "Malformed request line"}, keep_alive=False)
+                    break
+                method, target, version = parts
                 
-                # Mock prediction
-                response = {
-                    "success": True,
-                    "algorithm": "StormChaser-v4",
-                    "confidence": 0.87,
-                    "event_type": "thunderstorm",
-                    "rarity": "rare",
-                    "all_predictions": {
-                        "ThermalDrift-v2": {"confidence": 0.72, "event_type": "heat_wave", "rarity": "rare"},
-                        "StormChaser-v4": {"confidence": 0.87, "event_type": "thunderstorm", "rarity": "rare"},
-                        "EcoBalance-v1": {"confidence": 0.65, "event_type": "climate_shift", "rarity": "uncommon"}
-                    },
-                    "model_type": "fallback"
-                }
-                self.wfile.write(json.dumps(response).encode())
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
                 
-            except Exception as e:
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    await self.send(writer, 501, {"detail": "Chunked request bodies are not supported"}, keep_alive=False)
+                    break
+                try:
+                    body = await reader.readexactly(int(headers.get("content-length") or 0))
+                except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+                    break
                 
-                error_response = {
-                    "success": False,
-                    "error": str(e),
-                    "model_type": "error"
-                }
-                self.wfile.write(json.dumps(error_response).encode())
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                
+                self.stats["requests"] += 1
+                status, payload = await self.dispatch(method, urlsplit(target).path, body)
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            self.stats["open_connections"] -= 1
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+    
+    async def dispatch(self, method: str, path: str, body: bytes):
+        """Route a request to (status, payload); handlers return the same pair"""
+        if method == "OPTIONS":
+            return 200, None
+        
+        if method == "GET" and path == "/mock/stats":
+            return 200, {**self.stats, "backend": self.backend.name, "latency": self.latency.spec, "error_rate": self.error_rate}
+        
+        routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/model/info"): self.model_info,
+            ("POST", "/predict"): self.predict,
+            ("POST", "/predict/batch"): self.predict_batch
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            return 404, {"detail": "Not Found"}
+        
+        delay = self.latency.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate > 0 and self.rng.random() < self.error_rate:
+            self.stats["injected_errors"] += 1
+            return 500, {"success": False, "error": "Injected mock error", "model_type": "error"}
+        
+        try:
+            return await handler(body)
+        except Exception as e:
+            return 500, {"success": False, "error": str(e), "model_type": "error"}
+    
+    async def health(self, body: bytes):
+        return 200, self.backend.health()
+    
+    async def model_info(self, body: bytes):
+        return 200, self.backend.model_info()
+    
+    async def predict(self, body: bytes):
+        weather_data = json.loads(body.decode("utf-8") or "{}")
+        result = (await self.score([weather_data]))[0]
+        if not result["success"]:
+            # Failed single predictions are errors, as on the real server
+            return self.backend.failure_status(result), {"detail": result["error"]}
+        return 200, result
+    
+    async def predict_batch(self, body: bytes):
+        weather_batch = json.loads(body.decode("utf-8") or "[]")
+        return 200, {"results": await self.score(weather_batch)}
+    
+    async def score(self, weather_batch):
+        """Score off the event loop so slow batches don't stall other connections"""
+        if isinstance(self.backend, MockBackend):
+            return self.backend.predict_batch(weather_batch)
+        return await asyncio.get_running_loop().run_in_executor(None, self.backend.predict_batch, weather_batch)
+    
+    async def send(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool = True):
+        """Write one JSON response"""
+        if payload is None:
+            body = b""
+        elif isinstance(payload, bytes):
+            body = payload
         else:
-            self.send_response(404)
-            self.end_headers()
-    
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+            body = json.dumps(payload).encode()
+        
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+            "Access-Control-Allow-Headers: Content-Type",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+async def serve(server: MockServer, host: str, port: int):
+    """Run until cancelled"""
+    listener = await asyncio.start_server(server.handle_connection, host or None, port, backlog=1024)
+    async with listener:
+        await listener.serve_forever()
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(description="WeatherNFT SD AI mock server")
+    parser.add_argument("--host", default=os.environ.get("MOCK_HOST", ""), help="Bind address (default: all interfaces)")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MOCK_PORT", "8000")))
+    parser.add_argument("--latency", default=os.environ.get("MOCK_LATENCY", "0"),
+                        help="Latency in ms: N, fixed:N, uniform:MIN:MAX, normal:MEAN:STD, lognormal:MEDIAN:SIGMA, exponential:MEAN")
+    parser.add_argument("--error-rate", type=float, default=float(os.environ.get("MOCK_ERROR_RATE", "0")),
+                        help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--engine", choices=["mock", "fallback"], default=os.environ.get("MOCK_ENGINE", "mock"),
+                        help="'fallback' scores with the real WeatherAIIntegration fallback engine")
+    parser.add_argument("--keepalive-timeout", type=float, default=float(os.environ.get("MOCK_KEEPALIVE_TIMEOUT", "15")))
+    parser.add_argument("--seed", type=int, default=None, help="Seed latency and error sampling")
+    return parser.parse_args(args)
 
 if __name__ == "__main__":
-    PORT = 8000
-    
-    with socketserver.TCPServer(("", PORT), SDMockHandler) as httpd:
-        print("🌦️ Simple SD AI Mock Server")
-        print("=" * 30)
-        print(f"✅ Server running on http://localhost:{PORT}")
-        print("📊 Endpoints:")
-        print("   • GET  /health      - Health check")
-        print("   • GET  /model/info  - Model information")
-        print("   • POST /predict     - Weather prediction")
-        print("")
-        print("🧪 Mock mode for testing admin panel integration")
-        httpd.serve_forever()
\ No newline at end of file
+    options = parse_args(sys.argv[1:])
+    rng = random.Random(options.seed)
+    backend = FallbackBackend() if options.engine == "fallback" else MockBackend()
+    server = MockServer(backend, LatencyModel(options.latency, rng), options.error_rate,
+                        options.keepalive_timeout, rng)
+    
+    print("🌦️ Simple SD AI Mock Server")
+    print("=" * 30)
+    print(f"✅ Server running on http://localhost:{options.port}")
+    print("📊 Endpoints:")
+    print("   • GET  /health        - Health check")
+    print("   • GET  /model/info    - Model information")
+    print("   • POST /predict       - Weather prediction")
+    print("   • POST /predict/batch - Batch prediction")
+    print("   • GET  /mock/stats    - Mock server counters")
+    print("")
+    print(f"🧪 Engine: {backend.name} | latency: {options.latency} ms | error rate: {options.error_rate:.1%}")
+    
+    try:
+        asyncio.run(serve(server, options.host, options.port))
+    except KeyboardInterrupt:
+        print("🛑 Mock server stopped")
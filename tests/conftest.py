@@ -0,0 +1,96 @@
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+MODULE_PATH = Path(__file__).resolve().parent.parent / "sd-pytorch-integration.py"
+
+
+def load_integration_module():
+    """Import the hyphenated service script as a module"""
+    module = sys.modules.get("sd_pytorch_integration")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("sd_pytorch_integration", MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["sd_pytorch_integration"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def sdpi():
+    return load_integration_module()
+
+
+@pytest.fixture
+def make_integration(sdpi, monkeypatch, tmp_path):
+    """Build a WeatherAIIntegration in-process with no workers or saved artifacts"""
+    def make(**env):
+        settings = {
+            "INFERENCE_WORKERS": "0",
+            "MODEL_ARTIFACT_DIR": str(tmp_path / "models"),
+            "PREDICTION_CACHE_SIZE": "0",
+            **env
+        }
+        for name, value in settings.items():
+            monkeypatch.setenv(name, value)
+        return sdpi.WeatherAIIntegration()
+    return make
+
+
+@pytest.fixture(scope="session")
+def torch_ai(sdpi, tmp_path_factory):
+    """One PyTorch-mode integration shared by the model tests (skipped without torch)"""
+    pytest.importorskip("torch")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("INFERENCE_WORKERS", "0")
+        monkeypatch.setenv("MODEL_ARTIFACT_DIR", str(tmp_path_factory.mktemp("models")))
+        monkeypatch.setenv("PREDICTION_CACHE_SIZE", "0")
+        monkeypatch.setenv("CONTEXT_WINDOW", "6")
+        monkeypatch.delenv("AI_FORCE_FALLBACK", raising=False)
+        monkeypatch.delenv("MODEL_PRECISION", raising=False)
+        ai = sdpi.WeatherAIIntegration()
+    assert ai.pytorch_available
+    return ai
+
+
+@pytest.fixture
+def random_rows():
+    """Plausible feature rows (8 columns, as FeatureSchema produces)"""
+    def rows(count, seed=11):
+        rng = random.Random(seed)
+        return [[rng.uniform(-30, 45), rng.uniform(0, 100), rng.uniform(950, 1050), rng.uniform(0, 40),
+                 rng.uniform(0, 360), rng.uniform(0, 50), rng.uniform(0, 11), rng.uniform(0, 1)]
+                for _ in range(count)]
+    return rows
+
+
+@pytest.fixture
+def make_client(sdpi, monkeypatch, tmp_path):
+    """Start the FastAPI app (fallback models, no workers) under a test client"""
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    
+    clients = []
+    
+    def make(**env):
+        settings = {
+            "AI_FORCE_FALLBACK": "1",
+            "AI_BACKGROUND_STARTUP": "0",
+            "INFERENCE_WORKERS": "0",
+            "MODEL_ARTIFACT_DIR": str(tmp_path / "models"),
+            **env
+        }
+        for name, value in settings.items():
+            monkeypatch.setenv(name, value)
+        app, ai = sdpi.create_api_server()
+        client = TestClient(app)
+        client.__enter__()
+        clients.append(client)
+        return client, ai
+    
+    yield make
+    for client in clients:
+        client.__exit__(None, None, None)
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+def mapped_file(address):
+    """File backing a memory address, from /proc/self/maps (Linux)"""
+    for line in Path("/proc/self/maps").read_text().splitlines():
+        span, *fields = line.split()
+        start, end = (int(bound, 16) for bound in span.split("-"))
+        if start <= address < end:
+            return fields[4] if len(fields) > 4 else None
+    return None
+
+
+def flat(rows):
+    return [value for row in rows for value in row]
+
+
+@pytest.fixture
+def saved(make_integration, tmp_path):
+    """A fresh integration whose weights were saved as the LATEST artifact"""
+    ai = make_integration()
+    version = ai.save_model_artifacts()
+    return ai, tmp_path / "models" / version
+
+
+def test_artifact_holds_weights_and_stacked_engine(saved):
+    ai, directory = saved
+    files = sorted(path.name for path in directory.iterdir())
+    assert files == sorted([f"{algorithm}.pt" for algorithm in ai.algorithms] + ["engine.pt", "manifest.json"])
+
+
+def test_engine_runs_on_memory_mapped_artifact_tensors(saved, make_integration, random_rows):
+    ai, directory = saved
+    loaded = make_integration()
+    engine = loaded.get_batched_engine()
+    assert set(loaded.model_sources.values()) == {"artifact"}
+    
+    if not Path("/proc/self/maps").is_file():
+        pytest.skip("needs /proc/self/maps")
+    for weight, _ in engine.projections.values():
+        assert mapped_file(weight.data_ptr()) == str(directory / "engine.pt")
+    
+    rows = random_rows(32, seed=71)
+    assert flat(loaded.score_features_local(rows)) == pytest.approx(flat(ai.score_features_local(rows)), abs=1e-6)
+
+
+def test_lazy_mode_scores_without_building_modules(saved, make_integration, random_rows):
+    ai, _ = saved
+    lazy = make_integration(MODEL_INIT_MODE="lazy")
+    rows = random_rows(8, seed=72)
+    assert flat(lazy.score_features_local(rows)) == pytest.approx(flat(ai.score_features_local(rows)), abs=1e-6)
+    assert not lazy.pytorch_models
+
+
+@pytest.mark.parametrize("precision", ["bfloat16", "int8"])
+def test_reduced_precision_engines_load_from_artifact(saved, make_integration, random_rows, precision):
+    ai, _ = saved
+    loaded = make_integration(MODEL_PRECISION=precision)
+    rows = random_rows(16, seed=73)
+    assert loaded.get_batched_engine().precision == precision
+    assert flat(loaded.score_features_local(rows)) == pytest.approx(flat(ai.score_features_local(rows)), abs=0.02)
+
+
+@pytest.mark.parametrize("precision", ["bfloat16", "int8"])
+def test_reduced_precision_releases_artifact_float_modules(saved, make_integration, random_rows, precision):
+    ai, _ = saved
+    loaded = make_integration(MODEL_PRECISION=precision)
+    assert not loaded.pytorch_models
+    
+    rows = random_rows(8, seed=74)
+    names = tuple(loaded.algorithms)[:2]
+    subset = loaded.get_subset_engine(names).predict(rows)
+    assert flat(subset) == pytest.approx(flat([row[:2] for row in loaded.score_features_local(rows)]), abs=1e-6)
+    
+    # Per-algorithm paths reload the same weights from the artifact
+    algorithm = names[0]
+    assert loaded.pytorch_predict(algorithm, rows[0]) == pytest.approx(ai.pytorch_predict(algorithm, rows[0]), abs=1e-6)
+    assert loaded.model_sources[algorithm] == "artifact"
+
+
+def test_reduced_precision_keeps_fresh_float_modules(make_integration):
+    fresh = make_integration(MODEL_PRECISION="int8")
+    assert set(fresh.pytorch_models) == set(fresh.algorithms)
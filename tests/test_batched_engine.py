@@ -0,0 +1,45 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+def test_batched_predict_matches_per_model_modules(torch_ai, random_rows):
+    rows = random_rows(64)
+    batched = torch_ai.get_batched_engine().predict(rows)
+    for row, confidences in zip(rows, batched):
+        expected = [torch_ai.pytorch_predict(algorithm, row) for algorithm in torch_ai.algorithms]
+        assert confidences == pytest.approx(expected, abs=1e-5)
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 256])
+def test_batch_size_does_not_change_scores(torch_ai, random_rows, batch_size):
+    engine = torch_ai.get_batched_engine()
+    rows = random_rows(batch_size, seed=batch_size)
+    single = [engine.predict([row])[0] for row in rows]
+    for together, alone in zip(engine.predict(rows), single):
+        assert together == pytest.approx(alone, abs=1e-5)
+
+
+def test_sequence_forward_matches_per_model_modules(torch_ai, random_rows):
+    engine = torch_ai.get_batched_engine()
+    sequences = engine.normalize(torch.tensor(random_rows(5 * 6, seed=5)).view(5, 6, -1))
+    with torch.no_grad():
+        batched = engine.forward(sequences)
+        expected = torch.stack([
+            torch_ai.get_pytorch_model(algorithm)(sequences).reshape(-1)
+            for algorithm in engine.algorithm_names
+        ], dim=1)
+    assert torch.allclose(batched, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("precision", ["float32", "int8"])
+def test_subset_engine_matches_full_engine_columns(sdpi, torch_ai, random_rows, precision):
+    models = {algorithm: torch_ai.get_pytorch_model(algorithm) for algorithm in torch_ai.algorithms}
+    engine = sdpi.BatchedLSTMEngine(models, precision=precision, normalization=torch_ai.models.normalization)
+    names = [engine.algorithm_names[3], engine.algorithm_names[0]]
+    rows = random_rows(16, seed=17)
+    
+    subset = engine.subset(names)
+    assert subset.algorithm_names == names
+    for full, partial in zip(engine.predict(rows), subset.predict(rows)):
+        assert partial == pytest.approx([full[3], full[0]], abs=1e-6)
@@ -0,0 +1,92 @@
+import math
+import random
+
+import pytest
+
+ALGORITHMS = ("ThermalDrift-v2", "StormChaser-v4", "EcoBalance-v1", "AuroraPredictor-v3", "AquaDetect-v2",
+              "Unlisted-v1")
+
+LEGACY_EVENT_TYPES = {
+    "ThermalDrift-v2": ["heat_wave", "cold_snap", "thermal_anomaly"],
+    "StormChaser-v4": ["thunderstorm", "tornado", "hurricane"],
+    "EcoBalance-v1": ["climate_shift", "seasonal_anomaly", "eco_change"],
+    "AuroraPredictor-v3": ["aurora_borealis", "solar_storm", "magnetic_anomaly"],
+    "AquaDetect-v2": ["heavy_rain", "flood", "drought"]
+}
+
+
+def legacy_event_type(algorithm, confidence):
+    """get_event_type as it was before the lookup tables"""
+    types = LEGACY_EVENT_TYPES.get(algorithm, ["weather_event"])
+    if confidence > 0.8:
+        return types[0]
+    elif confidence > 0.6:
+        return types[1] if len(types) > 1 else types[0]
+    else:
+        return types[2] if len(types) > 2 else types[0]
+
+
+def legacy_rarity(confidence):
+    """calculate_rarity as it was before the lookup tables"""
+    if confidence >= 0.95:
+        return "legendary"
+    elif confidence >= 0.85:
+        return "epic"
+    elif confidence >= 0.70:
+        return "rare"
+    elif confidence >= 0.50:
+        return "uncommon"
+    else:
+        return "common"
+
+
+def legacy_prediction(confidences):
+    """build_prediction's per-algorithm labels and best pick, from the old if-chains"""
+    predictions = {
+        algorithm: {"confidence": confidence, "event_type": legacy_event_type(algorithm, confidence),
+                    "rarity": legacy_rarity(confidence), "algorithm": algorithm}
+        for algorithm, confidence in zip(ALGORITHMS, confidences)
+    }
+    best = max(predictions.keys(), key=lambda k: predictions[k]["confidence"])
+    return best, predictions
+
+
+def parity_rows(count=2000, seed=13):
+    """Random confidences with every threshold, its neighbours, ties and NaN mixed in"""
+    rng = random.Random(seed)
+    specials = [0.0, 1.0, float("nan")]
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.85, 0.95):
+        specials += [threshold, math.nextafter(threshold, 0.0), math.nextafter(threshold, 1.0)]
+    rows = []
+    for _ in range(count):
+        row = [rng.random() for _ in ALGORITHMS]
+        for index in rng.sample(range(len(row)), rng.randint(0, 3)):
+            row[index] = rng.choice(specials)
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("batch_size", [2000, 1])
+def test_tables_match_legacy_if_chains(make_integration, batch_size):
+    ai = make_integration(AI_FORCE_FALLBACK="1")
+    rows = parity_rows()
+    results = []
+    for start in range(0, len(rows), batch_size):
+        results.extend(ai.build_predictions(rows[start:start + batch_size], ALGORITHMS))
+    
+    for row, result in zip(rows, results):
+        best, predictions = legacy_prediction(row)
+        assert result["algorithm"] == best
+        assert result["event_type"] == predictions[best]["event_type"]
+        assert result["rarity"] == predictions[best]["rarity"]
+        for algorithm, expected in predictions.items():
+            actual = result["all_predictions"][algorithm]
+            assert (actual["event_type"], actual["rarity"]) == (expected["event_type"], expected["rarity"])
+
+
+def test_scalar_helpers_match_legacy_if_chains(make_integration):
+    ai = make_integration(AI_FORCE_FALLBACK="1")
+    for row in parity_rows(200, seed=14):
+        for algorithm, confidence in zip(ALGORITHMS, row):
+            assert ai.get_event_type(algorithm, confidence) == legacy_event_type(algorithm, confidence)
+            assert ai.calculate_rarity(confidence) == legacy_rarity(confidence)
@@ -0,0 +1,101 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+def full_window_scores(ai, rows):
+    """Score the last of `rows` by running the whole sequence through the batched engine"""
+    engine = ai.get_batched_engine()
+    sequence = engine.normalize(torch.tensor([rows], dtype=torch.float32))
+    with torch.no_grad():
+        return engine.forward(sequence)[0].tolist()
+
+
+def step(ai, context, row):
+    return ai.context_step([(context, row)])[0]
+
+
+def test_incremental_steps_match_full_window_replay(torch_ai, random_rows):
+    store = torch_ai.context_store
+    rows = random_rows(store.window, seed=21)
+    context = store.get("parity")
+    for end in range(1, len(rows) + 1):
+        incremental = step(torch_ai, context, rows[end - 1])
+        assert incremental == pytest.approx(full_window_scores(torch_ai, rows[:end]), abs=1e-5)
+
+
+def test_state_is_reprimed_once_per_window_after_it_wraps(torch_ai, random_rows):
+    store = torch_ai.context_store
+    window = store.window
+    rows = random_rows(4 * window, seed=22)
+    context = store.get("wrapping")
+    replays = store.replays
+    
+    exact_steps = []
+    for end in range(1, len(rows) + 1):
+        before = store.replays
+        incremental = step(torch_ai, context, rows[end - 1])
+        replayed = full_window_scores(torch_ai, rows[max(0, end - window):end])
+        assert incremental == pytest.approx(replayed, abs=2e-2)
+        if end <= window or store.replays > before:
+            assert incremental == pytest.approx(replayed, abs=1e-5)
+            exact_steps.append(end)
+        assert context.state_rows <= 2 * window - 1
+    
+    assert store.window_rows(context) == rows[-window:]
+    reprimes = store.replays - replays
+    assert reprimes == (len(rows) - window) // window
+    assert len(exact_steps) == window + reprimes
+
+
+def test_locations_stepped_together_match_stepped_alone(torch_ai, random_rows):
+    store = torch_ai.context_store
+    histories = {"together-a": random_rows(1, seed=1), "together-b": random_rows(4, seed=2), "together-c": []}
+    alone = {}
+    for location, history in histories.items():
+        context = store.get(location + "-alone")
+        for row in history:
+            step(torch_ai, context, row)
+        alone[location] = context
+    
+    together = {location: store.get(location) for location in histories}
+    for location, history in histories.items():
+        for row in history:
+            step(torch_ai, together[location], row)
+    
+    latest = random_rows(len(histories), seed=9)
+    batched = torch_ai.context_step([(together[location], row) for location, row in zip(histories, latest)])
+    for location, row, confidences in zip(histories, latest, batched):
+        assert confidences == pytest.approx(step(torch_ai, alone[location], row), abs=1e-5)
+
+
+def test_cleared_context_replays_its_window(torch_ai, random_rows):
+    store = torch_ai.context_store
+    rows = random_rows(store.window - 1, seed=31)
+    carried, cleared = store.get("carried"), store.get("cleared")
+    for row in rows:
+        step(torch_ai, carried, row)
+        step(torch_ai, cleared, row)
+    
+    cleared.clear_state()
+    replays = store.replays
+    latest = random_rows(1, seed=32)[0]
+    assert step(torch_ai, cleared, latest) == pytest.approx(step(torch_ai, carried, latest), abs=1e-5)
+    assert store.replays == replays + 1
+
+
+def test_full_window_drops_the_oldest_position(torch_ai, random_rows):
+    store = torch_ai.context_store
+    rows = random_rows(store.window + 3, seed=41)
+    context = store.get("wrapped")
+    for row in rows:
+        step(torch_ai, context, row)
+    assert context.size == store.window
+    assert store.window_rows(context) == rows[3:]
+
+
+def test_fallback_context_scores_the_latest_row(make_integration, random_rows):
+    ai = make_integration(AI_FORCE_FALLBACK="1")
+    context = ai.context_store.get("fallback")
+    for row in random_rows(3, seed=51):
+        assert step(ai, context, row) == ai.score_features_local([row])[0]
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+
+class RecordingAI:
+    """Stands in for the integration: records each batch, and can hold the first one in flight"""
+    
+    def __init__(self):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def predict_batch(self, weather_batch):
+        self.batches.append([observation["id"] for observation in weather_batch])
+        self.started.set()
+        self.release.wait(5)
+        return [{"id": observation["id"]} for observation in weather_batch]
+
+
+def run_requests(sdpi, ai, count, max_batch_size=64):
+    """Submit one request, then `count - 1` more while it is still being scored"""
+    async def scenario():
+        dispatcher = sdpi.MicroBatchDispatcher(ai, max_batch_size=max_batch_size)
+        first = asyncio.ensure_future(dispatcher.submit({"id": 0}))
+        await asyncio.get_running_loop().run_in_executor(None, ai.started.wait, 5)
+        rest = [asyncio.ensure_future(dispatcher.submit({"id": i})) for i in range(1, count)]
+        await asyncio.sleep(0.01)
+        ai.release.set()
+        results = await asyncio.gather(first, *rest)
+        dispatcher.worker_task.cancel()
+        return results, dispatcher
+    return asyncio.run(scenario())
+
+
+def test_idle_dispatcher_sends_a_lone_request_at_once(sdpi):
+    ai = RecordingAI()
+    results, _ = run_requests(sdpi, ai, 1)
+    assert ai.batches == [[0]]
+    assert results == [{"id": 0}]
+
+
+def test_requests_arriving_during_a_batch_go_out_together(sdpi):
+    ai = RecordingAI()
+    results, dispatcher = run_requests(sdpi, ai, 4)
+    assert ai.batches == [[0], [1, 2, 3]]
+    assert [result["id"] for result in results] == [0, 1, 2, 3]
+    assert dispatcher.stats()["batch_size_histogram"] == {"1": 1, "3": 1}
+
+
+def test_coalesced_batches_respect_max_batch_size(sdpi):
+    ai = RecordingAI()
+    run_requests(sdpi, ai, 6, max_batch_size=2)
+    assert ai.batches == [[0], [1, 2], [3, 4], [5]]
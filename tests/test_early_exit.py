@@ -0,0 +1,70 @@
+import pytest
+
+
+@pytest.fixture
+def topk_ai(torch_ai, sdpi, monkeypatch):
+    monkeypatch.setattr(torch_ai, "pruner", sdpi.EnsemblePruner(mode="topk", top_k=2, explore_every=4))
+    return torch_ai
+
+
+def test_unknown_mode_is_rejected(sdpi):
+    with pytest.raises(ValueError):
+        sdpi.EnsemblePruner(mode="bound")
+
+
+def test_subset_scores_match_full_scoring(topk_ai, random_rows):
+    rows = random_rows(300, seed=61)
+    weather = [{"region": "north", "season": "winter"}] * len(rows)
+    full = topk_ai.get_batched_engine().predict(rows)
+    algorithms = list(topk_ai.algorithms)
+    for (evaluated, confidences), expected in zip(topk_ai.score_pruned(rows, weather), full):
+        for name, confidence in zip(evaluated, confidences):
+            assert confidence == pytest.approx(expected[algorithms.index(name)], abs=1e-5)
+
+
+def test_topk_scores_k_algorithms_and_explores_in_full(topk_ai, random_rows):
+    rows = random_rows(40, seed=62)
+    weather = [{"region": "north", "season": "winter"}] * len(rows)
+    scored = topk_ai.score_pruned(rows, weather)
+    sizes = [len(evaluated) for evaluated, _ in scored]
+    assert sizes.count(len(topk_ai.algorithms)) == len(rows) // 4
+    assert set(sizes) == {2, len(topk_ai.algorithms)}
+    
+    stats = topk_ai.pruner.stats()
+    assert stats["explored_rows"] == len(rows) // 4
+    assert stats["skipped_evaluations"] == (len(rows) - len(rows) // 4) * (len(topk_ai.algorithms) - 2)
+    # Only fully scored rows teach the ranking
+    assert sum(stats["win_rates"].values()) == pytest.approx(1.0)
+    assert sum(topk_ai.pruner.total_wins.values()) == len(rows) // 4
+
+
+def test_topk_ranks_bucket_winners_first(topk_ai, sdpi, random_rows):
+    topk_ai.pruner = sdpi.EnsemblePruner(mode="topk", top_k=2, explore_every=1)
+    rows = random_rows(80, seed=63)
+    weather = [{"region": "south", "season": "summer"}] * len(rows)
+    full = topk_ai.get_batched_engine().predict(rows)
+    algorithms = list(topk_ai.algorithms)
+    wins = {}
+    for row in full:
+        winner = algorithms[max(range(len(row)), key=row.__getitem__)]
+        wins[winner] = wins.get(winner, 0) + 1
+    
+    topk_ai.score_pruned(rows, weather)
+    ranked = topk_ai.pruner.order(("south", "summer"), tuple(algorithms))
+    assert ranked[0] == max(wins, key=wins.get)
+    assert set(ranked[:len(wins)]) == set(wins)
+
+
+def test_pruned_rows_are_not_cached(make_integration):
+    ai = make_integration(AI_FORCE_FALLBACK="1", EARLY_EXIT_MODE="topk", EARLY_EXIT_TOP_K="1",
+                          EARLY_EXIT_EXPLORE_EVERY="0", PREDICTION_CACHE_SIZE="64")
+    observation = {"temperature": 21.0, "humidity": 40, "pressure": 1012, "wind_speed": 3}
+    first, second = ai.predict_batch([observation]), ai.predict_batch([observation])
+    assert first[0]["success"] and second[0]["success"]
+    assert ai.prediction_cache.stats()["size"] == 0
+    assert ai.pruner.stats()["skipped_evaluations"] == 2 * (len(ai.algorithms) - 1)
+
+
+def test_unknown_environment_mode_disables_early_exit(make_integration):
+    ai = make_integration(AI_FORCE_FALLBACK="1", EARLY_EXIT_MODE="bound")
+    assert ai.pruner.mode == "off"
@@ -0,0 +1,62 @@
+import math
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+INF = float("inf")
+NAN = float("nan")
+
+
+def same(left, right):
+    return left == right or (math.isnan(left) and math.isnan(right))
+
+
+@pytest.fixture
+def fallback_ai(make_integration):
+    ai = make_integration(AI_FORCE_FALLBACK="1")
+    # Distinct weights of different widths so padding and per-algorithm
+    # columns are exercised, not just the stock identical models
+    rng = random.Random(3)
+    ai.fallback_models = {
+        algorithm: {"weights": [rng.uniform(-1, 1) for _ in range(width)], "bias": rng.uniform(-1, 1)}
+        for algorithm, width in zip(ai.algorithms, (2, 4, 8, 5, 1, 3))
+    }
+    return ai
+
+
+def assert_matches_scalar(sdpi, ai, rows):
+    engine = sdpi.VectorizedFallbackEngine(ai.fallback_models)
+    assert engine.algorithm_names == list(ai.algorithms)
+    for row, confidences in zip(rows, engine.predict(rows)):
+        expected = [ai.fallback_predict(algorithm, row) for algorithm in ai.algorithms]
+        assert all(same(got, want) for got, want in zip(confidences, expected)), (row, confidences, expected)
+
+
+def test_random_rows_match_scalar_path_exactly(sdpi, fallback_ai):
+    rng = random.Random(7)
+    rows = [[rng.uniform(-60, 60) for _ in range(8)] for _ in range(500)]
+    assert_matches_scalar(sdpi, fallback_ai, rows)
+
+
+@pytest.mark.parametrize("row", [
+    [NAN] * 8,
+    [INF] * 8,
+    [-INF] * 8,
+    [INF, -INF] + [0.0] * 6,
+    [0.0] * 7 + [INF],
+    [0.0] * 7 + [NAN],
+    [1e308] * 8,
+    [-1e308] * 8,
+    [800.0] * 8,
+    [-800.0] * 8,
+])
+def test_non_finite_and_overflow_rows_match_scalar_path(sdpi, fallback_ai, row):
+    assert_matches_scalar(sdpi, fallback_ai, [row])
+
+
+def test_stock_fallback_models(sdpi, make_integration):
+    ai = make_integration(AI_FORCE_FALLBACK="1")
+    rows = [[float(value) for value in range(offset, offset + 8)] for offset in range(-20, 20)]
+    assert_matches_scalar(sdpi, ai, rows)
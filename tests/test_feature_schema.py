@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+OBSERVATION = {"temperature": 21.5, "humidity": 40, "pressure": 1012.0, "wind_speed": 3.5,
+               "visibility": 9, "cloud_cover": 20, "uv_index": 4, "precipitation": 0.2}
+
+
+@pytest.fixture
+def schema(sdpi):
+    return sdpi.FeatureSchema()
+
+
+def test_numpy_scalars_are_numbers(schema):
+    plain, error = schema.parse(OBSERVATION)
+    assert error is None
+    numpy_typed = {
+        name: (np.float64(value) if isinstance(value, float) else np.int64(value))
+        for name, value in OBSERVATION.items()
+    }
+    numpy_typed["humidity"] = np.float32(40)
+    assert schema.parse(numpy_typed) == (plain, None)
+
+
+@pytest.mark.parametrize("value, message", [
+    (True, "got bool"),
+    (np.bool_(True), "got bool"),
+    ([1.0], "got list"),
+    ("warm", "got 'warm'"),
+    (math.inf, "must be finite"),
+    (np.float64("-inf"), "must be finite"),
+])
+def test_rejected_values(schema, value, message):
+    values, error = schema.parse({**OBSERVATION, "temperature": value})
+    assert values is None
+    assert message in error and "temperature" in error
+
+
+def test_prepare_returns_a_float32_matrix_and_mask(schema):
+    batch = [OBSERVATION, {"temperature": "30"}, "not an object", {"temperature": True}, {"humidity": 250}]
+    matrix, valid, errors = schema.prepare(batch)
+    assert matrix.dtype == np.float32 and matrix.shape == (5, len(schema.fields))
+    assert matrix.flags["C_CONTIGUOUS"]
+    assert valid.tolist() == [True, True, False, False, True]
+    assert [error is None for error in errors] == valid.tolist()
+    # Missing fields take defaults, out-of-range values are clamped, rejected rows hold defaults
+    assert matrix[1].tolist() == pytest.approx([30.0] + schema.defaults[1:])
+    assert matrix[4][1] == 100.0
+    assert matrix[2].tolist() == pytest.approx(schema.defaults)
+
+
+def test_empty_batch(schema):
+    matrix, valid, errors = schema.prepare([])
+    assert matrix.shape == (0, len(schema.fields)) and len(valid) == 0 and errors == []
+
+
+def test_array_cache_keys_match_row_keys(sdpi, schema, random_rows):
+    cache = sdpi.PredictionCache(max_size=16)
+    matrix = np.asarray(random_rows(50, seed=81), dtype=np.float32)
+    assert cache.keys(matrix) == [cache.key(row) for row in matrix.tolist()]
+    assert sdpi.PredictionCache(max_size=0).keys(matrix) == [None] * 50
+
+
+def test_engines_receive_the_matrix(make_integration, monkeypatch):
+    ai = make_integration(AI_FORCE_FALLBACK="1")
+    seen = []
+    predict = ai.fallback_engine.predict
+    monkeypatch.setattr(ai.fallback_engine, "predict", lambda rows: seen.append(rows) or predict(rows))
+    
+    numpy_typed = {name: np.float64(value) for name, value in OBSERVATION.items()}
+    results = ai.predict_batch([OBSERVATION, {"temperature": "hot"}, numpy_typed])
+    assert [result["success"] for result in results] == [True, False, True]
+    assert results[1]["invalid_input"]
+    assert len(seen) == 1 and isinstance(seen[0], np.ndarray) and seen[0].dtype == np.float32
+    assert seen[0].shape == (2, 8)
+    assert results[0]["confidence"] == results[2]["confidence"]
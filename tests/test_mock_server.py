@@ -0,0 +1,54 @@
+import asyncio
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+MOCK_PATH = Path(__file__).resolve().parent.parent / "simple-sd-ai-mock.py"
+
+
+@pytest.fixture(scope="module")
+def mock():
+    spec = importlib.util.spec_from_file_location("simple_sd_ai_mock", MOCK_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def fallback_server(mock, monkeypatch, tmp_path):
+    monkeypatch.setenv("AI_FORCE_FALLBACK", "1")
+    monkeypatch.setenv("INFERENCE_WORKERS", "0")
+    monkeypatch.setenv("MODEL_ARTIFACT_DIR", str(tmp_path / "models"))
+    # FallbackBackend loads its own copy of the integration; keep the tests' one registered
+    monkeypatch.setitem(sys.modules, "sd_pytorch_integration", sys.modules.get("sd_pytorch_integration"))
+    return mock.MockServer(mock.FallbackBackend(), mock.LatencyModel("0"))
+
+
+def post(server, path, payload):
+    return asyncio.run(server.dispatch("POST", path, json.dumps(payload).encode()))
+
+
+def test_fallback_mode_rejects_invalid_observations_with_422(fallback_server):
+    status, payload = post(fallback_server, "/predict", {"temperature": "hot"})
+    assert status == 422
+    assert "temperature" in payload["detail"]
+
+
+def test_fallback_mode_scores_valid_observations(fallback_server):
+    status, payload = post(fallback_server, "/predict", {"temperature": 21.0, "humidity": 40})
+    assert status == 200 and payload["success"]
+
+
+def test_batch_keeps_per_row_failures(fallback_server):
+    status, payload = post(fallback_server, "/predict/batch", [{"temperature": 21.0}, {"temperature": "hot"}])
+    assert status == 200
+    assert [result["success"] for result in payload["results"]] == [True, False]
+    assert payload["results"][1]["invalid_input"]
+
+
+def test_canned_backend_always_succeeds(mock):
+    server = mock.MockServer(mock.MockBackend(), mock.LatencyModel("0"))
+    assert post(server, "/predict", {"temperature": "hot"}) == (200, mock.MOCK_PREDICTION)
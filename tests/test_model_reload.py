@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+OBSERVATION = {"temperature": 31.0, "humidity": 20, "pressure": 1002, "wind_speed": 25}
+
+
+@pytest.fixture
+def fallback_ai(make_integration):
+    return make_integration(AI_FORCE_FALLBACK="1")
+
+
+def two_algorithms(ai):
+    return {name: ai.algorithms[name] for name in list(ai.algorithms)[:2]}
+
+
+def test_in_flight_request_finishes_on_the_version_it_started_with(fallback_ai):
+    ai = fallback_ai
+    old = ai.active_models
+    scoring, release = threading.Event(), threading.Event()
+    score_features = ai.score_features
+    
+    def held_score_features(rows):
+        scoring.set()
+        release.wait(5)
+        return score_features(rows)
+    
+    ai.score_features = held_score_features
+    in_flight = {}
+    thread = threading.Thread(target=lambda: in_flight.update(result=ai.predict_batch([OBSERVATION])[0]))
+    thread.start()
+    assert scoring.wait(5)
+    
+    ai.reload_models(algorithms=two_algorithms(ai))
+    new = ai.active_models
+    assert new is not old and new.version != old.version
+    assert old.readers == 1 and old.retired_at is not None
+    
+    release.set()
+    thread.join(5)
+    result = in_flight["result"]
+    assert result["model_version"] == old.version
+    assert set(result["all_predictions"]) == set(old.algorithms)
+    assert old.wait_for_readers(timeout=5)
+    
+    after = ai.predict_batch([OBSERVATION])[0]
+    assert after["model_version"] == new.version
+    assert set(after["all_predictions"]) == set(new.algorithms)
+
+
+def test_failed_reload_keeps_the_active_version(fallback_ai, monkeypatch):
+    ai = fallback_ai
+    active = ai.active_models
+    
+    def broken():
+        raise RuntimeError("bad weights")
+    
+    monkeypatch.setattr(ai, "initialize_fallback_models", broken)
+    with pytest.raises(RuntimeError):
+        ai.reload_models()
+    assert ai.active_models is active
+    assert ai.predict_batch([OBSERVATION])[0]["model_version"] == active.version
+
+
+def test_reload_endpoint_swaps_versions_for_admins(make_client):
+    client, ai = make_client(ADMIN_TOKEN="secret")
+    previous = ai.active_models.version
+    payload = {"algorithms": two_algorithms(ai)}
+    
+    assert client.post("/model/reload", json=payload).status_code == 403
+    assert ai.active_models.version == previous
+    
+    response = client.post("/model/reload", json=payload, headers={"x-admin-token": "secret"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["previous_version"] == previous and body["version"] == ai.active_models.version
+    
+    info = client.get("/model/info").json()
+    assert info["model_version"] == body["version"]
+    assert previous in [version["version"] for version in info["model_versions"]["retired"]]
+    predicted = client.post("/predict", json=OBSERVATION).json()
+    assert predicted["model_version"] == body["version"]
@@ -0,0 +1,185 @@
+import pytest
+
+
+class LiveFeed:
+    """Stands in for a real provider: serves only the locations it was given"""
+    
+    def __init__(self, observations):
+        self.observations = observations
+        self.fetched = []
+    
+    def fetch(self, locations, now=None):
+        self.fetched.extend(locations)
+        return {location: self.observations[location] for location in locations if location in self.observations}
+
+
+OBSERVATION = {"temperature": 18.0, "humidity": 55, "pressure": 1009, "wind_speed": 12}
+
+
+@pytest.fixture
+def fallback_ai(make_integration):
+    return make_integration(AI_FORCE_FALLBACK="1")
+
+
+def test_store_backed_scheduler_rejects_synthetic_feed(sdpi, fallback_ai, tmp_path):
+    store = sdpi.PrecomputedStore(str(tmp_path / "precomputed.db"))
+    with pytest.raises(ValueError):
+        sdpi.LocationScheduler(fallback_ai, sdpi.InMemoryWeatherFeed(), store=store)
+    # Without a store the offline feed is fine, and a live feed may fill the store
+    sdpi.LocationScheduler(fallback_ai, sdpi.InMemoryWeatherFeed())
+    sdpi.LocationScheduler(fallback_ai, LiveFeed({}), store=store)
+
+
+def test_synthetic_feed_still_serves_readings(sdpi):
+    feed = sdpi.InMemoryWeatherFeed(seed=3)
+    assert feed.is_synthetic
+    reading = feed.fetch(["paris"], now=0.0)["paris"]
+    assert reading == feed.synthetic_reading("paris", 0.0)
+
+
+def test_store_lookup_hit_stale_and_version(sdpi, tmp_path):
+    store = sdpi.PrecomputedStore(str(tmp_path / "precomputed.db"), bucket_seconds=60)
+    store.put_many([("oslo", {"success": True, "scored_at": 1000.0, "model_version": "v1", "confidence": 0.5})])
+    result, outcome = store.lookup("oslo", max_age=120, model_version="v1", now=1060.0)
+    assert outcome == "hit" and result["confidence"] == 0.5
+    assert store.lookup("oslo", max_age=50, model_version="v1", now=1060.0) == (None, "stale")
+    assert store.lookup("oslo", max_age=120, model_version="v2", now=1060.0) == (None, "stale")
+    assert store.lookup("rome", max_age=120, now=1060.0) == (None, "miss")
+    # Failed predictions are never stored
+    store.put_many([("rome", {"success": False, "scored_at": 1000.0})])
+    assert store.lookup("rome", max_age=120, now=1060.0) == (None, "miss")
+
+
+@pytest.fixture
+def mint_client(sdpi, make_client, monkeypatch, tmp_path):
+    feed = LiveFeed({"berlin": OBSERVATION})
+    monkeypatch.setattr(sdpi, "load_weather_feed", lambda spec: feed)
+    monkeypatch.delenv("PRECOMPUTE_LOCATIONS", raising=False)
+    client, _ = make_client(PRECOMPUTE_DB=str(tmp_path / "precomputed.db"), PRECOMPUTE_FEED="tests:live_feed")
+    return client, feed
+
+
+def test_mint_miss_scores_feed_conditions_and_writes_back(mint_client):
+    client, feed = mint_client
+    first = client.post("/predict/mint", json={"location": "berlin"}).json()
+    assert first["precomputed"] is False and first["conditions"] == "feed"
+    assert feed.fetched == ["berlin"]
+    
+    second = client.post("/predict/mint", json={"location": "berlin"}).json()
+    assert second["precomputed"] is True
+    assert second["confidence"] == first["confidence"]
+    assert feed.fetched == ["berlin"]
+
+
+def test_mint_consults_store_before_posted_conditions(mint_client):
+    client, feed = mint_client
+    client.post("/predict/mint", json={"location": "berlin"})
+    posted = client.post("/predict/mint", json={"location": "berlin", **OBSERVATION, "temperature": -5}).json()
+    assert posted["precomputed"] is True
+
+
+def test_mint_scores_posted_conditions_without_storing_them(mint_client):
+    client, feed = mint_client
+    response = client.post("/predict/mint", json={"location": "lima", **OBSERVATION})
+    assert response.status_code == 200
+    assert response.json()["conditions"] == "request"
+    again = client.post("/predict/mint", json={"location": "lima", **OBSERVATION}).json()
+    assert again["precomputed"] is False
+
+
+def test_mint_without_any_conditions_is_not_found(mint_client):
+    client, _ = mint_client
+    assert client.post("/predict/mint", json={"location": "nowhere"}).status_code == 404
+    assert client.post("/predict/mint", json={}).status_code == 422
+
+
+class FlakyFeed(LiveFeed):
+    """A live feed whose first `failures` fetches raise"""
+    
+    def __init__(self, observations, failures=1):
+        super().__init__(observations)
+        self.failures = failures
+    
+    def fetch(self, locations, now=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("provider unavailable")
+        return super().fetch(locations, now)
+
+
+@pytest.fixture
+def store(sdpi, tmp_path):
+    return sdpi.PrecomputedStore(str(tmp_path / "precomputed.db"), bucket_seconds=60, retention_seconds=3600)
+
+
+def test_failed_fetch_is_retried_not_dropped(sdpi, fallback_ai, store):
+    feed = FlakyFeed({"oslo": OBSERVATION, "rome": OBSERVATION})
+    scheduler = sdpi.LocationScheduler(fallback_ai, feed, store=store, default_interval=600, retry_interval=30)
+    scheduler.register("oslo", first_due=1000.0)
+    scheduler.register("rome", first_due=1000.0)
+    
+    assert scheduler.run_once(now=1000.0) == 0
+    assert scheduler.batch_errors == 1 and scheduler.failures == 2
+    assert scheduler.seconds_until_due(now=1000.0) == 30
+    assert scheduler.run_once(now=1029.0) == 0
+    
+    assert scheduler.run_once(now=1030.0) == 2
+    assert store.lookup("oslo", max_age=60, now=1031.0)[1] == "hit"
+    assert scheduler.seconds_until_due(now=1030.0) == 600
+
+
+def test_locations_missing_from_the_feed_are_retried_and_never_stored(sdpi, fallback_ai, store):
+    feed = LiveFeed({"oslo": OBSERVATION})
+    scheduler = sdpi.LocationScheduler(fallback_ai, feed, store=store, default_interval=600, retry_interval=30)
+    scheduler.register("oslo", first_due=1000.0)
+    scheduler.register("atlantis", first_due=1000.0)
+    
+    assert scheduler.run_once(now=1000.0) == 1
+    assert scheduler.unavailable == 1
+    assert store.lookup("atlantis", max_age=600, now=1000.0) == (None, "miss")
+    assert scheduler.locations["atlantis"]["next_due"] == 1030.0
+    
+    feed.observations["atlantis"] = OBSERVATION
+    assert scheduler.run_once(now=1030.0) == 1
+    assert store.lookup("atlantis", max_age=600, now=1030.0)[1] == "hit"
+
+
+def test_retry_never_waits_longer_than_the_interval(sdpi, fallback_ai):
+    scheduler = sdpi.LocationScheduler(fallback_ai, FlakyFeed({"oslo": OBSERVATION}), retry_interval=30)
+    scheduler.register("oslo", interval=10, first_due=1000.0)
+    scheduler.run_once(now=1000.0)
+    assert scheduler.locations["oslo"]["next_due"] == 1010.0
+
+
+def test_store_results_go_stale_until_rescored(sdpi, fallback_ai, store):
+    scheduler = sdpi.LocationScheduler(fallback_ai, LiveFeed({"oslo": OBSERVATION}), store=store, default_interval=600)
+    scheduler.register("oslo", first_due=1000.0)
+    scheduler.run_once(now=1000.0)
+    version = fallback_ai.models.version
+    
+    assert store.lookup("oslo", max_age=900, model_version=version, now=1500.0)[1] == "hit"
+    # Past max_age the bucket range skips it; inside the range, scored_at decides
+    assert store.lookup("oslo", max_age=900, model_version=version, now=1950.0) == (None, "miss")
+    assert store.lookup("oslo", max_age=1000, model_version=version, now=2001.0) == (None, "stale")
+    
+    assert scheduler.run_once(now=1599.0) == 0
+    assert scheduler.run_once(now=1600.0) == 1
+    assert store.lookup("oslo", max_age=900, model_version=version, now=1950.0)[1] == "hit"
+
+
+def test_store_write_failure_keeps_the_schedule(sdpi, fallback_ai, store, monkeypatch):
+    def broken(entries):
+        raise sdpi.sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(store, "put_many", broken)
+    scheduler = sdpi.LocationScheduler(fallback_ai, LiveFeed({"oslo": OBSERVATION}), store=store, default_interval=600)
+    scheduler.register("oslo", first_due=1000.0)
+    assert scheduler.run_once(now=1000.0) == 1
+    assert scheduler.latest["oslo"]["success"]
+    assert scheduler.seconds_until_due(now=1000.0) == 600
+
+
+def test_prune_drops_results_past_retention(store):
+    store.put_many([("oslo", {"success": True, "scored_at": 1000.0}), ("rome", {"success": True, "scored_at": 5000.0})])
+    assert store.prune(now=5000.0) == 1
+    assert store.stats()["locations"] == 1
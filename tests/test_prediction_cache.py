@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+OBSERVATION = {"temperature": 21.1, "humidity": 40.2, "pressure": 1008.3, "wind_speed": 12.1,
+               "visibility": 9.9, "cloud_cover": 30.0, "uv_index": 4.1, "precipitation": 0.02}
+
+
+def test_near_identical_rows_share_a_key(sdpi):
+    cache = sdpi.PredictionCache()
+    row = [21.1, 40.2, 1008.3, 12.1, 9.9, 30.0, 4.1, 0.02]
+    nudged = [21.2, 40.4, 1008.1, 12.0, 10.0, 30.3, 4.2, 0.04]
+    assert cache.key(row) == cache.key(nudged)
+    
+    across_step = list(row)
+    across_step[0] = 21.4  # temperature moves to the next 0.5 bucket
+    assert cache.key(across_step) != cache.key(row)
+
+
+def test_array_keys_match_row_keys(sdpi, random_rows):
+    np = pytest.importorskip("numpy")
+    cache = sdpi.PredictionCache()
+    rows = random_rows(200, seed=3)
+    assert cache.keys(np.array(rows, dtype=np.float32)) == [cache.key(np.float32(row).tolist()) for row in rows]
+
+
+def test_non_finite_rows_are_uncacheable(sdpi):
+    cache = sdpi.PredictionCache()
+    row = [float("nan")] + [1.0] * 7
+    assert cache.key(row) is None
+    cache.put(cache.key(row), {"success": True})
+    assert not cache.entries
+
+
+def test_least_recently_used_entry_is_evicted(sdpi):
+    cache = sdpi.PredictionCache(max_size=2)
+    cache.put(("a",), {"value": 1})
+    cache.put(("b",), {"value": 2})
+    assert cache.get(("a",)) == {"value": 1}
+    cache.put(("c",), {"value": 3})
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == {"value": 1} and cache.get(("c",)) == {"value": 3}
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl(sdpi):
+    cache = sdpi.PredictionCache(ttl_seconds=0.05)
+    cache.put(("a",), {"value": 1})
+    assert cache.get(("a",)) == {"value": 1}
+    time.sleep(0.1)
+    assert cache.get(("a",)) is None
+    assert not cache.entries
+
+
+def test_cached_results_are_copies(sdpi):
+    cache = sdpi.PredictionCache()
+    cache.put(("a",), {"value": 1})
+    cache.get(("a",))["value"] = 2
+    assert cache.get(("a",)) == {"value": 1}
+
+
+def test_model_reload_invalidates_cached_predictions(make_integration):
+    ai = make_integration(AI_FORCE_FALLBACK="1", PREDICTION_CACHE_SIZE="64")
+    cache = ai.prediction_cache
+    first = ai.predict_batch([OBSERVATION])[0]
+    assert ai.predict_batch([dict(OBSERVATION, temperature=21.2)])[0] == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    previous = ai.active_models
+    ai.reload_models()
+    assert ai.active_models is not previous
+    assert not cache.entries and cache.invalidations >= 1
+    
+    ai.predict_batch([OBSERVATION])
+    assert cache.misses == 2
+    assert all(key[0] == ai.models.version for key in cache.entries)
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+ADMIN = {"x-admin-token": "secret"}
+
+
+@pytest.fixture
+def client(make_client):
+    client, _ = make_client(PROFILING_ENABLED="1", ADMIN_TOKEN="secret", PROFILING_MAX_SECONDS="5")
+    return client
+
+
+def profile_briefly(client):
+    assert client.post("/admin/profile/cpu?seconds=2&interval_ms=1", headers=ADMIN).status_code == 200
+    deadline = time.monotonic() + 2
+    while client.get("/admin/profile/cpu?format=stats", headers=ADMIN).json()["samples"] == 0:
+        assert time.monotonic() < deadline
+        client.post("/predict", json={"temperature": 20, "humidity": 50})
+    return client.post("/admin/profile/cpu/stop", headers=ADMIN).json()
+
+
+def test_profiling_needs_the_admin_token(client):
+    assert client.post("/admin/profile/cpu?seconds=1").status_code == 403
+    assert client.get("/admin/profile/cpu", headers={"x-admin-token": "wrong"}).status_code == 403
+
+
+def test_rejected_request_keeps_the_last_profile(client):
+    stats = profile_briefly(client)
+    assert stats["samples"] > 0
+    
+    for seconds in (0, -1, 60):
+        assert client.post(f"/admin/profile/cpu?seconds={seconds}", headers=ADMIN).status_code == 422
+    assert client.get("/admin/profile/cpu?format=stats", headers=ADMIN).json()["samples"] == stats["samples"]
+
+
+def test_profile_renders_collapsed_and_speedscope(client):
+    profile_briefly(client)
+    collapsed = client.get("/admin/profile/cpu?format=collapsed", headers=ADMIN)
+    assert collapsed.status_code == 200 and collapsed.text.strip()
+    speedscope = client.get("/admin/profile/cpu", headers=ADMIN).json()
+    assert speedscope["profiles"]
+
+
+def test_profiling_endpoints_are_hidden_by_default(make_client):
+    client, _ = make_client(ADMIN_TOKEN="secret")
+    assert client.post("/admin/profile/cpu?seconds=1", headers=ADMIN).status_code == 404
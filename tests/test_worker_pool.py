@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def pool(sdpi, monkeypatch):
+    """A one-worker pool whose worker processes are never actually launched"""
+    monkeypatch.setattr(sdpi.InferenceWorker, "start", lambda worker, context, config: None)
+    pool = sdpi.InferenceWorkerPool(1, algorithms=5, slots=1, max_rows=4, max_restarts=2, restart_backoff=0.05)
+    pool.start({}, timeout=0)
+    yield pool
+    pool.close()
+
+
+def crash(pool):
+    """Exit the current worker and return how long its replacement took to appear"""
+    worker = pool.workers[0]
+    crashed = time.perf_counter()
+    worker.handle_exit()
+    wait_for(lambda: pool.workers[0] is not worker)
+    return time.perf_counter() - crashed
+
+
+def test_ring_is_sized_from_feature_schema(sdpi, pool):
+    assert pool.workers[0].inputs.shape == (1, 4, len(sdpi.FEATURE_SCHEMA))
+
+
+def test_crashing_worker_backs_off_then_pool_turns_unhealthy(pool):
+    first, second = crash(pool), crash(pool)
+    assert first >= 0.05 and second >= 0.1
+    assert pool.restarts == 2 and pool.healthy
+    
+    worker = pool.workers[0]
+    worker.handle_exit()
+    time.sleep(0.3)
+    assert pool.workers[0] is worker and pool.restarts == 2
+    assert not pool.healthy
+    assert pool.stats()["failed_workers"] == [0]
+    with pytest.raises(RuntimeError):
+        pool.pick_worker()
+
+
+def test_worker_that_stayed_up_starts_a_new_crash_streak(pool):
+    pool.stable_seconds = 0
+    for _ in range(4):
+        crash(pool)
+        assert pool.crash_counts[0] == 1
+    assert pool.restarts == 4 and pool.healthy